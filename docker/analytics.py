@@ -1,9 +1,17 @@
 # analytics.py
 import json
-import matplotlib.pyplot as plt
-from collections import defaultdict, Counter
 import os
+import sys
 import traceback
+from loader import iter_records
+from engine import Engine
+from checkpoint import IncrementalScanner
+import plots
+import rollup
+from sketch import SpaceSaving, is_sketch
+from partials import PartialReducer, is_partial
+import sampling
+import tracing
 
 # Configuration
 DATA_FILES = {
@@ -14,6 +22,12 @@ DATA_FILES = {
 }
 OUTPUT_DIR = "results"
 ERROR_FILE = "result.txt"
+STATE_FILE = "analytics_state.json"
+ROLLUP_CUBES = ["lang_days", "commits_days", "tdd_days", "tdd_cicd_days"]
+# 0 keeps an exact commit count per repo; N > 0 tracks the top repos in a
+# Space-Saving sketch of N entries (constant memory, bounded error) and
+# skips the per-day repo cube
+SKETCH_CAPACITY = int(os.getenv("ANALYTICS_SKETCH_CAPACITY", 0))
 
 def setup():
     """Create output directory if it doesn't exist"""
@@ -29,180 +43,322 @@ def log_error(error_msg):
         f.write(f"ERROR: {error_msg}\n")
 
 def load_data(file_path):
-    """Load and validate data from JSONL files"""
-    data = []
+    """Stream validated records from a JSONL file"""
+    errors = []
     try:
         if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        data.append(entry)
-                    except json.JSONDecodeError as e:
-                        log_error(f"Invalid JSON in {file_path}: {e}")
-        return data
+            yield from iter_records(file_path, errors=errors)
     except Exception as e:
         log_error(f"Failed to load {file_path}: {e}")
-        return []
+    finally:
+        for msg in errors:
+            log_error(msg)
 
-def analyze_q1_languages():
-    """Q1: Top 10 programming languages by project count"""
-    try:
-        lang_data = load_data(DATA_FILES["lang"])
-        lang_counts = Counter()
-        
-        for entry in lang_data:
-            if isinstance(entry, dict):
-                lang_counts.update(entry)
+def _is_record(entry):
+    """Per-item or whole-window record (partial aggregates are folded apart)"""
+    return isinstance(entry, dict) and not is_partial(entry)
 
-        # Optional: filter out Unknown if undesired
-        if "Unknown" in lang_counts:
-            del lang_counts["Unknown"]
+def _language_counts(entry):
+    """Producers send either a bare {language: count} dict or a window dict"""
+    counts = entry.get("languages", entry)
+    return {k: v for k, v in counts.items() if isinstance(v, int)}
 
-        top10 = lang_counts.most_common(10)
-        
-        # Plot
-        plt.figure(figsize=(12, 6))
-        languages, counts = zip(*top10)
-        plt.bar(languages, counts, color='skyblue')
-        plt.title("Top 10 Programming Languages by Project Count")
-        plt.xlabel("Language")
-        plt.ylabel("Number of Projects")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(f"{OUTPUT_DIR}/q1_top_languages.png")
-        plt.close()
-        
+def _fold_languages(entry, counters):
+    if _is_record(entry):
+        counters["languages"].update(_language_counts(entry))
+
+def _commit_counts(counters):
+    """Exact Counter, or the sketch when ANALYTICS_SKETCH_CAPACITY is set"""
+    if not SKETCH_CAPACITY:
+        return counters["commits"]
+    if "commits_sketch" not in counters:
+        counters["commits_sketch"] = SpaceSaving(SKETCH_CAPACITY)
+    return counters["commits_sketch"]
+
+def _add_sketch(target, data):
+    summary = SpaceSaving.from_dict(data)
+    target.update(summary if SKETCH_CAPACITY else dict(summary.items()))
+
+def _fold_commits(entry, counters):
+    if not _is_record(entry):
+        return
+    target = _commit_counts(counters)
+    if is_sketch(entry.get("sketch")):
+        # a producer running in sketch mode sends its whole summary at once
+        _add_sketch(target, entry["sketch"])
+        return
+    repo = entry.get("repo", "Unknown")
+    count = entry.get("commit_count", 0)
+    target.update({repo: count})
+    if count == 1000:
+        counters["capped"][repo] += 1
+
+def _fold_tdd(entry, counters):
+    if _is_record(entry):
+        lang = entry.get("language", "Unknown")
+        count = entry.get("project_count", 0)
+        if lang != "Unknown":
+            counters["tdd"][lang] += count
+
+def _fold_tdd_cicd(entry, counters):
+    if _is_record(entry):
+        counters["tdd_cicd"].update(_language_counts(entry))
+
+def _fold_days(entry, counters, name):
+    """Spread a window's per-day partitions into day-keyed cells"""
+    for day, counts in entry.get("days", {}).items():
+        if isinstance(counts, dict):
+            for key, count in counts.items():
+                if isinstance(count, int):
+                    counters[name][rollup.day_key(day, key)] += count
+
+def _fold_lang_days(entry, counters):
+    if _is_record(entry):
+        _fold_days(entry, counters, "lang_days")
+
+def _fold_commits_days(entry, counters):
+    if _is_record(entry) and "day" in entry and not SKETCH_CAPACITY:
+        repo = entry.get("repo", "Unknown")
+        counters["commits_days"][rollup.day_key(entry["day"], repo)] += entry.get("commit_count", 0)
+
+def _fold_tdd_days(entry, counters):
+    if _is_record(entry) and "day" in entry:
+        lang = entry.get("language", "Unknown")
+        counters["tdd_days"][rollup.day_key(entry["day"], lang)] += entry.get("project_count", 0)
+
+def _fold_tdd_cicd_days(entry, counters):
+    if _is_record(entry):
+        _fold_days(entry, counters, "tdd_cicd_days")
+
+def _fold_partials(entry, counters):
+    """Keep the latest partial aggregate per shard; summed after the scan"""
+    if is_partial(entry):
+        name = f"{entry.get('collector')}_partials"
+        if name not in counters:
+            counters[name] = PartialReducer()
+        counters[name].add(entry)
+
+# Every question is registered once; the engine scans each file a single
+# time and feeds all queries that read it.
+ENGINE = Engine(DATA_FILES)
+Q1 = ENGINE.register("Q1: Top 10 Languages by Project Count", "lang",
+                     _fold_languages, key="languages", exclude=["Unknown", "Other"])
+Q2 = ENGINE.register("Q2: Top 10 Most Active Repos by Commits", "commits",
+                     _fold_commits, key="commits_sketch" if SKETCH_CAPACITY else "commits")
+Q3 = ENGINE.register("Q3: Top 10 Languages with TDD", "tdd",
+                     _fold_tdd, key="tdd")
+Q4 = ENGINE.register("Q4: Top 10 Languages with TDD+CI/CD", "tdd_cicd",
+                     _fold_tdd_cicd, key="tdd_cicd", exclude=["Unknown"])
+
+# Per-day cells for the rollup cubes ride along in the same scans
+ENGINE.register_fold("lang", _fold_lang_days)
+ENGINE.register_fold("commits", _fold_commits_days)
+ENGINE.register_fold("tdd", _fold_tdd_days)
+ENGINE.register_fold("tdd_cicd", _fold_tdd_cicd_days)
+
+# Partial aggregates are reduced by shard id, so a re-crawled day replaces
+# its earlier partial instead of being counted twice
+for _source in DATA_FILES:
+    ENGINE.register_fold(_source, _fold_partials)
+
+# source -> (total Counter, day-keyed Counter) its partial payloads feed
+PARTIAL_TARGETS = {
+    "lang": ("languages", "lang_days"),
+    "commits": ("commits", "commits_days"),
+    "tdd": ("tdd", "tdd_days"),
+    "tdd_cicd": ("tdd_cicd", "tdd_cicd_days")
+}
+
+def resolve_partials(counters):
+    """Add the reduced partials of every source into the answer Counters"""
+    for source, (total_key, days_key) in PARTIAL_TARGETS.items():
+        reducer = counters.get(f"{source}_partials")
+        if reducer is None:
+            continue
+        for partial in reducer.partials():
+            payload = partial["payload"]
+            if source == "commits" and is_sketch(partial.get("sketch")):
+                # a sketch-mode window: its shard already replaced any re-send
+                _add_sketch(_commit_counts(counters), partial["sketch"])
+            elif source == "commits":
+                _commit_counts(counters).update(payload)
+                counters["capped"].update({repo: 1 for repo, n in payload.items() if n == 1000})
+            elif source == "tdd":
+                counters[total_key].update({k: n for k, n in payload.items() if k != "Unknown"})
+            else:
+                counters[total_key].update(payload)
+            _add_sample(counters, source, partial.get("sample"))
+
+            window = partial["window"]
+            if window["from"] == window["to"] and not (source == "commits" and SKETCH_CAPACITY):
+                for key, count in payload.items():
+                    counters[days_key][rollup.day_key(window["from"], key)] += count
+    return counters
+
+def _add_sample(counters, source, sample):
+    """Sum the per-language stats of a sampled day; strata add up across days"""
+    for lang, stats in (sample or {}).items():
+        for field in ("population", "sampled", "positive", "center", "variance"):
+            counters[f"{source}_sample_{field}"][lang] += stats[field]
+        # the day's payload holds this rounded estimate (sampling.estimate_day)
+        counters[f"{source}_sample_count"][lang] += round(stats["count"])
+
+SCANNER = IncrementalScanner(ENGINE, STATE_FILE, config={"sketch_capacity": SKETCH_CAPACITY})
+
+def scan_data(full=False):
+    """Fold bytes appended since the last run (every byte if `full`)"""
+    errors = []
+    try:
+        return resolve_partials(SCANNER.scan(errors=errors, full=full))
+    finally:
+        for msg in errors:
+            log_error(msg)
+
+def analyze_q1_languages(counters):
+    """Q1: Top 10 programming languages by project count"""
+    try:
+        top10 = ENGINE.answer(Q1, counters)
         return top10
     except Exception as e:
         log_error(f"Q1 Analysis failed: {traceback.format_exc()}")
         return []
 
-def analyze_q2_commits():
+def analyze_q2_commits(counters):
     """Q2: Top 10 most active repos by commits"""
     try:
-        commit_data = load_data(DATA_FILES["commits"])
-        repo_commits = Counter()
-        
-        for entry in commit_data:
-            if isinstance(entry, dict):
-                repo = entry.get("repo", "Unknown")
-                count = entry.get("commit_count", 0)
-                repo_commits[repo] += count
-
-            if count == 1000:
-                log_error(f"Possible 1000-result GitHub API cap hit for repo: {repo}")
+        for repo in counters["capped"]:
+            log_error(f"Possible 1000-result GitHub API cap hit for repo: {repo}")
 
-        
-        top10 = repo_commits.most_common(10)
-        
-        # Plot
-        plt.figure(figsize=(12, 6))
-        repos, counts = zip(*top10)
-        plt.barh(repos, counts, color='lightgreen')
-        plt.title("Top 10 Most Active Repositories by Commits")
-        plt.xlabel("Number of Commits")
-        plt.ylabel("Repository")
-        plt.tight_layout()
-        plt.savefig(f"{OUTPUT_DIR}/q2_top_commits.png")
-        plt.close()
-        
+        top10 = ENGINE.answer(Q2, counters)
         return top10
     except Exception as e:
         log_error(f"Q2 Analysis failed: {traceback.format_exc()}")
         return []
 
-def analyze_q3_tdd():
+def analyze_q3_tdd(counters):
     """Q3: Top 10 languages with test-driven development"""
     try:
-        tdd_data = load_data(DATA_FILES["tdd"])
-        tdd_counts = Counter()
-        
-        for entry in tdd_data:
-            if isinstance(entry, dict):
-                lang = entry.get("language", "Unknown")
-                count = entry.get("project_count", 0)
-                if lang != "Unknown":
-                    tdd_counts[lang] += count
-
-        
-        top10 = tdd_counts.most_common(10)
-        
-        # Plot
-        plt.figure(figsize=(12, 6))
-        languages, counts = zip(*top10)
-        plt.pie(counts, labels=languages, autopct='%1.1f%%', startangle=140)
-        plt.title("Top 10 Languages with Test-Driven Development")
-        plt.tight_layout()
-        plt.savefig(f"{OUTPUT_DIR}/q3_tdd_adoption.png")
-        plt.close()
-        
+        top10 = ENGINE.answer(Q3, counters)
         return top10
     except Exception as e:
         log_error(f"Q3 Analysis failed: {traceback.format_exc()}")
         return []
 
-def analyze_q4_tdd_cicd():
+def analyze_q4_tdd_cicd(counters):
+    """Q4: Top 10 languages with TDD and CI/CD"""
     try:
-        cicd_data = load_data(DATA_FILES["tdd_cicd"])
-        cicd_counts = Counter()
-
-        for entry in cicd_data:
-            if isinstance(entry, dict):
-                cicd_counts.update(entry)
-
-        # Optional: remove Unknown
-        if "Unknown" in cicd_counts:
-            del cicd_counts["Unknown"]
-
-        top10 = cicd_counts.most_common(10)
-
-        # Plotting
-        plt.figure(figsize=(12, 6))
-        languages, counts = zip(*top10)
-        plt.bar(languages, counts, color='salmon')
-        plt.title("Top 10 Languages with TDD and CI/CD Adoption")
-        plt.xlabel("Language")
-        plt.ylabel("Number of Projects")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(f"{OUTPUT_DIR}/q4_tdd_cicd.png")
-        plt.close()
-
+        top10 = ENGINE.answer(Q4, counters)
         return top10
-
     except Exception as e:
         log_error(f"Q4 Analysis failed: {traceback.format_exc()}")
         return []
 
+def render_charts(charts):
+    """Render changed charts in a process pool; matplotlib loads only there"""
+    try:
+        for chart, error in plots.render_all(charts, OUTPUT_DIR).items():
+            log_error(f"{chart.upper()} plot failed: {error}")
+    except Exception as e:
+        log_error(f"Plot rendering failed: {traceback.format_exc()}")
+
+def build_rollups(counters):
+    """Refresh the days × key cubes used for arbitrary window queries"""
+    try:
+        rollup.save_cubes(counters, ROLLUP_CUBES)
+    except Exception as e:
+        log_error(f"Rollup build failed: {traceback.format_exc()}")
+
+def sample_intervals(counters, source, answer):
+    """
+    95% interval lines for sampled languages in `answer`: estimated count
+    and the adoption rate among all repos of that language. Days inspected
+    in full add their exact count to both ends; the rate is over the
+    sampled days, the only ones whose population is known.
+    """
+    center = counters.get(f"{source}_sample_center") or {}
+    variance = counters.get(f"{source}_sample_variance") or {}
+    population = counters.get(f"{source}_sample_population") or {}
+    estimated = counters.get(f"{source}_sample_count") or {}
+    intervals = {}
+    for lang, count in answer:
+        if lang not in population:
+            continue
+        exact = count - estimated.get(lang, 0)
+        low, high = sampling.interval(count, center[lang], variance[lang], population[lang], exact)
+        n = population[lang]
+        line = (f"[{low:.0f}–{high:.0f}], rate {(count - exact) / n:.1%} "
+                f"[{(low - exact) / n:.1%}–{(high - exact) / n:.1%}] of {n:.0f}")
+        if exact:
+            line += f" sampled, plus {exact:.0f} from days checked in full"
+        intervals[lang] = line
+    return intervals
+
+def sample_notes(counters, source):
+    """Report line describing the sample behind an estimated answer"""
+    sampled = counters.get(f"{source}_sample_sampled")
+    if not sampled:
+        return None
+    population = sum(counters[f"{source}_sample_population"].values())
+    return (f"(estimated from a stratified sample of {sum(sampled.values()):.0f} of "
+            f"{population:.0f} repos; 95% intervals)")
+
+def sketch_notes(counters):
+    """Report lines stating the error bound of sketched answers"""
+    notes = {}
+    sketch = counters.get("commits_sketch")
+    if sketch is not None:
+        notes[Q2.name] = (f"(approximate: Space-Saving sketch of {sketch.capacity} repos over "
+                          f"{sketch.total} commits; counts may overestimate by at most "
+                          f"{sketch.max_error()})")
+    return notes
 
-def generate_report(results):
+def generate_report(results, notes=None, intervals=None):
     """Generate a text report of all results"""
+    notes = notes or {}
+    intervals = intervals or {}
     report = []
     for q, data in results.items():
         report.append(f"\n=== {q} ===")
+        if q in notes:
+            report.append(notes[q])
         if not data:
             report.append("No data available or error occurred")
             continue
             
         for i, (item, count) in enumerate(data, 1):
-            report.append(f"{i:>2}. {item:<20} {count}")
+            line = f"{i:>2}. {item:<20} {count}"
+            if item in intervals.get(q, {}):
+                line += f"  {intervals[q][item]}"
+            report.append(line)
     
     with open(f"{OUTPUT_DIR}/report.txt", "w") as f:
         f.write("\n".join(report))
 
-def main():
+@tracing.traced("analytics")
+def main(full=False):
     setup()
     
     try:
-        results = {
-            "Q1: Top 10 Languages by Project Count": analyze_q1_languages(),
-            "Q2: Top 10 Most Active Repos by Commits": analyze_q2_commits(),
-            "Q3: Top 10 Languages with TDD": analyze_q3_tdd(),
-            "Q4: Top 10 Languages with TDD+CI/CD": analyze_q4_tdd_cicd()
+        counters = scan_data(full)
+        charts = {
+            "q1": analyze_q1_languages(counters),
+            "q2": analyze_q2_commits(counters),
+            "q3": analyze_q3_tdd(counters),
+            "q4": analyze_q4_tdd_cicd(counters)
         }
-        
-        generate_report(results)
+        results = dict(zip([Q1.name, Q2.name, Q3.name, Q4.name], charts.values()))
+
+        notes = sketch_notes(counters)
+        intervals = {}
+        for query, source in ((Q3, "tdd"), (Q4, "tdd_cicd")):
+            note = sample_notes(counters, source)
+            if note:
+                notes[query.name] = note
+                intervals[query.name] = sample_intervals(counters, source, results[query.name])
+
+        generate_report(results, notes, intervals)
+        build_rollups(counters)
+        render_charts(charts)
         
         # Check if any errors occurred
         with open(ERROR_FILE, "r") as f:
@@ -219,4 +375,4 @@ def main():
         print(f"Analysis failed. Check {ERROR_FILE} for details.")
 
 if __name__ == "__main__":
-    main()
+    main(full="--full" in sys.argv)
@@ -0,0 +1,101 @@
+# bench_crawl.py
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.request import urlopen
+
+import fake_github
+
+# collector -> (module, function crawling one day)
+COLLECTORS = {
+    "lang": ("lang", "fetch_repos_for_day"),
+    "lang_facets": ("lang", "fetch_language_facets_for_day"),
+    "commit": ("commit", "fetch_repos_for_day"),
+    "tdd": ("findtdd", "fetch_repos_with_tests_for_day"),
+    "tdd_cicd": ("findtdd_cicd", "fetch_repos_with_tests_and_ci_for_day")
+}
+
+
+def _stats(base_url):
+    with urlopen(f"{base_url}/_stats") as resp:
+        return json.load(resp)
+
+
+def bench(collectors, days, base_url, warm=False):
+    """
+    Crawl `days` days with each collector against `base_url`. Each
+    collector gets its own empty fingerprint store, so it never reuses
+    what an earlier one found; with `warm`, the days are crawled once
+    untimed first and only the re-crawl is measured.
+    """
+    os.environ["GITHUB_API_URL"] = base_url
+    os.environ.setdefault("GITHUB_TOKEN", "benchmark")
+    import fingerprints
+    start_day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in collectors:
+            module_name, func_name = COLLECTORS[name]
+            fetch = getattr(importlib.import_module(module_name), func_name)
+            fingerprints.STORE = fingerprints.FingerprintStore(os.path.join(tmp, f"{name}.sqlite"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i in range(days if warm else 0):
+                    fetch(start_day + timedelta(days=i))
+                before = _stats(base_url)
+                t0 = time.perf_counter()
+                for i in range(days):
+                    fetch(start_day + timedelta(days=i))
+                elapsed = time.perf_counter() - t0
+            after = _stats(base_url)
+            fingerprints.STORE.close()
+            calls = sum(after.get(k, 0) - before.get(k, 0) for k in after if k.startswith(("GET", "POST")))
+            rows.append((name, elapsed, calls))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl throughput against the fake GitHub API")
+    parser.add_argument("collectors", nargs="*",
+                        help=f"any of {', '.join(COLLECTORS)} (default: all)")
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--repos-per-day", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=0.0, help="extra latency of search requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="use an already running stand-in instead of starting one")
+    parser.add_argument("--warm", action="store_true",
+                        help="crawl the days once first and time the re-crawl (fingerprint store warm)")
+    args = parser.parse_args()
+    unknown = set(args.collectors) - set(COLLECTORS)
+    if unknown:
+        parser.error(f"unknown collectors: {', '.join(sorted(unknown))}")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = fake_github.start(
+            repos_per_day=args.repos_per_day, seed=args.seed, latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms, search_latency_ms=args.search_latency_ms, core_limit=10 ** 9, search_limit=10 ** 9)
+
+    print(f"fingerprint store: {'warm, re-crawl timed' if args.warm else 'cold'}, one per collector")
+    print(f"{'collector':<10} {'seconds':>8} {'requests':>9} {'req/s':>8}")
+    for name, elapsed, calls in bench(args.collectors or list(COLLECTORS), args.days, base_url, args.warm):
+        print(f"{name:<10} {elapsed:>8.2f} {calls:>9} {calls / elapsed if elapsed else 0:>8.1f}")
+
+    import pipeline
+    for line in pipeline.report():
+        print(line)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# bench_pipeline.py
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import fake_pulsar
+import synthetic
+from config import TOPICS
+
+# End-to-end benchmark: synthetic producers -> fake_pulsar -> pulsar_consumer
+# -> JSONL files -> analytics. Each size runs in a fresh subprocess and
+# scratch directory, so peak RSS and the analytics state belong to that run.
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+# metric -> True if higher is better (used by --baseline)
+METRICS = {
+    "produce_msgs_per_s": True,
+    "consume_msgs_per_s": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "write_mb_per_s": True,
+    "analytics_s": False,
+    "peak_rss_mb": False
+}
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of an already sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def run_once(records, repos_per_day=5000, seed=0):
+    """One pipeline run in the current directory; returns its metrics"""
+    import pulsar_consumer
+    import analytics
+
+    broker = fake_pulsar.BROKER
+    stop = threading.Event()
+    consumer = threading.Thread(target=pulsar_consumer.consume,
+                                kwargs={"pulsar": fake_pulsar, "stop": stop, "refresh_seconds": 0})
+    consumer.start()
+
+    # the producers publish as fast as they can, so latency includes queueing
+    client = fake_pulsar.Client()
+    producers = {key: client.create_producer(topic) for key, topic in TOPICS.items()}
+    t0 = time.perf_counter()
+    for key, payload in synthetic.message_stream(records, repos_per_day, seed=seed):
+        producers[key].send(json.dumps(payload).encode("utf-8"))
+    produced = time.perf_counter() - t0
+
+    while not broker.wait_acked(records, timeout=1):
+        if not consumer.is_alive():
+            raise RuntimeError(f"consumer stopped after {broker.acked}/{records} messages")
+    consumed = time.perf_counter() - t0
+    stop.set()
+    consumer.join()
+
+    written = sum(os.path.getsize(path) for path in pulsar_consumer.TOPIC_FILE_MAP.values()
+                  if os.path.exists(path))
+    t1 = time.perf_counter()
+    analytics.main(full=True)
+    analytics_s = time.perf_counter() - t1
+
+    latencies = sorted(broker.latencies)
+    return {
+        "records": records,
+        "produce_msgs_per_s": records / produced,
+        "consume_msgs_per_s": records / consumed,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p95_ms": percentile(latencies, 95) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "write_mb_per_s": written / 2 ** 20 / consumed,
+        "written_mb": written / 2 ** 20,
+        "analytics_s": analytics_s,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }
+
+
+def run_size(records, repos_per_day, seed):
+    """Run one size in a subprocess inside a scratch directory"""
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as workdir:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(records),
+             "--repos-per-day", str(repos_per_day), "--seed", str(seed)],
+            cwd=workdir, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"{records} records failed:\n{out.stderr}")
+        return json.loads(out.stdout.splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Metrics more than `tolerance` (a fraction) worse than the baseline"""
+    regressions = []
+    for size, metrics in results.items():
+        for name, higher_is_better in METRICS.items():
+            old = baseline.get(size, {}).get(name)
+            new = metrics.get(name)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{size} records: {name} {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with a Pulsar stand-in")
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES, help="records per run")
+    parser.add_argument("--repos-per-day", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            metrics = run_once(args.child, args.repos_per_day, args.seed)
+        print(json.dumps(metrics))
+        return
+
+    results = {}
+    print(f"{'records':>9} {'prod/s':>9} {'cons/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'write MB/s':>10} {'analytics s':>11} {'RSS MB':>7}")
+    for size in args.sizes:
+        m = run_size(size, args.repos_per_day, args.seed)
+        results[str(size)] = m
+        print(f"{size:>9} {m['produce_msgs_per_s']:>9.0f} {m['consume_msgs_per_s']:>9.0f} "
+              f"{m['latency_p50_ms']:>8.1f} {m['latency_p95_ms']:>8.1f} {m['latency_p99_ms']:>8.1f} "
+              f"{m['write_mb_per_s']:>10.1f} {m['analytics_s']:>11.2f} {m['peak_rss_mb']:>7.0f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# cli.py
+import argparse
+import contextlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pipeline
+from producer_daemon import SENDERS, Daemon
+from telemetry import TELEMETRY
+
+# collectors that can run from GH Archive dumps without the search API
+ARCHIVE_COLLECTORS = {"lang", "commits"}
+
+
+def _requests():
+    """GitHub requests sent so far"""
+    return sum(sum(e["status"].values()) for e in TELEMETRY.snapshot()["endpoints"].values())
+
+
+def run(daemon, collectors, start, end):
+    """
+    Crawl `start`..`end` day by day, running every collector on a day
+    before moving on. The day's search pages and /contents listings are
+    fetched once and shared (crawl.shared). Returns {collector: {"seconds",
+    "requests"}}.
+    """
+    import gharchive
+    if gharchive.ARCHIVE_DIR and set(collectors) <= ARCHIVE_COLLECTORS:
+        shared = contextlib.nullcontext      # nothing to share, and no token needed
+    else:
+        from crawl import shared
+
+    stats = {collector: {"seconds": 0.0, "requests": 0} for collector in collectors}
+    current = start
+    while current <= end and not daemon.stop.is_set():
+        with shared():
+            for collector in collectors:
+                started, sent = time.perf_counter(), _requests()
+                try:
+                    daemon.sender(collector)(daemon.producer(collector), current, current)
+                except Exception as e:
+                    print(f"[CLI] {collector} failed on {current.date()}: {e!r}")
+                stats[collector]["seconds"] += time.perf_counter() - started
+                stats[collector]["requests"] += _requests() - sent
+        current += timedelta(days=1)
+    return stats
+
+
+def _day(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run any of the collectors together in one process")
+    parser.add_argument("collectors", nargs="*", metavar="collector",
+                        help=f"any of {', '.join(SENDERS)} (default: all)")
+    parser.add_argument("--days", type=int, default=7, help="days up to today (default 7)")
+    parser.add_argument("--from", dest="start", type=_day, help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=_day, help="last day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--fake", action="store_true",
+                        help="publish to fake_pulsar and run pulsar_consumer.consume in-process")
+    args = parser.parse_args()
+
+    unknown = set(args.collectors) - set(SENDERS)
+    if unknown:
+        parser.error(f"unknown collectors: {', '.join(sorted(unknown))}")
+    # the order of SENDERS, so a day's search is fetched by the cheapest collector
+    collectors = [c for c in SENDERS if c in args.collectors] or list(SENDERS)
+    end = args.end or datetime.now(timezone.utc)
+    start = args.start or end - timedelta(days=args.days - 1)
+
+    if args.fake:
+        import fake_pulsar as pulsar
+        import pulsar_consumer
+        consumer_stop = threading.Event()
+        consumer = threading.Thread(target=pulsar_consumer.consume, daemon=True,
+                                    kwargs={"pulsar": pulsar, "stop": consumer_stop, "refresh_seconds": 0})
+        consumer.start()
+    else:
+        import pulsar
+
+    daemon = Daemon(pulsar)
+    started = time.perf_counter()
+    try:
+        stats = run(daemon, collectors, start, end)
+    finally:
+        daemon.close()
+        if args.fake:
+            consumer_stop.set()
+            consumer.join()
+
+    print(f"\n[CLI] {start.date()}..{end.date()} in {time.perf_counter() - started:.1f}s, "
+          f"{_requests()} requests, {TELEMETRY.snapshot()['counts'].get('shared_hits', 0)} shared")
+    for collector, s in stats.items():
+        print(f"  {collector:<10} {s['seconds']:>8.1f}s {s['requests']:>8} requests")
+    for line in pipeline.report():
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,17 @@
-import os
-import time
-import requests
 from datetime import datetime, timedelta, timezone
 from collections import Counter
-from dotenv import load_dotenv
+from requests import RequestException
+from crawl import API_URL, MAX_PAGES, PER_PAGE, github_get, search_pages, wait_if_low
+from github_client import parse_json
+import tracing
+import enrich
+import fingerprints
 
-load_dotenv()
-
-# ——— Configuration ———
-TOKEN = os.getenv("GITHUB_TOKEN")
-if not TOKEN:
-    raise RuntimeError("Please set GITHUB_TOKEN environment variable")
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
-
-# each search can return up to 100 items/page, up to 10 pages (1 000 items max)
-PER_PAGE   = 100
-MAX_PAGES  = 10
-RATE_BUFFER = 5  # seconds extra padding
+# commits per repo in the fingerprint store
+CACHE = enrich.RepoCache("commits", "commits")
 
 
+@tracing.traced("crawl_day", lambda day: {"day": day.strftime("%Y-%m-%d")}, collector="commits")
 def fetch_repos_for_day(day: datetime) -> Counter:
     """
     Fetch all repos that were CREATED or PUSHED on `day`.
@@ -31,127 +20,93 @@ def fetch_repos_for_day(day: datetime) -> Counter:
     """
 
     print(f"Start at: {day}")
-    print(f"{HEADERS}")
     commit_counter = Counter()
     day_str = day.strftime("%Y-%m-%d")
-    
-    # match repos created OR updated (pushed) on that day
-    query = f"created:{day_str}"
-
-    print(f"query: {query}")
-
-    for page in range(1, MAX_PAGES + 1):
-        params = {
-            "q":        query,
-            "sort":     "created",
-            "order":    "asc",
-            "per_page": PER_PAGE,
-            "page":     page
-        }
-        resp = requests.get(
-            "https://api.github.com/search/repositories",
-            headers=HEADERS, params=params
-        )
-        # https://docs.github.com/en/rest/search/search?apiVersion=2022-11-28#search-repositories
-        
-        #print(f"Resp URL: {resp.url}, Status: {resp.status_code}, JSON:{resp.json()}")
-        
-        # If rate-limited, sleep til reset + buffer, then retry once
-        if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-            reset_ts = int(resp.headers["X-RateLimit-Reset"])
-            wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-            print(f"[{day_str}] Rate limit hit; sleeping {wait:.0f}s…")
-            time.sleep(wait)
-            resp = requests.get(
-                "https://api.github.com/search/repositories",
-                headers=HEADERS, params=params
-            )
-
-        if resp.status_code != 200:
-            raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
-
-        data  = resp.json()
-        items = data.get("items", [])
-        if not items:
-            break
-        
-        #print(f"Item's Key: {items[0].keys()}")
 
+    # match repos created on that day; crawl.search_pages pages through
+    # them and backs off when the search budget runs low
+    for items in search_pages(day):
+        resp = None
         for repo in items:
             default_branch = repo['default_branch']
             repo_name = repo['full_name']
-            print(f"Default Branch: {repo['default_branch']}, Repo Name: {repo['full_name']}")
+            commits = CACHE.get(repo)
+            if commits is not None:
+                # not pushed since it was last counted
+                if commits:
+                    commit_counter[repo_name] += commits
+                continue
+            commits, negative = 0, None
             for page in range(1, MAX_PAGES + 1):
-                api_commit = f'https://api.github.com/repos/{repo_name}/commits'
+                api_commit = f'{API_URL}/repos/{repo_name}/commits'
                 query_commit = f'sha:{default_branch}'
                 params_commit = {
                     "q":        query_commit,
                     "per_page": PER_PAGE,
                     "page":     page
                 }
-                resp = requests.get(
-                    api_commit,
-                    headers=HEADERS, params=params_commit
-                )
+                resp = github_get(api_commit, params_commit)
                 #https://docs.github.com/en/rest/commits/commits?apiVersion=2022-11-28#list-commits
-                print(f"Resp URL: {resp.url}, Status: {resp.status_code}")
-
-                # If rate-limited, sleep til reset + buffer, then retry once
-                if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-                    reset_ts = int(resp.headers["X-RateLimit-Reset"])
-                    wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-                    print(f"[{day_str}] Rate limit hit; sleeping {wait:.0f}s…")
-                    time.sleep(wait)
-                    resp = requests.get(
-                        api_commit,
-                        headers=HEADERS, params=params_commit
-                    )
-
-                if resp.status_code == 409:
+
+                # empty (409) or gone (404): cached for FINGERPRINT_NEGATIVE_TTL
+                if resp.status_code in (404, 409):
+                    negative = str(resp.status_code)
                     break
 
+                # still failing after SESSION's retries: skip this repo, not the crawl
                 if resp.status_code != 200:
-                    raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
-                
-                if resp.status_code == 200 and resp.json() == []:
+                    print(f"[{day_str}] Skipping {repo_name}: GitHub API error {resp.status_code}")
+                    commits = None
                     break
                 
-                data = resp.json()
+                data = parse_json(resp)
+                if data == []:
+                    break
                 data_len = len(data)
+                if page == 1:
+                    # newest first: the head of the default branch
+                    fingerprints.STORE.put(repo, "head_sha", data[0].get("sha"))
                 #print(data[0].keys())
                 commit_counter[repo_name] += data_len
+                commits += data_len
                 
                 if data_len < PER_PAGE:
                     break
+            CACHE.put(repo, commits, negative)
 
-        ## if we’re running low on remaining calls, back off until reset
-        rem   = int(resp.headers.get("X-RateLimit-Remaining", 0))
-        reset = int(resp.headers.get("X-RateLimit-Reset", time.time()))
-        print(f"Rate Limit Remaining:{rem}, Rate Limit Reset:{reset}\n")
-        if rem < 5:
-            wait = max(0, reset - time.time()) + RATE_BUFFER
-            print(f"[{day_str}] Low rate-limit (remaining={rem}); sleeping {wait:.0f}s…")
-            time.sleep(wait)
-
-        # fewer than a full page? we’ve exhausted this day’s results
-        if len(items) < PER_PAGE:
-            break
+        ## if we’re running low on remaining core calls, back off until reset
+        if resp is not None:
+            wait_if_low(resp, f"[{day_str}] ")
 
     return commit_counter
 
 
+def aggregate_commit_by_day(start: datetime, end: datetime) -> dict:
+    """
+    Loop from start → end (inclusive) and keep each day's counts apart.
+    Returns {"YYYY-MM-DD": Counter(repo -> commits)}, keyed by creation day.
+    """
+    days = {}
+    current = start
+    while current <= end:
+        print(f"Processing {current.date()}…")
+        try:
+            days[current.strftime("%Y-%m-%d")] = fetch_repos_for_day(current)
+        except (RuntimeError, RequestException) as e:
+            # still failing after the retries: leave the day out, keep crawling
+            print(f"Skipping {current.date()}: {e}")
+        current += timedelta(days=1)
+    return days
+
+
 def aggregate_commit(start: datetime, end: datetime) -> Counter:
     """
     Loop from start → end (inclusive), fetch per-day counts,
     and accumulate into one master Counter.
     """
     total = Counter()
-    current = start
-    while current <= end:
-        print(f"Processing {current.date()}…")
-        day_counts = fetch_repos_for_day(current)
+    for day_counts in aggregate_commit_by_day(start, end).values():
         total.update(day_counts)
-        current += timedelta(days=1)
     return total
 
 
@@ -0,0 +1,142 @@
+# crawl.py
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from github_client import SESSION, parse_json, rate_limit_sleep
+from telemetry import TELEMETRY
+import pipeline
+
+load_dotenv()
+
+# ——— Configuration ———
+# shared by lang, commit, findtdd and findtdd_cicd
+TOKEN = os.getenv("GITHUB_TOKEN")
+if not TOKEN:
+    raise RuntimeError("Please set GITHUB_TOKEN environment variable")
+
+# point at a stand-in (e.g. fake_github.py) with GITHUB_API_URL=http://host:port
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+HEADERS = {
+    "Authorization": f"token {TOKEN}",
+    "Accept": "application/vnd.github+json"
+}
+
+# each search can return up to 100 items/page, up to 10 pages (1 000 items max)
+PER_PAGE = 100
+MAX_PAGES = 10
+RATE_BUFFER = 5  # seconds extra padding
+LOW_REMAINING = 5  # below this, wait for the reset before the next page
+
+# parsed search pages and /contents listings of the current day, while a
+# shared() block is open
+_SHARED = None
+
+
+@contextmanager
+def shared():
+    """
+    Within the block, search pages and /contents listings are answered
+    from the first identical request, so collectors run together in one
+    process (cli.py) fetch them once. Only parsed items are kept, and they
+    are dropped when a search for another day starts.
+    """
+    global _SHARED
+    outer, _SHARED = _SHARED, _SHARED if _SHARED is not None else {}
+    try:
+        yield
+    finally:
+        _SHARED = outer
+
+
+def _start_day(day_str):
+    """Forget the previous day's pages and listings; no collector reads them again"""
+    if _SHARED is not None and _SHARED.get("day") != day_str:
+        _SHARED.clear()
+        _SHARED["day"] = day_str
+
+
+def github_get(url, params=None):
+    """GET with the collectors' headers; SESSION retries rate limits, 5xx and timeouts"""
+    return SESSION.get(url, headers=HEADERS, params=params)
+
+
+def wait_if_low(resp, label=""):
+    """Sleep until the reset when a response says the budget is nearly gone"""
+    remaining = int(resp.headers.get("X-RateLimit-Remaining", LOW_REMAINING))
+    if remaining < LOW_REMAINING:
+        reset = int(resp.headers.get("X-RateLimit-Reset", time.time()))
+        wait = max(0, reset - time.time()) + RATE_BUFFER
+        print(f"{label}Low rate-limit (remaining={remaining}); sleeping {wait:.0f}s…")
+        rate_limit_sleep(wait)
+
+
+def search_pages(day: datetime):
+    """
+    Yield each page of search items for repos created on `day`, up to
+    Search's 1 000-item cap. Pages are fetched PREFETCH_PAGES ahead in a
+    background thread, so the next search round trip (and any rate-limit
+    sleep) overlaps the enrichment of the current page.
+    """
+    return pipeline.prefetch(_search_pages(day))
+
+
+def _search_pages(day):
+    day_str = day.strftime("%Y-%m-%d")
+    _start_day(day_str)
+    for page in range(1, MAX_PAGES + 1):
+        params = {
+            "q": f"created:{day_str}",
+            "sort": "created",
+            "order": "asc",
+            "per_page": PER_PAGE,
+            "page": page
+        }
+        key = ("search", page)
+        if _SHARED is not None and key in _SHARED:
+            TELEMETRY.count("shared_hits")
+            resp, items = None, _SHARED[key]
+        else:
+            resp = github_get(f"{API_URL}/search/repositories", params)
+            # https://docs.github.com/en/rest/search/search?apiVersion=2022-11-28#search-repositories
+
+            if resp.status_code != 200:
+                raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
+
+            items = parse_json(resp).get("items", [])
+            if _SHARED is not None:
+                _SHARED[key] = items
+        TELEMETRY.count("repos", len(items))
+        if not items:
+            break
+
+        yield items
+
+        # fewer than a full page? we’ve exhausted this day’s results
+        if len(items) < PER_PAGE:
+            break
+        if resp is not None:
+            wait_if_low(resp, f"[{day_str}] ")
+
+
+def list_contents(full_name, path=""):
+    """
+    GET /repos/{full_name}/contents[/path]; shared between the TDD
+    collectors. Returns (status code, parsed entries or None).
+    """
+    key = ("contents", full_name, path)
+    if _SHARED is not None and key in _SHARED:
+        TELEMETRY.count("shared_hits")
+        return 200, _SHARED[key]
+    url = f"{API_URL}/repos/{full_name}/contents" + (f"/{path}" if path else "")
+    resp = github_get(url)
+    if resp.status_code != 200:
+        return resp.status_code, None
+    entries = parse_json(resp)
+    if _SHARED is not None:
+        _SHARED[key] = entries
+    return 200, entries
@@ -0,0 +1,93 @@
+# engine.py
+import heapq
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from loader import fold_file, merge_counters
+
+
+class Query:
+    """One registered question: which source it reads and how it folds records"""
+
+    def __init__(self, name, source, fold, key, k=10, exclude=()):
+        self.name = name
+        self.source = source
+        self.fold = fold
+        self.key = key          # name of the Counter the answer is read from
+        self.k = k
+        self.exclude = set(exclude)
+
+
+class _MultiFold:
+    """Feed one record to every fold registered on the same source"""
+
+    def __init__(self, folds):
+        self.folds = folds
+
+    def __call__(self, entry, counters):
+        for fold in self.folds:
+            fold(entry, counters)
+
+
+def top_k(counter, k=10, exclude=()):
+    """Heap-based top-k of a Counter, skipping keys in `exclude`"""
+    items = ((key, count) for key, count in counter.items() if key not in exclude)
+    return heapq.nlargest(k, items, key=itemgetter(1))
+
+
+class Engine:
+    """
+    Scan each data source once and feed every query registered on it.
+    Folds write into named Counters; each query owns the names it writes,
+    so a fold for Q5 can share a pass with Q1 without another file scan.
+    """
+
+    def __init__(self, data_files):
+        self.data_files = data_files
+        self.queries = []
+        self.folds = []     # (source, fold) pairs that feed no top-k answer
+
+    def register(self, name, source, fold, key, k=10, exclude=()):
+        if source not in self.data_files:
+            raise ValueError(f"Unknown data source: {source}")
+        if any(q.name == name for q in self.queries):
+            raise ValueError(f"Query already registered: {name}")
+        query = Query(name, source, fold, key, k, exclude)
+        self.queries.append(query)
+        return query
+
+    def register_fold(self, source, fold):
+        """Run an extra fold (e.g. a rollup) in the same pass over `source`"""
+        if source not in self.data_files:
+            raise ValueError(f"Unknown data source: {source}")
+        self.folds.append((source, fold))
+
+    def sources(self):
+        """Map each source to the distinct folds registered on it, in order"""
+        folds = defaultdict(list)
+        pairs = [(q.source, q.fold) for q in self.queries] + self.folds
+        for source, fold in pairs:
+            if fold not in folds[source]:
+                folds[source].append(fold)
+        return folds
+
+    def scan_source(self, source, workers=None, errors=None, start=0, end=None):
+        """Fold bytes `start`..`end` of one source through all of its folds"""
+        folds = self.sources()[source]
+        return fold_file(self.data_files[source], _MultiFold(folds),
+                         workers=workers, errors=errors, start=start, end=end)
+
+    def scan(self, workers=None, errors=None):
+        """One pass per source; returns the merged dict of named Counters"""
+        counters = defaultdict(Counter)
+        for source in self.sources():
+            merge_counters(counters, self.scan_source(source, workers, errors))
+        return counters
+
+    def answer(self, query, counters):
+        return top_k(counters[query.key], query.k, query.exclude)
+
+    def run(self, workers=None, errors=None):
+        """Scan all sources and return {query name: top-k list}"""
+        counters = self.scan(workers, errors)
+        return {q.name: self.answer(q, counters) for q in self.queries}
@@ -0,0 +1,159 @@
+# enrich.py
+import os
+
+from github_client import SESSION, parse_json
+from telemetry import TELEMETRY
+import fingerprints
+
+# ——— Configuration ———
+# "rest" lists /contents per repo (plus .github for CI); "graphql" fetches
+# the root tree, .github/workflows and primary language of GRAPHQL_BATCH
+# repos in one query and runs the same detectors locally.
+ENRICH_MODE = os.getenv("ENRICH_MODE", "rest")
+GRAPHQL_BATCH = int(os.getenv("GRAPHQL_BATCH", 50))
+
+# GraphQL tree entry types -> the REST /contents types the detectors expect
+ENTRY_TYPES = {"tree": "dir", "blob": "file", "commit": "submodule"}
+
+REPO_FIELDS = """
+    nameWithOwner
+    isEmpty
+    primaryLanguage { name }
+    defaultBranchRef { target { oid } }
+    root: object(expression: "HEAD:") { ... on Tree { entries { name type } } }
+    workflows: object(expression: "HEAD:.github/workflows") { ... on Tree { entries { name type } } }
+"""
+
+# just the language, for repos seen outside the search results (gharchive)
+LANGUAGE_FIELDS = """
+    nameWithOwner
+    primaryLanguage { name }
+"""
+
+
+def build_query(full_names, fields=REPO_FIELDS):
+    """One aliased repository() lookup per repo"""
+    parts = []
+    for i, full_name in enumerate(full_names):
+        owner, name = full_name.split("/", 1)
+        parts.append(f'r{i}: repository(owner: {_quote(owner)}, name: {_quote(name)}) {{{fields}}}')
+    return "query {\n" + "\n".join(parts) + "\n}"
+
+
+def _quote(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _entries(tree):
+    if not tree:
+        return []
+    return [{"name": e["name"], "type": ENTRY_TYPES.get(e["type"], e["type"])}
+            for e in tree.get("entries") or []]
+
+
+def parse_repo(node):
+    """
+    A repository node as {"language", "entries", "has_workflows", "empty",
+    "head_sha"}, with the root entries shaped like a REST /contents listing
+    """
+    return {
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "entries": _entries(node.get("root")),
+        "has_workflows": node.get("workflows") is not None,
+        "empty": bool(node.get("isEmpty")),
+        "head_sha": ((node.get("defaultBranchRef") or {}).get("target") or {}).get("oid")
+    }
+
+
+def _post(api_url, headers, query):
+    # rate limits, 5xx and dropped connections are retried by SESSION
+    resp = SESSION.post(f"{api_url}/graphql", headers=headers, json={"query": query})
+    if resp.status_code != 200:
+        raise RuntimeError(f"GitHub GraphQL error {resp.status_code}: {resp.text}")
+    return parse_json(resp)
+
+
+def _fetch(full_names, api_url, headers, batch, fields, parse):
+    found = {}
+    for i in range(0, len(full_names), batch):
+        chunk = full_names[i:i + batch]
+        body = _post(api_url, headers, build_query(chunk, fields))
+        data = body.get("data") or {}
+        if not data and body.get("errors"):
+            raise RuntimeError(f"GitHub GraphQL errors: {body['errors']}")
+        for j, full_name in enumerate(chunk):
+            node = data.get(f"r{j}")
+            if node is not None:
+                found[full_name] = parse(node)
+    return found
+
+
+def fetch_root_trees(full_names, api_url, headers, batch=GRAPHQL_BATCH):
+    """
+    Root trees of `full_names`, `batch` repos per GraphQL request.
+    Returns {full_name: parse_repo(...)}; repos GitHub could not resolve
+    (deleted, renamed, blocked) are left out.
+    """
+    return _fetch(full_names, api_url, headers, batch, REPO_FIELDS, parse_repo)
+
+
+def fetch_languages(full_names, api_url, headers, batch=GRAPHQL_BATCH):
+    """{full_name: primary language or None}, left out like fetch_root_trees"""
+    return _fetch(full_names, api_url, headers, batch, LANGUAGE_FIELDS,
+                  lambda node: (node.get("primaryLanguage") or {}).get("name"))
+
+
+def root_trees(full_names, api_url, headers):
+    """
+    Root trees for a search page in ENRICH_MODE=graphql, or None when the
+    caller should list /contents per repo (REST mode, or the batch failed)
+    """
+    if ENRICH_MODE != "graphql":
+        return None
+    try:
+        return fetch_root_trees(full_names, api_url, headers)
+    except Exception as e:
+        print(f"GraphQL enrichment failed, falling back to REST: {e}")
+        return None
+
+
+def record_head(repo, trees):
+    """Keep the default-branch SHA a GraphQL batch returned for a search item"""
+    tree = (trees or {}).get(repo.get("full_name"))
+    if tree and tree["head_sha"]:
+        fingerprints.STORE.put(repo, "head_sha", tree["head_sha"])
+
+
+def calls_per_repo(rest_calls):
+    """Enrichment requests one repo costs in the current ENRICH_MODE"""
+    return 1 / GRAPHQL_BATCH if ENRICH_MODE == "graphql" else rest_calls
+
+
+class RepoCache:
+    """
+    One collector's view of a field in the fingerprint store (e.g.
+    "has_tests", "commits"), valid until the repo's `pushed_at` in the
+    search results changes. Hits and misses are counted in TELEMETRY as
+    `<name>_cache_hits` / `<name>_cache_misses`. Without a `store`, it
+    uses whatever fingerprints.STORE is at the time of each call.
+    """
+
+    def __init__(self, name, field, store=None):
+        self.name = name
+        self.field = field
+        self._store = store
+
+    @property
+    def store(self):
+        return self._store or fingerprints.STORE
+
+    def get(self, repo):
+        """Cached result for a search item, or None"""
+        value = self.store.get(repo, self.field)
+        TELEMETRY.count(f"{self.name}_cache_{'misses' if value is None else 'hits'}")
+        return value
+
+    def put(self, repo, value, negative=None):
+        """Record a result; `negative` says why the repo could not be inspected"""
+        if value is not None:
+            self.store.put(repo, self.field, value, negative)
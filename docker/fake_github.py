@@ -0,0 +1,407 @@
+# fake_github.py
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import synthetic
+
+# Offline stand-in for the parts of the GitHub API the collectors use:
+#   GET  /search/repositories        created:/language: queries, paging, 1 000 cap
+#   GET  /repos/{owner}/{repo}       repo object
+#   GET  /repos/{o}/{r}/contents[/path]
+#   GET  /repos/{o}/{r}/commits      paged, 409 for empty repos
+#   GET  /repos/{o}/{r}/git/trees/{ref}[?recursive=1]
+#   POST /graphql                    aliased repository(owner:, name:) lookups
+#   GET  /rate_limit, /_stats
+# Point the collectors at it with GITHUB_API_URL=http://host:port.
+
+SEARCH_CAP = 1000
+QUERY_TOKEN = re.compile(r'([\w-]+):("[^"]*"|\S+)')
+GRAPHQL_REPO = re.compile(r'(\w+)\s*:\s*repository\(\s*owner\s*:\s*"([^"]+)"\s*,\s*name\s*:\s*"([^"]+)"\s*\)')
+
+
+class RateLimiter:
+    """Fixed-window budgets per token and resource, like GitHub's headers"""
+
+    def __init__(self, limits):
+        self.limits = limits        # resource -> (requests, window seconds)
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def take(self, token, resource):
+        """Spend one request; returns (allowed, rate-limit headers)"""
+        limit, length = self.limits[resource]
+        now = time.time()
+        with self.lock:
+            reset, used = self.windows.get((token, resource), (0, 0))
+            if now >= reset:
+                reset, used = int(now) + length, 0
+            allowed = used < limit
+            if allowed:
+                used += 1
+            self.windows[(token, resource)] = (reset, used)
+        return allowed, {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(0, limit - used)),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Resource": resource
+        }
+
+    def status(self, token, resource):
+        """Current budget without spending any, like GET /rate_limit"""
+        limit, length = self.limits[resource]
+        now = time.time()
+        with self.lock:
+            reset, used = self.windows.get((token, resource), (0, 0))
+        if now >= reset:
+            reset, used = int(now) + length, 0
+        return {"limit": limit, "used": used, "remaining": limit - used, "reset": reset}
+
+
+class FakeGitHub:
+    """Repo data (synthetic or recorded) plus latency and fault settings"""
+
+    def __init__(self, repos_per_day=500, seed=0, fixtures=None, latency_ms=0.0,
+                 jitter_ms=0.0, core_limit=5000, search_limit=30, graphql_limit=5000,
+                 p403=0.0, p_secondary=0.0, p5xx=0.0, search_latency_ms=0.0):
+        self.repos_per_day = repos_per_day
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.search_latency_ms = search_latency_ms
+        self.p403 = p403
+        self.p_secondary = p_secondary
+        self.p5xx = p5xx
+        self.limiter = RateLimiter({
+            "core": (core_limit, 3600),
+            "search": (search_limit, 60),
+            "graphql": (graphql_limit, 3600)
+        })
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+        self.days = {}
+        self.by_name = {}
+        if fixtures:
+            for repo in load_fixtures(fixtures):
+                self._index(repo)
+        self.fixed = bool(fixtures)
+        self.lock = threading.Lock()
+
+    def _index(self, repo):
+        day = date.fromisoformat(repo["created_at"][:10])
+        self.days.setdefault(day, []).append(repo)
+        self.by_name[repo["full_name"].lower()] = repo
+
+    def repos_on(self, day):
+        if not self.fixed and day not in self.days:
+            # ±20 % deterministic day-to-day variation in volume
+            volume = int(self.repos_per_day * random.Random(f"{self.seed}:{day}").uniform(0.8, 1.2))
+            with self.lock:
+                if day not in self.days:
+                    for repo in synthetic.repos_for_day(day, volume, self.seed):
+                        self._index(repo)
+        return self.days.get(day, [])
+
+    def repo(self, full_name):
+        repo = self.by_name.get(full_name.lower())
+        if repo is None and not self.fixed:
+            # synthetic names carry their creation day: repo-YYYYMMDD-i
+            m = re.search(r"/repo-(\d{8})-\d+$", full_name)
+            if m:
+                self.repos_on(datetime.strptime(m.group(1), "%Y%m%d").date())
+                repo = self.by_name.get(full_name.lower())
+        return repo
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def delay(self, resource="core"):
+        if self.latency_ms or self.jitter_ms:
+            ms = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            time.sleep(max(0.0, ms) / 1000)
+        if resource == "search" and self.search_latency_ms:
+            # real search pages take far longer than /contents listings
+            time.sleep(self.search_latency_ms / 1000)
+
+    def fault(self):
+        """Randomly injected failure as (status, body, extra headers), or None"""
+        roll = self.rng.random()
+        if roll < self.p5xx:
+            return self.rng.choice([500, 502, 503]), {"message": "Server Error"}, {}
+        roll -= self.p5xx
+        if roll < self.p_secondary:
+            return 403, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": "1"}
+        roll -= self.p_secondary
+        if roll < self.p403:
+            reset = str(int(time.time()) + 1)
+            return 403, {"message": "API rate limit exceeded"}, {
+                "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}
+        return None
+
+
+def public(repo):
+    """Search/repo API representation of a stored repo"""
+    owner, name = repo["full_name"].split("/", 1)
+    return {
+        "id": zlib.crc32(repo["full_name"].encode("utf-8")),
+        "name": name,
+        "full_name": repo["full_name"],
+        "owner": {"login": owner},
+        "private": False,
+        "language": repo["language"],
+        "default_branch": repo["default_branch"],
+        "created_at": repo["created_at"],
+        "pushed_at": repo["pushed_at"],
+        "size": repo["size"],
+        "stargazers_count": 0
+    }
+
+
+def load_fixtures(path):
+    """Recorded repos: a JSON list or JSONL in synthetic.make_repo's format"""
+    with open(path, "r") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def parse_search(q):
+    """created:DAY / created:A..B and language:X filters of a search query"""
+    filters = {}
+    for key, value in QUERY_TOKEN.findall(q):
+        filters[key.lower()] = value.strip('"')
+    days = []
+    if "created" in filters:
+        lo, _, hi = filters["created"].partition("..")
+        start = date.fromisoformat(lo[:10])
+        end = date.fromisoformat(hi[:10]) if hi else start
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return days, filters.get("language")
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    app = None
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, keep-alive
+    # clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method):
+        app = self.app
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+        token = self.headers.get("Authorization", "anonymous")
+        # read the body before any early return, or on a keep-alive
+        # connection it would be parsed as the next request
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+
+        if path == "/_stats":
+            return self._send(200, dict(app.stats))
+
+        resource = "search" if path.startswith("/search/") else "graphql" if path == "/graphql" else "core"
+        app.count(f"{method} {resource}")
+        app.delay(resource)
+
+        if path == "/rate_limit":
+            # free, like GitHub's
+            resources = {r: app.limiter.status(token, r) for r in app.limiter.limits}
+            return self._send(200, {"resources": resources, "rate": resources["core"]})
+
+        allowed, headers = app.limiter.take(token, resource)
+        if not allowed:
+            app.count("403 rate limit")
+            return self._send(403, {"message": "API rate limit exceeded"}, headers)
+
+        fault = app.fault()
+        if fault:
+            status, body, extra = fault
+            app.count(f"{status} injected")
+            return self._send(status, body, dict(headers, **extra))
+
+        body = None
+        if method == "POST" and path == "/graphql":
+            status, body = self.graphql(raw)
+        elif path == "/search/repositories":
+            status, body, link = self.search(params)
+            if link:
+                headers["Link"] = link
+        elif path.startswith("/repos/"):
+            status, body = self.repos(path, params)
+        else:
+            status, body = 404, {"message": "Not Found"}
+        app.count(f"{status}")
+        return self._send(status, body, headers)
+
+    def search(self, params):
+        per_page = min(100, int(params.get("per_page", 30)))
+        page = int(params.get("page", 1))
+        days, language = parse_search(params.get("q", ""))
+        matches = [repo for day in days for repo in self.app.repos_on(day)
+                   if language is None or (repo["language"] or "").lower() == language.lower()]
+        matches.sort(key=lambda repo: repo["created_at"], reverse=params.get("order") == "desc")
+        if (page - 1) * per_page >= SEARCH_CAP:
+            return 422, {"message": "Only the first 1000 search results are available"}, None
+
+        items = matches[(page - 1) * per_page: page * per_page]
+        last = max(1, -(-min(len(matches), SEARCH_CAP) // per_page))
+        link = None
+        if page < last:
+            base = f"/search/repositories?{urlencode({'q': params.get('q', ''), 'per_page': per_page})}"
+            link = f'<{base}&page={page + 1}>; rel="next", <{base}&page={last}>; rel="last"'
+        return 200, {"total_count": len(matches), "incomplete_results": False,
+                     "items": [public(repo) for repo in items]}, link
+
+    def repos(self, path, params):
+        parts = path.split("/")[2:]
+        if len(parts) < 2:
+            return 404, {"message": "Not Found"}
+        repo = self.app.repo(f"{parts[0]}/{parts[1]}")
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        rest = parts[2:]
+        empty = not repo["entries"]
+
+        if not rest:
+            return 200, public(repo)
+
+        if rest[0] == "contents":
+            if empty:
+                return 404, {"message": "This repository is empty."}
+            sub = "/".join(rest[1:]).lower()
+            if not sub:
+                return 200, [{"name": e["name"], "path": e["name"], "type": e["type"]}
+                             for e in repo["entries"]]
+            if sub == ".github" and repo["workflows"]:
+                return 200, [{"name": "workflows", "path": ".github/workflows", "type": "dir"}]
+            if sub == ".github/workflows" and repo["workflows"]:
+                return 200, [{"name": w, "path": f".github/workflows/{w}", "type": "file"}
+                             for w in repo["workflows"]]
+            if any(e["name"].lower() == sub and e["type"] == "dir" for e in repo["entries"]):
+                return 200, []
+            return 404, {"message": "Not Found"}
+
+        if rest[0] == "commits":
+            if empty:
+                return 409, {"message": "Git Repository is empty."}
+            per_page = min(100, int(params.get("per_page", 30)))
+            page = int(params.get("page", 1))
+            lo = (page - 1) * per_page
+            hi = min(repo["commits"], page * per_page)
+            return 200, [{"sha": f"{repo['head_sha'][:32]}{i:08x}", "commit": {"message": f"commit {i}"}}
+                         for i in range(lo, hi)]
+
+        if rest[:2] == ["git", "trees"]:
+            if empty:
+                return 409, {"message": "Git Repository is empty."}
+            tree = [{"path": e["name"], "type": "tree" if e["type"] == "dir" else "blob"}
+                    for e in repo["entries"]]
+            if params.get("recursive") and repo["workflows"]:
+                tree.append({"path": ".github/workflows", "type": "tree"})
+                tree += [{"path": f".github/workflows/{w}", "type": "blob"} for w in repo["workflows"]]
+            return 200, {"sha": repo["head_sha"], "tree": tree, "truncated": False}
+
+        return 404, {"message": "Not Found"}
+
+    def graphql(self, raw):
+        try:
+            query = json.loads(raw or b"{}").get("query", "")
+        except ValueError:
+            return 400, {"message": "Problems parsing JSON"}
+        data = {}
+        for alias, owner, name in GRAPHQL_REPO.findall(query):
+            repo = self.app.repo(f"{owner}/{name}")
+            data[alias] = None if repo is None else graphql_repo(repo)
+        return 200, {"data": data}
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def graphql_repo(repo):
+    """GraphQL shape used by the batched enrichment queries"""
+    empty = not repo["entries"]
+    kind = {"dir": "tree", "file": "blob"}
+    return {
+        "nameWithOwner": repo["full_name"],
+        "pushedAt": repo["pushed_at"],
+        "isEmpty": empty,
+        "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+        "defaultBranchRef": None if empty else {
+            "name": repo["default_branch"], "target": {"oid": repo["head_sha"]}},
+        "root": None if empty else {
+            "entries": [{"name": e["name"], "type": kind[e["type"]]} for e in repo["entries"]]},
+        "workflows": {"entries": [{"name": w, "type": "blob"} for w in repo["workflows"]]}
+        if repo["workflows"] else None
+    }
+
+
+def start(host="127.0.0.1", port=0, **config):
+    """Run a server on a background thread; returns (server, base URL)"""
+    FakeGitHubHandler.app = FakeGitHub(**config)
+    server = ThreadingHTTPServer((host, port), FakeGitHubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline GitHub API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repos-per-day", type=int, default=500)
+    parser.add_argument("--fixtures", help="recorded repos (JSON list or JSONL)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=0.0, help="added to every search request")
+    parser.add_argument("--core-limit", type=int, default=5000)
+    parser.add_argument("--search-limit", type=int, default=30)
+    parser.add_argument("--graphql-limit", type=int, default=5000)
+    parser.add_argument("--p403", type=float, default=0.0, help="injected primary rate-limit 403s")
+    parser.add_argument("--p-secondary", type=float, default=0.0, help="injected 403s with Retry-After")
+    parser.add_argument("--p5xx", type=float, default=0.0, help="injected 500/502/503s")
+    args = parser.parse_args()
+
+    config = {k: v for k, v in vars(args).items() if k not in ("host", "port")}
+    FakeGitHubHandler.app = FakeGitHub(**config)
+    server = ThreadingHTTPServer((args.host, args.port), FakeGitHubHandler)
+    print(f"Fake GitHub API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped fake GitHub API.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
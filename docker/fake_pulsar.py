@@ -0,0 +1,178 @@
+# fake_pulsar.py
+import itertools
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+# In-process stand-in for the subset of the pulsar-client API the pipeline
+# uses (Client, create_producer, subscribe, receive, acknowledge). Messages
+# never leave the process, so benchmarks measure our code, not the broker.
+# Consumers on the same subscription share one queue, like a Shared
+# subscription; messages sent before anyone subscribes are kept and handed
+# to the first subscription of the topic.
+
+
+class Timeout(Exception):
+    """receive() waited timeout_millis without a message"""
+
+
+class Result:
+    Ok = "Ok"
+
+
+class ConsumerType:
+    Exclusive = "Exclusive"
+    Shared = "Shared"
+    Failover = "Failover"
+    KeyShared = "KeyShared"
+
+
+class Message:
+    def __init__(self, topic, data, properties, message_id):
+        self._topic = topic
+        self._data = data
+        self._properties = properties or {}
+        self._id = message_id
+        self._publish_ts = int(time.time() * 1000)
+        self._published = time.perf_counter()
+
+    def data(self):
+        return self._data
+
+    def value(self):
+        return self._data
+
+    def topic_name(self):
+        return self._topic
+
+    def properties(self):
+        return self._properties
+
+    def publish_timestamp(self):
+        return self._publish_ts
+
+    def message_id(self):
+        return self._id
+
+
+class Broker:
+    """Topics, subscriptions and the end-to-end timings of acked messages"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.subscriptions = {}               # name -> Queue
+        self.routes = defaultdict(set)        # topic -> subscription names
+        self.backlog = defaultdict(deque)     # topic -> messages nobody subscribed to yet
+        self.published = 0
+        self.acked = 0
+        self.published_bytes = 0
+        self.latencies = []                   # seconds from send() to acknowledge()
+
+    def publish(self, topic, data, properties=None):
+        msg = Message(topic, data, properties, next(self._ids))
+        with self._lock:
+            self.published += 1
+            self.published_bytes += len(data)
+            names = self.routes.get(topic)
+            if not names:
+                self.backlog[topic].append(msg)
+                return msg.message_id()
+            queues = [self.subscriptions[name] for name in names]
+        for q in queues:
+            q.put(msg)
+        return msg.message_id()
+
+    def subscribe(self, topics, name):
+        with self._lock:
+            q = self.subscriptions.setdefault(name, queue.Queue())
+            for topic in topics:
+                self.routes[topic].add(name)
+                while self.backlog[topic]:
+                    q.put(self.backlog[topic].popleft())
+        return q
+
+    def ack(self, msg):
+        latency = time.perf_counter() - msg._published
+        with self._lock:
+            self.acked += 1
+            self.latencies.append(latency)
+
+    def wait_acked(self, count, timeout=None):
+        """Block until `count` messages were acknowledged; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.acked < count:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+
+# shared by every Client() that is not given its own broker
+BROKER = Broker()
+
+
+class Producer:
+    def __init__(self, broker, topic):
+        self._broker = broker
+        self._topic = topic
+
+    def topic(self):
+        return self._topic
+
+    def send(self, content, properties=None, **kwargs):
+        return self._broker.publish(self._topic, content, properties)
+
+    def send_async(self, content, callback=None, properties=None, **kwargs):
+        message_id = self._broker.publish(self._topic, content, properties)
+        if callback is not None:
+            callback(Result.Ok, message_id)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Consumer:
+    def __init__(self, broker, topics, subscription_name):
+        self._broker = broker
+        self._topics = topics
+        self._subscription = subscription_name
+        self._queue = broker.subscribe(topics, subscription_name)
+
+    def subscription_name(self):
+        return self._subscription
+
+    def receive(self, timeout_millis=None):
+        try:
+            return self._queue.get(timeout=None if timeout_millis is None else timeout_millis / 1000)
+        except queue.Empty:
+            raise Timeout("Pulsar error: TimeOut") from None
+
+    def acknowledge(self, msg):
+        self._broker.ack(msg)
+
+    def negative_acknowledge(self, msg):
+        self._queue.put(msg)
+
+    def close(self):
+        pass
+
+
+class Client:
+    def __init__(self, service_url=None, broker=None, **kwargs):
+        self.service_url = service_url
+        self.broker = broker or BROKER
+
+    def create_producer(self, topic, **kwargs):
+        return Producer(self.broker, topic)
+
+    def subscribe(self, topic, subscription_name, consumer_type=ConsumerType.Exclusive, **kwargs):
+        topics = [topic] if isinstance(topic, str) else list(topic)
+        return Consumer(self.broker, topics, subscription_name)
+
+    def close(self):
+        pass
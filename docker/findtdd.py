@@ -1,27 +1,14 @@
-import os
-import time
-import requests
 from datetime import datetime, timedelta, timezone
 from collections import Counter
-from dotenv import load_dotenv
+from crawl import API_URL, HEADERS, TOKEN, list_contents, search_pages
+import tracing
+import enrich
+import functools
 import re
-
-load_dotenv()
+from typing import Optional
 
 # ——— Configuration ———
-TOKEN = os.getenv("GITHUB_TOKEN")
-if not TOKEN:
-    raise RuntimeError("Please set GITHUB_TOKEN environment variable")
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
-
-# each search can return up to 100 items/page, up to 10 pages (1 000 items max)
-PER_PAGE   = 100
-MAX_PAGES  = 10
-RATE_BUFFER = 5  # seconds extra padding
+CALLS_PER_REPO = 1  # one /contents listing per inspected repo
 
 LANG_TEST_PATTERNS = {
     "Python":      {"dirs": ["test", "tests"], "files": [r"test_.*\.py", r".*_test\.py"]},
@@ -47,57 +34,113 @@ LANG_TEST_PATTERNS = {
     "Other":       {"dirs": ["test", "tests"], "files": [r".*test.*"]}  # Fallback for unknown languages
 }
 
-def github_get(url, params=None, max_retries=1):
-    for _ in range(max_retries + 1):
-        resp = requests.get(url, headers=HEADERS, params=params)
-        if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-            reset_ts = int(resp.headers["X-RateLimit-Reset"])
-            wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-            print(f"Rate limit hit. Sleeping {wait:.0f} seconds.")
-            time.sleep(wait)
-            continue  # retry after sleep
-        return resp
-    raise RuntimeError(f"Rate limit not lifted after {max_retries} retries.")
+# has-tests per repo, shared with findtdd_cicd through the fingerprint store
+CACHE = enrich.RepoCache("tdd", "has_tests")
+
+@functools.lru_cache(maxsize=None)
+def _test_patterns(language: str):
+    """(lower-cased test dirs, compiled file regexes) for a language, built once"""
+    lang_patterns = LANG_TEST_PATTERNS.get(language)
+    if not lang_patterns:
+        lang_patterns = LANG_TEST_PATTERNS["Other"]
+    dir_patterns = frozenset(d.lower() for d in lang_patterns["dirs"])
+    file_regexes = [re.compile(p) for p in lang_patterns["files"]]
+    return dir_patterns, file_regexes
 
 
-def has_unit_tests(repo_full_name: str, language: str = "Unknown") -> bool:
+def detect_unit_tests(items, language: str = "Unknown") -> bool:
     """
-    Check if a GitHub repository contains files or directories that indicate unit tests.
+    Check if a root listing (REST /contents items, or the GraphQL entries
+    from enrich.py) contains files or directories that indicate unit tests.
     Uses language-specific naming conventions where available.
     """
-    url = f"https://api.github.com/repos/{repo_full_name}/contents"
+    dir_patterns, file_regexes = _test_patterns(language)
+
+    for item in items:
+        name = item["name"].lower()
+
+        if item["type"] == "dir":
+            if name in dir_patterns:
+                return True
+
+        elif item["type"] == "file":
+            if any(pat.match(item["name"]) for pat in file_regexes):
+                return True
+
+    return False
+
+
+def root_listing(repo_full_name: str, trees=None):
+    """
+    Root entries of a repo, from the GraphQL `trees` of its search page
+    when given, else from /contents. Returns (entries, None); (None,
+    reason) when the repo is gone or empty, a negative result worth
+    caching; or (None, None) when it could not be fetched.
+    """
+    if trees is not None:
+        tree = trees.get(repo_full_name)
+        if tree is None:
+            return None, "missing"  # GitHub could not resolve it
+        if tree["empty"]:
+            return None, "empty"
+        return tree["entries"], None
     try:
         # resp = requests.get(url, headers=HEADERS)
-        resp = github_get(url)
-        if resp.status_code != 200:
-            return False
-        items = resp.json()
-        print(f"Name:{repo_full_name}, Lang:{language}, Keys:{items[0].keys()}, len:{len(items)}")
-        
-        lang_patterns = LANG_TEST_PATTERNS.get(language)
-        if not lang_patterns:
-            lang_patterns = LANG_TEST_PATTERNS["Other"]
-        dir_patterns = [d.lower() for d in lang_patterns["dirs"]]
-        file_regexes = [re.compile(p) for p in lang_patterns["files"]]
-
-        for item in items:
-            name = item["name"].lower()
-
-            if item["type"] == "dir":
-                if any(name == d or name.endswith("/" + d) for d in dir_patterns):
-                    return True
-
-            elif item["type"] == "file":
-                if any(pat.match(item["name"]) for pat in file_regexes):
-                    return True
-
+        status, entries = list_contents(repo_full_name)
+        if status in (404, 409):  # gone, or empty
+            return None, str(status)
+        return entries, None
     except Exception as e:
         print(f"Error checking {repo_full_name}: {e}")
-        return False
+        return None, None
 
-    return False
 
+def has_unit_tests(repo_full_name: str, language: str = "Unknown") -> Optional[bool]:
+    """
+    Check if a GitHub repository contains files or directories that indicate unit tests.
+    Uses language-specific naming conventions where available.
+    Returns None when the listing could not be fetched, so it is not cached.
+    """
+    entries, negative = root_listing(repo_full_name)
+    if entries is None:
+        return False if negative else None
+    return detect_unit_tests(entries, language)
+
+
+def count_with_tests(items) -> Counter:
+    """
+    Language -> repos among `items` (search results) that have unit tests.
+    Repos not pushed since the fingerprint store last saw them are not
+    inspected again.
+    """
+    lang_counter = Counter()
+    known = {repo["full_name"]: CACHE.get(repo) for repo in items if repo.get("full_name")}
+
+    # one GraphQL query per GRAPHQL_BATCH repos instead of a call per repo
+    trees = enrich.root_trees([name for name, found in known.items() if found is None],
+                              API_URL, HEADERS)
+
+    for repo in items:
+        lang = repo.get("language") or "Unknown"
+        full_name = repo.get("full_name")
+        if not full_name or not lang:
+            print(f"Skipping repo {repo} due to missing name or language.")
+            continue
+        found = known[full_name]
+        if found is None:
+            enrich.record_head(repo, trees)
+            entries, negative = root_listing(full_name, trees)
+            if entries is not None:
+                found = detect_unit_tests(entries, lang)
+            elif negative:
+                found = False
+            CACHE.put(repo, found, negative)
+        if found:
+            lang_counter[lang] += 1
+    return lang_counter
 
+
+@tracing.traced("crawl_day", lambda day: {"day": day.strftime("%Y-%m-%d")}, collector="tdd")
 def fetch_repos_with_tests_for_day(day: datetime) -> Counter:
     """
     Fetch repos created on a given day and count only those with unit tests.
@@ -105,55 +148,29 @@ def fetch_repos_with_tests_for_day(day: datetime) -> Counter:
     """
     print(f"Checking repos from {day.date()}")
     lang_counter = Counter()
-    day_str = day.strftime("%Y-%m-%d")
-    query = f"created:{day_str}"
-
-    for page in range(1, MAX_PAGES + 1):
-        params = {
-            "q": query,
-            "sort": "created",
-            "order": "asc",
-            "per_page": PER_PAGE,
-            "page": page
-        }
-        # resp = requests.get("https://api.github.com/search/repositories", headers=HEADERS, params=params)
-
-        # if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-        #     reset_ts = int(resp.headers["X-RateLimit-Reset"])
-        #     wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-        #     print(f"Rate limit hit. Waiting {wait:.0f} seconds.")
-        #     time.sleep(wait)
-        #     continue
-        resp = github_get("https://api.github.com/search/repositories", params=params)
-
-        if resp.status_code != 200:
-            raise RuntimeError(f"GitHub API error: {resp.status_code} — {resp.text}")
-
-        items = resp.json().get("items", [])
-        if not items:
-            break
-
-        for repo in items:
-            lang = repo.get("language") or "Unknown"
-            full_name = repo.get("full_name")
-            if not full_name or not lang:
-                print(f"Skipping repo {repo} due to missing name or language.")
-                continue
-            if has_unit_tests(full_name, lang):
-                lang_counter[lang] += 1
-
-        if len(items) < PER_PAGE:
-            break
-
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 0))
-        reset = int(resp.headers.get("X-RateLimit-Reset", time.time()))
-        if remaining < 5:
-            wait = max(0, reset - time.time()) + RATE_BUFFER
-            print(f"Rate limit low. Sleeping {wait:.0f} seconds.")
-            time.sleep(wait)
-
+    for items in search_pages(day):
+        lang_counter.update(count_with_tests(items))
     return lang_counter
 
+
+@tracing.traced("crawl_day", lambda day, size=None: {"day": day.strftime("%Y-%m-%d")},
+                collector="tdd", sampled=True)
+def sample_repos_with_tests_for_day(day: datetime, size: int = None):
+    """
+    Discover every repo created on `day`, check only a stratified sample
+    of `size` of them (default: from TDD_SAMPLE and the rate budget).
+    Returns (estimated language -> count, per-language sample stats).
+    """
+    # only sampled runs need the sampler and the budget probe
+    import plan
+    import sampling
+    print(f"Sampling repos from {day.date()}")
+    if size is None:
+        size = sampling.sample_size(enrich.calls_per_repo(CALLS_PER_REPO),
+                                    remaining=lambda: plan.probe_budget(TOKEN)["remaining"])
+    items = [repo for page in search_pages(day) for repo in page]
+    return sampling.estimate_day(items, count_with_tests, size)
+
 if __name__ == "__main__":
     END_DATE   = datetime.now(timezone.utc)
     START_DATE = END_DATE - timedelta(days=1)
@@ -1,51 +1,16 @@
-import os
-import time
-import requests
 from datetime import datetime, timedelta, timezone
 from collections import Counter
-from dotenv import load_dotenv
-import re
-
-load_dotenv()
+from requests import RequestException
+from crawl import API_URL, HEADERS, TOKEN, list_contents, search_pages
+from findtdd import detect_unit_tests, root_listing
+import tracing
+import enrich
+import plan
+import sampling
+from typing import Optional
 
 # ——— Configuration ———
-TOKEN = os.getenv("GITHUB_TOKEN")
-if not TOKEN:
-    raise RuntimeError("Please set GITHUB_TOKEN environment variable")
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
-
-# each search can return up to 100 items/page, up to 10 pages (1 000 items max)
-PER_PAGE = 100
-MAX_PAGES = 10
-RATE_BUFFER = 5  # seconds extra padding
-
-LANG_TEST_PATTERNS = {
-    "Python": {"dirs": ["test", "tests"], "files": [r"test_.*\.py", r".*_test\.py"]},
-    "JavaScript": {"dirs": ["test", "tests", "__tests__"], "files": [r".*\.test\.js", r".*\.spec\.js"]},
-    "Java": {"dirs": ["test", "tests", "src/test"], "files": [r"Test.*\.java", r".*Test\.java"]},
-    "TypeScript": {"dirs": ["test", "tests", "__tests__"], "files": [r".*\.test\.ts", r".*\.spec\.ts"]},
-    "C++": {"dirs": ["test", "tests"], "files": [r"test_.*\.cpp", r".*_test\.cpp"]},
-    "C#": {"dirs": ["test", "tests", "UnitTest"], "files": [r".*Tests\.cs", r"Test.*\.cs"]},
-    "PHP": {"dirs": ["test", "tests"], "files": [r"Test.*\.php", r".*_test\.php"]},
-    "Go": {"dirs": [], "files": [r".*_test\.go"]},
-    "Ruby": {"dirs": ["test", "tests", "spec"], "files": [r"test_.*\.rb", r".*_spec\.rb"]},
-    "Kotlin": {"dirs": ["test", "tests", "src/test"], "files": [r"Test.*\.kt", r".*Test\.kt"]},
-    "Swift": {"dirs": ["Tests"], "files": [r".*Tests\.swift", r"test.*\.swift"]},
-    "Rust": {"dirs": ["tests"], "files": [r".*\.rs"]},
-    "Dart": {"dirs": ["test"], "files": [r".*_test\.dart"]},
-    "Scala": {"dirs": ["test", "tests"], "files": [r".*Spec\.scala", r".*Test\.scala"]},
-    "Shell": {"dirs": ["test", "tests"], "files": [r"test_.*\.sh"]},
-    "Objective-C": {"dirs": ["Tests", "Test"], "files": [r".*Tests\.m", r"test_.*\.m"]},
-    "R": {"dirs": ["tests", "testthat"], "files": [r"test_.*\.R"]},
-    "Elixir": {"dirs": ["test"], "files": [r".*_test\.exs"]},
-    "Haskell": {"dirs": ["test", "tests"], "files": [r".*Spec\.hs", r"test_.*\.hs"]},
-    "Perl": {"dirs": ["t", "test"], "files": [r".*\.t"]},
-    "Other": {"dirs": ["test", "tests"], "files": [r".*test.*"]}  # Fallback for unknown languages
-}
+CALLS_PER_REPO = 2  # /contents for tests and for CI, plus .github when present
 
 CI_INDICATORS = [
     ".github/workflows",
@@ -56,133 +21,153 @@ CI_INDICATORS = [
     "azure-pipelines.yml"
 ]
 
-def github_get(url, params=None, max_retries=1):
-    for _ in range(max_retries + 1):
-        resp = requests.get(url, headers=HEADERS, params=params)
-        if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-            reset_ts = int(resp.headers["X-RateLimit-Reset"])
-            wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-            print(f"Rate limit hit. Sleeping {wait:.0f} seconds.")
-            time.sleep(wait)
-            continue  # retry after sleep
-        return resp
-    raise RuntimeError(f"Rate limit not lifted after {max_retries} retries.")
-
-def has_unit_tests(repo_full_name: str, language: str = "Unknown") -> bool:
-    url = f"https://api.github.com/repos/{repo_full_name}/contents"
-    try:
-        # resp = requests.get(url, headers=HEADERS)
-        resp = github_get(url)
-        if resp.status_code != 200:
-            return False
-        items = resp.json()
-        print(f"Name:{repo_full_name}, Lang:{language}, Keys:{items[0].keys()}, len:{len(items)}")
-        lang_patterns = LANG_TEST_PATTERNS.get(language, LANG_TEST_PATTERNS["Other"])
-        dir_patterns = [d.lower() for d in lang_patterns["dirs"]]
-        file_regexes = [re.compile(p) for p in lang_patterns["files"]]
-        for item in items:
-            name = item["name"].lower()
-            if item["type"] == "dir":
-                if name in dir_patterns:
-                    return True
-            elif item["type"] == "file":
-                if any(pat.match(item["name"]) for pat in file_regexes):
-                    return True
-    except Exception as e:
-        print(f"Error checking unit tests in {repo_full_name}: {e}")
+# per repo in the fingerprint store; has_tests is shared with findtdd
+TESTS = enrich.RepoCache("tdd_cicd", "has_tests")
+CI = enrich.RepoCache("tdd_cicd_ci", "has_ci")
+
+
+def detect_ci(items, has_workflows) -> bool:
+    """
+    CI config in a root listing. `has_workflows` is only called when there
+    is a .github dir, so the REST path lists it lazily.
+    """
+    for item in items:
+        name = item["name"].lower()
+        if name in CI_INDICATORS or any(ci in name for ci in CI_INDICATORS):
+            return True
+        # Handle .github directory traversal
+        if item["type"] == "dir" and name == ".github" and has_workflows():
+            return True
     return False
 
 
-def uses_continuous_integration(repo_full_name: str) -> bool:
-    url = f"https://api.github.com/repos/{repo_full_name}/contents"
+def workflows_listed(repo_full_name: str) -> bool:
+    """True if the repo's .github dir has a workflows entry"""
+    status, entries = list_contents(repo_full_name, ".github")
+    if status != 200:
+        return False
+    return any(sub_item["name"].lower() == "workflows" for sub_item in entries)
+
+
+def uses_continuous_integration(repo_full_name: str) -> Optional[bool]:
+    # the same root listing as findtdd.has_unit_tests, fetched once in a
+    # shared() block; None when it could not be fetched, like has_unit_tests
+    entries, negative = root_listing(repo_full_name)
+    if entries is None:
+        return False if negative else None
     try:
-        # resp = requests.get(url, headers=HEADERS)
-        resp = github_get(url)
-        if resp.status_code != 200:
-            return False
-        items = resp.json()
-        for item in items:
-            name = item["name"].lower()
-            if name in CI_INDICATORS or any(ci in name for ci in CI_INDICATORS):
-                return True
-            # Handle .github directory traversal
-            if item["type"] == "dir" and item["name"].lower() == ".github":
-                sub_url = f"{url}/.github"
-                sub_resp = requests.get(sub_url, headers=HEADERS)
-                if sub_resp.status_code != 200:
-                    continue
-                sub_items = sub_resp.json()
-                for sub_item in sub_items:
-                    if sub_item["name"].lower() == "workflows":
-                        return True
+        return detect_ci(entries, lambda: workflows_listed(repo_full_name))
     except Exception as e:
         print(f"Error checking CI in {repo_full_name}: {e}")
-    return False
+    return None
 
 
-def fetch_repos_with_tests_and_ci_for_day(day: datetime) -> Counter:
-    print(f"Checking repos from {day.date()}")
+def count_with_tests_and_ci(items) -> Counter:
+    """
+    Language -> repos among `items` (search results) with unit tests and
+    CI. Flags the fingerprint store still holds for a repo's pushed_at
+    (including has_tests from findtdd) are not checked again.
+    """
     lang_counter = Counter()
-    day_str = day.strftime("%Y-%m-%d")
-    query = f"created:{day_str}"
-
-    for page in range(1, MAX_PAGES + 1):
-        params = {
-            "q": query,
-            "sort": "created",
-            "order": "asc",
-            "per_page": PER_PAGE,
-            "page": page
-        }
-        resp = requests.get("https://api.github.com/search/repositories", headers=HEADERS, params=params)
-
-        if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-            reset_ts = int(resp.headers["X-RateLimit-Reset"])
-            wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-            print(f"Rate limit hit. Waiting {wait:.0f} seconds.")
-            time.sleep(wait)
+    flags = {}
+    for repo in items:
+        if repo.get("full_name"):
+            tests = TESTS.get(repo)
+            # CI only matters for repos with tests
+            flags[repo["full_name"]] = (tests, CI.get(repo) if tests else False)
+
+    # one GraphQL query per GRAPHQL_BATCH repos instead of 1-2 calls per repo
+    trees = enrich.root_trees([name for name, (tests, ci) in flags.items() if tests is None or ci is None],
+                              API_URL, HEADERS)
+
+    for repo in items:
+        lang = repo.get("language") or "Unknown"
+        full_name = repo.get("full_name")
+        if not full_name or not lang:
             continue
+        tests, ci = flags[full_name]
+        if tests is None or ci is None:
+            enrich.record_head(repo, trees)
+            entries, negative = root_listing(full_name, trees)
+            if entries is not None:
+                if trees is not None:
+                    has_workflows = lambda: trees[full_name]["has_workflows"]
+                else:
+                    has_workflows = lambda: workflows_listed(full_name)
+                tests = detect_unit_tests(entries, lang)
+                try:
+                    ci = detect_ci(entries, has_workflows) if tests else None
+                except Exception as e:
+                    print(f"Error checking CI in {full_name}: {e}")
+                    ci = None
+            elif negative:
+                tests = ci = False
+            TESTS.put(repo, tests, negative)
+            CI.put(repo, ci, negative)
+        if tests and ci:
+            lang_counter[lang] += 1
+    return lang_counter
 
-        if resp.status_code != 200:
-            raise RuntimeError(f"GitHub API error: {resp.status_code} — {resp.text}")
-
-        items = resp.json().get("items", [])
-        if not items:
-            break
-
-        for repo in items:
-            lang = repo.get("language") or "Unknown"
-            full_name = repo.get("full_name")
-            if not full_name or not lang:
-                continue
-            if has_unit_tests(full_name, lang) and uses_continuous_integration(full_name):
-                lang_counter[lang] += 1
-
-        if len(items) < PER_PAGE:
-            break
-
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 0))
-        reset = int(resp.headers.get("X-RateLimit-Reset", time.time()))
-        if remaining < 5:
-            wait = max(0, reset - time.time()) + RATE_BUFFER
-            print(f"Rate limit low. Sleeping {wait:.0f} seconds.")
-            time.sleep(wait)
 
+@tracing.traced("crawl_day", lambda day: {"day": day.strftime("%Y-%m-%d")}, collector="tdd_cicd")
+def fetch_repos_with_tests_and_ci_for_day(day: datetime) -> Counter:
+    print(f"Checking repos from {day.date()}")
+    lang_counter = Counter()
+    for items in search_pages(day):
+        lang_counter.update(count_with_tests_and_ci(items))
     return lang_counter
 
-def analyze_tdd_cicd(start: datetime, end: datetime) -> dict:
+
+@tracing.traced("crawl_day", lambda day, size=None: {"day": day.strftime("%Y-%m-%d")},
+                collector="tdd_cicd", sampled=True)
+def sample_repos_with_tests_and_ci_for_day(day: datetime, size: int = None):
+    """
+    Discover every repo created on `day`, check only a stratified sample
+    of `size` of them (default: from TDD_SAMPLE and the rate budget).
+    Returns (estimated language -> count, per-language sample stats).
+    """
+    print(f"Sampling repos from {day.date()}")
+    if size is None:
+        size = sampling.sample_size(enrich.calls_per_repo(CALLS_PER_REPO),
+                                    remaining=lambda: plan.probe_budget(TOKEN)["remaining"])
+    items = [repo for page in search_pages(day) for repo in page]
+    return sampling.estimate_day(items, count_with_tests_and_ci, size)
+
+
+def analyze_tdd_cicd(start: datetime, end: datetime, sample: bool = bool(sampling.SAMPLE)) -> dict:
+    """
+    Per-day language counts of repos with tests and CI. With `sample`, the
+    counts are estimates and "samples" holds each day's sample stats.
+    """
     agg = Counter()
+    days = {}
+    samples = {}
     current = start
     while current <= end:
-        day_counts = fetch_repos_with_tests_and_ci_for_day(current)
+        day = current.strftime("%Y-%m-%d")
+        try:
+            if sample:
+                day_counts, samples[day] = sample_repos_with_tests_and_ci_for_day(current)
+            else:
+                day_counts = fetch_repos_with_tests_and_ci_for_day(current)
+        except (RuntimeError, RequestException) as e:
+            # still failing after the retries: leave the day out, keep crawling
+            print(f"Skipping {day}: {e}")
+            current += timedelta(days=1)
+            continue
+        days[day] = dict(day_counts)
         agg.update(day_counts)
         current += timedelta(days=1)
 
-    return {
+    result = {
         "from": start.isoformat(),
         "to": end.isoformat(),
-        "languages": dict(agg)
+        "languages": dict(agg),
+        "days": days
     }
+    if sample:
+        result["samples"] = samples
+    return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+# fingerprints.py
+import argparse
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+# ——— Configuration ———
+# FINGERPRINT_DB=/data/fingerprints.sqlite keeps what the collectors found
+# per repo across runs and restarts; unset, it only lives as long as the
+# process. A result stays valid until the repo's pushed_at in the search
+# results changes.
+FINGERPRINT_DB = os.getenv("FINGERPRINT_DB")
+# empty, deleted or otherwise unreadable repos are looked at again after this long
+NEGATIVE_TTL = float(os.getenv("FINGERPRINT_NEGATIVE_TTL", 86400))
+# rows kept; the ones checked longest ago are dropped first
+MAX_ROWS = int(os.getenv("REPO_CACHE_SIZE", 50000))
+COMMIT_EVERY = 200      # writes per transaction
+
+FIELDS = ("has_tests", "has_ci", "commits", "head_sha")
+FLAGS = {"has_tests", "has_ci"}
+# what a negative repo (no contents, no commits) counts as
+NEGATIVE_VALUES = {"has_tests": False, "has_ci": False, "commits": 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    full_name  TEXT PRIMARY KEY,
+    pushed_at  TEXT,
+    head_sha   TEXT,
+    has_tests  INTEGER,
+    has_ci     INTEGER,
+    commits    INTEGER,
+    negative   TEXT,
+    checked_at REAL NOT NULL
+)
+"""
+
+
+class FingerprintStore:
+    """
+    What the collectors found per repo, keyed by full_name: pushed_at,
+    default-branch SHA, test/CI flags, commit count, and why a repo could
+    not be inspected (e.g. "404", "409", "empty"). Positive results hold
+    while pushed_at is unchanged; negative ones also expire after
+    `negative_ttl` seconds.
+    """
+
+    def __init__(self, path=":memory:", negative_ttl=NEGATIVE_TTL, max_rows=MAX_ROWS):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+        self._pending = 0
+
+    def _row(self, full_name):
+        columns = ("pushed_at",) + FIELDS + ("negative", "checked_at")
+        row = self._db.execute(f"SELECT {', '.join(columns)} FROM repos WHERE full_name = ?",
+                               (full_name,)).fetchone()
+        return None if row is None else dict(zip(columns, row))
+
+    def get(self, repo, field):
+        """`field` of a search item's repo, or None if unknown or stale"""
+        with self._lock:
+            row = self._row(repo.get("full_name"))
+        if row is None or row["pushed_at"] != repo.get("pushed_at"):
+            return None
+        if row["negative"]:
+            if time.time() - row["checked_at"] > self.negative_ttl:
+                return None
+            return NEGATIVE_VALUES.get(field, row[field])
+        value = row[field]
+        return bool(value) if field in FLAGS and value is not None else value
+
+    def put(self, repo, field=None, value=None, negative=None):
+        """
+        Record `field` = `value` for a search item, or that the repo is
+        `negative` (why it could not be inspected). A new pushed_at drops
+        everything recorded for the previous one; otherwise a negative
+        that has not expired stays until another one replaces it.
+        """
+        full_name, pushed_at = repo["full_name"], repo.get("pushed_at")
+        now = time.time()
+        with self._lock:
+            row = self._row(full_name)
+            if row is None or row["pushed_at"] != pushed_at:
+                row = dict.fromkeys(FIELDS)
+            elif negative is None and row["negative"] and now - row["checked_at"] <= self.negative_ttl:
+                # e.g. head_sha from one collector after another found the repo empty
+                negative, now = row["negative"], row["checked_at"]
+            if field is not None:
+                row[field] = int(value) if field in FLAGS else value
+            self._db.execute(
+                f"INSERT OR REPLACE INTO repos (full_name, pushed_at, {', '.join(FIELDS)}, "
+                f"negative, checked_at) VALUES (?, ?, {', '.join('?' * len(FIELDS))}, ?, ?)",
+                (full_name, pushed_at, *(row[f] for f in FIELDS), negative, now))
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._commit()
+
+    def _commit(self):
+        if self.max_rows > 0:
+            self._db.execute(
+                "DELETE FROM repos WHERE full_name IN (SELECT full_name FROM repos "
+                "ORDER BY checked_at DESC LIMIT -1 OFFSET ?)", (self.max_rows,))
+        self._db.commit()
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._db.close()
+
+    def summary(self):
+        """Row counts: total, negative by reason, and per known field"""
+        with self._lock:
+            counts = {"rows": self._db.execute("SELECT COUNT(*) FROM repos").fetchone()[0]}
+            for reason, n in self._db.execute(
+                    "SELECT negative, COUNT(*) FROM repos WHERE negative IS NOT NULL GROUP BY negative"):
+                counts[f"negative_{reason}"] = n
+            for field in FIELDS:
+                counts[field] = self._db.execute(
+                    f"SELECT COUNT(*) FROM repos WHERE {field} IS NOT NULL").fetchone()[0]
+        return counts
+
+
+# shared by the collectors of one process
+STORE = FingerprintStore(FINGERPRINT_DB or ":memory:")
+atexit.register(STORE.flush)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show what the fingerprint store holds")
+    parser.add_argument("path", nargs="?", default=FINGERPRINT_DB)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("give the database file or set FINGERPRINT_DB")
+    for name, count in FingerprintStore(args.path).summary().items():
+        print(f"{name:<20} {count:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# gharchive.py
+import argparse
+import gzip
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+from loader import WORKERS, loads, merge_counters
+from sketch import SpaceSaving
+
+# ——— Configuration ———
+# directory of GH Archive-style hourly dumps (YYYY-MM-DD-H.json.gz); when
+# set, the lang and commit producers read it instead of calling the API
+ARCHIVE_DIR = os.getenv("GHARCHIVE_DIR")
+# CreateEvents stopped carrying the repository's language years ago, so by
+# default ("none") those repos count as Unknown and the archive path costs
+# no API quota; "graphql" looks them up (enrich.fetch_languages, needs
+# GITHUB_TOKEN), about one request per GRAPHQL_BATCH repos.
+JOIN_LANGUAGES = os.getenv("GHARCHIVE_LANGUAGES", "none")
+# archive commit days are push days, not creation days like the API
+# collector's, so their shards must not replace each other
+COMMIT_SHARDS = "commits_archive"
+
+KINDS = ("lang", "commits")
+# GH Archive names each file after the UTC hour it covers
+FILE_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2})-(\d{1,2})\.json\.gz$")
+
+# cheap byte tests so only the events we fold are parsed as JSON
+_NEEDLES = {
+    "lang": (b'"CreateEvent"', b'"RepositoryEvent"'),
+    "commits": (b'"PushEvent"',)
+}
+
+
+def archive_files(directory, start=None, end=None):
+    """Hourly dumps in `directory` for the days `start`..`end` (inclusive), oldest first"""
+    first = start.strftime("%Y-%m-%d") if start else None
+    last = end.strftime("%Y-%m-%d") if end else None
+    files = []
+    for name in os.listdir(directory):
+        match = FILE_NAME.match(name)
+        if not match:
+            continue
+        day, hour = match.group(1), int(match.group(2))
+        if (first and day < first) or (last and day > last):
+            continue
+        files.append((day, hour, os.path.join(directory, name)))
+    return [path for _, _, path in sorted(files)]
+
+
+def iter_events(file_path, kinds=KINDS):
+    """
+    Stream the events of `file_path` that the `kinds` folds look at, one
+    line at a time. Lines that are not valid JSON (e.g. the tail of a
+    truncated download) are skipped.
+    """
+    needles = [n for kind in kinds for n in _NEEDLES[kind]]
+    with gzip.open(file_path, "rb") as f:
+        try:
+            for line in f:
+                if not any(n in line for n in needles):
+                    continue
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue
+        except EOFError:
+            print(f"[GHARCHIVE] {file_path} is truncated; using what was read")
+
+
+def created_repo(event):
+    """
+    (full_name, language) if `event` is a repository being created, else
+    None. The language is only in legacy events; otherwise it is None.
+    """
+    kind = event.get("type")
+    payload = event.get("payload") or {}
+    if kind == "CreateEvent" and payload.get("ref_type") == "repository":
+        # the legacy (pre-2015) timeline put the repository at the top level
+        repository = payload.get("repository") or event.get("repository") or {}
+    elif kind == "RepositoryEvent" and payload.get("action") == "created":
+        repository = payload.get("repository") or {}
+    else:
+        return None
+    name = (event.get("repo") or {}).get("name") or repository.get("full_name")
+    if not name:
+        return None
+    return name, repository.get("language")
+
+
+def push_commits(event):
+    """Commits a PushEvent carried; dumps without size or commits count it as one"""
+    payload = event.get("payload") or {}
+    if "size" in payload:
+        return payload["size"]
+    if "commits" in payload:
+        return len(payload["commits"])
+    return 1
+
+
+def fold_archive(file_path, kinds=KINDS, first=None, last=None):
+    """
+    Worker: fold one hourly dump into Counters keyed by (kind, day), where
+    "created" holds the (full_name, language) of created repos and
+    "commits" counts pushed commits per repo. Days outside `first`..`last`
+    are dropped.
+    """
+    counters = defaultdict(Counter)
+    for event in iter_events(file_path, kinds):
+        day = (event.get("created_at") or "")[:10]
+        if not day or (first and day < first) or (last and day > last):
+            continue
+        kind = event.get("type")
+        if kind == "PushEvent":
+            if "commits" in kinds:
+                name = (event.get("repo") or {}).get("name")
+                if name:
+                    counters[("commits", day)][name] += push_commits(event)
+        elif "lang" in kinds:
+            repo = created_repo(event)
+            if repo:
+                counters[("created", day)][repo] += 1
+    return dict(counters)
+
+
+def created_repos(merged):
+    """
+    {full_name: (day, language)} from the merged "created" Counters. A repo
+    can show up as both a CreateEvent and a RepositoryEvent, in different
+    hourly files, so it is counted once, on the first day it was seen.
+    """
+    repos = {}
+    for (kind, day), seen in sorted(merged.items()):
+        if kind != "created":
+            continue
+        for name, language in seen:
+            first_day, known = repos.get(name, (day, None))
+            repos[name] = (first_day, known or language)
+    return repos
+
+
+def join_languages(names):
+    """{full_name: language} looked up over GraphQL; repos of failed batches are left out"""
+    if JOIN_LANGUAGES != "graphql" or not names:
+        return {}
+    if not os.getenv("GITHUB_TOKEN"):
+        print(f"[GHARCHIVE] no GITHUB_TOKEN; {len(names):,} repos without a language count as Unknown")
+        return {}
+    import enrich
+    from crawl import API_URL, HEADERS
+    joined, failed = {}, 0
+    for i in range(0, len(names), enrich.GRAPHQL_BATCH):
+        chunk = names[i:i + enrich.GRAPHQL_BATCH]
+        try:
+            joined.update(enrich.fetch_languages(chunk, API_URL, HEADERS))
+        except Exception as e:
+            # one failed batch costs its own repos, not the others'
+            failed += len(chunk)
+            print(f"[GHARCHIVE] language lookup failed for {len(chunk)} repos: {e}")
+    if failed:
+        print(f"[GHARCHIVE] {failed:,} repos count as Unknown after failed lookups")
+    return joined
+
+
+def count_languages(merged):
+    """{"YYYY-MM-DD": Counter(language -> repos created that day)}"""
+    repos = created_repos(merged)
+    joined = join_languages([name for name, (_, language) in repos.items() if not language])
+    days = defaultdict(Counter)
+    for name, (day, language) in repos.items():
+        days[day][language or joined.get(name) or "Unknown"] += 1
+    return dict(sorted(days.items()))
+
+
+def iter_parts(directory, start=None, end=None, kinds=KINDS, workers=None):
+    """
+    Fold every dump for `start`..`end` and yield each file's Counters as
+    it finishes. Files are spread over `workers` processes (default
+    LOADER_WORKERS); the work is parsing, so it scales with cores.
+    """
+    files = archive_files(directory, start, end)
+    fold = partial(fold_archive, kinds=tuple(kinds),
+                   first=start.strftime("%Y-%m-%d") if start else None,
+                   last=end.strftime("%Y-%m-%d") if end else None)
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or len(files) <= 1:
+        for path in files:
+            yield fold(path)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+        yield from pool.map(fold, files)
+
+
+def scan(directory, start=None, end=None, kinds=KINDS, workers=None):
+    """{kind: {"YYYY-MM-DD": Counter}} over every dump for `start`..`end`"""
+    merged = {}
+    for part in iter_parts(directory, start, end, kinds, workers):
+        merge_counters(merged, part)
+    result = {kind: {} for kind in kinds}
+    if "lang" in kinds:
+        result["lang"] = count_languages(merged)
+    for (kind, day), counts in sorted(merged.items()):
+        if kind == "commits":
+            result[kind][day] = counts
+    return result
+
+
+def analyze_languages(directory, start, end, workers=None) -> dict:
+    """lang.analyze_languages, counted from the created-repo events in the dumps"""
+    days = scan(directory, start, end, ("lang",), workers)["lang"]
+    aggregated = Counter()
+    for day_counts in days.values():
+        aggregated.update(day_counts)
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "languages": dict(aggregated),
+        "days": {day: dict(counts) for day, counts in days.items()}
+    }
+
+
+def aggregate_commit_by_day(directory, start, end, workers=None) -> dict:
+    """{"YYYY-MM-DD": Counter(repo -> commits pushed that day)}"""
+    return scan(directory, start, end, ("commits",), workers)["commits"]
+
+
+def aggregate_commit(directory, start, end, workers=None) -> Counter:
+    total = Counter()
+    for day_counts in aggregate_commit_by_day(directory, start, end, workers).values():
+        total.update(day_counts)
+    return total
+
+
+def aggregate_commit_sketch(directory, start, end, capacity, workers=None) -> SpaceSaving:
+    """
+    Like aggregate_commit, but each file's counts are folded into a
+    Space-Saving sketch and dropped, so a month of pushes fits in
+    `capacity` entries.
+    """
+    sketch = SpaceSaving(capacity)
+    for part in iter_parts(directory, start, end, ("commits",), workers):
+        for counts in part.values():
+            sketch.update(counts)
+    return sketch
+
+
+def _day(value):
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language and commit counts from GH Archive hourly dumps")
+    parser.add_argument("directory", nargs="?", default=ARCHIVE_DIR)
+    parser.add_argument("--from", dest="start", type=_day, help="first day, YYYY-MM-DD (default: all)")
+    parser.add_argument("--to", dest="end", type=_day, help="last day, YYYY-MM-DD (default: all)")
+    parser.add_argument("--workers", type=int, help="processes (default: LOADER_WORKERS)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--synthetic", type=int, metavar="DAYS",
+                        help="first write DAYS days of synthetic dumps into the directory")
+    args = parser.parse_args()
+    if not args.directory:
+        parser.error("give a directory or set GHARCHIVE_DIR")
+
+    if args.synthetic:
+        import synthetic
+        first = (args.start or _day("2025-01-01")).date()
+        synthetic.write_gharchive(args.directory, first, args.synthetic)
+
+    files = archive_files(args.directory, args.start, args.end)
+    size = sum(os.path.getsize(path) for path in files)
+    started = time.perf_counter()
+    result = scan(args.directory, args.start, args.end, KINDS, args.workers)
+    elapsed = time.perf_counter() - started
+
+    languages = Counter()
+    for counts in result["lang"].values():
+        languages.update(counts)
+    commits = Counter()
+    for counts in result["commits"].values():
+        commits.update(counts)
+
+    print(f"{len(files)} files, {size / 1e6:.1f} MB compressed in {elapsed:.1f}s "
+          f"({size / 1e6 / max(elapsed, 1e-9):.1f} MB/s)")
+    print(f"\nRepos created per language ({sum(languages.values()):,}):")
+    for lang, count in languages.most_common(args.top):
+        print(f"{lang:<20} {count:>9,}")
+    print(f"\nMost pushed commits ({len(commits):,} repos):")
+    for repo, count in commits.most_common(args.top):
+        print(f"{repo:<40} {count:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# github_client.py
+import atexit
+import gzip
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+import ratecoord
+import telemetry
+import tracing
+from telemetry import TELEMETRY
+
+# ——— Configuration ———
+# GITHUB_CASSETTE=path.jsonl.gz with GITHUB_CASSETTE_MODE=record saves every
+# request/response of a real run; GITHUB_CASSETTE_MODE=replay serves them back
+# without touching the network.
+CASSETTE = os.getenv("GITHUB_CASSETTE")
+CASSETTE_MODE = os.getenv("GITHUB_CASSETTE_MODE", "replay")
+
+# never written to the archive
+REDACTED_HEADERS = {"authorization", "cookie"}
+# describe the raw transfer, not the decoded body we store
+DROPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+# Every SESSION request is retried on connection errors, timeouts, 5xx and
+# rate limits: capped exponential backoff with full jitter, Retry-After for
+# secondary limits, X-RateLimit-Reset for an exhausted quota.
+RETRIES = int(os.getenv("GITHUB_RETRIES", 5))
+BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", 1.0))
+BACKOFF_CAP = float(os.getenv("GITHUB_BACKOFF_CAP", 60))
+CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", 30))
+# > 0: a GET still unanswered after this many seconds is sent a second
+# time and whichever answer comes first wins (costs one more request)
+HEDGE_AFTER = float(os.getenv("GITHUB_HEDGE_AFTER", 0))
+RETRY_STATUSES = {500, 502, 503, 504}
+RATE_BUFFER = 5  # seconds extra padding
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Replay got a request that is not in the archive"""
+
+
+def _key(request):
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return f"{request.method} {request.url} {body.decode('utf-8', 'replace')}"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Send requests for real and append each exchange to a gzip JSONL archive"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        # one gzip member per run; gzip readers concatenate them
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        entry = {
+            "key": _key(request),
+            "request_headers": {k: v for k, v in request.headers.items()
+                                if k.lower() not in REDACTED_HEADERS},
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": {k: v for k, v in resp.headers.items()
+                        if k.lower() not in DROPPED_HEADERS},
+            "body": resp.content.decode("utf-8", "replace"),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+        return resp
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        super().close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serve responses from a recorded archive. Repeated requests get the
+    recorded responses in order, and the last one again once they run out.
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.entries = defaultdict(deque)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        entry = json.loads(line)
+                        self.entries[entry["key"]].append(entry)
+            except EOFError:
+                # recording run was killed before closing its gzip member
+                pass
+
+    def send(self, request, **kwargs):
+        key = _key(request)
+        with self._lock:
+            queue = self.entries.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"not in cassette {self.path}: {request.method} {request.url}",
+                                   request=request)
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+            self.hits += 1
+
+        body = entry["body"].encode("utf-8")
+        headers = CaseInsensitiveDict(entry["headers"])
+        headers["Content-Length"] = str(len(body))
+        if "X-RateLimit-Limit" in headers:
+            # recorded quota is stale: never make the collectors wait for it
+            headers["X-RateLimit-Remaining"] = headers["X-RateLimit-Limit"]
+            headers["X-RateLimit-Reset"] = str(int(time.time()))
+        raw = HTTPResponse(body=io.BytesIO(body), headers=dict(headers), status=entry["status"],
+                           reason=entry.get("reason"), preload_content=False,
+                           decode_content=False)
+        return self.build_response(request, raw)
+
+
+def retry_after(value):
+    """Seconds a Retry-After header asks for (delay-seconds or HTTP-date), or None if unreadable"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RetryPolicy:
+    """When and how long to wait before sending a request again"""
+
+    def __init__(self, retries=RETRIES, base=BACKOFF_BASE, cap=BACKOFF_CAP, max_wait=None, rng=None):
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.max_wait = max_wait    # bounds rate-limit waits too (e.g. 0 on replay)
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt):
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+        delay = self.rng.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        return delay if self.max_wait is None else min(delay, self.max_wait)
+
+    def wait_for(self, resp, attempt):
+        """(seconds, reason) to wait before retrying `resp`, or None to return it"""
+        retry = self._wait_for(resp, attempt)
+        if retry is None or self.max_wait is None:
+            return retry
+        return min(retry[0], self.max_wait), retry[1]
+
+    def _wait_for(self, resp, attempt):
+        headers = resp.headers
+        if resp.status_code in (403, 429):
+            if "Retry-After" in headers:
+                seconds = retry_after(headers["Retry-After"])
+                if seconds is None:
+                    return self.backoff(attempt), "backoff"
+                return seconds, "secondary_rate_limit"
+            if headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+                reset = int(headers["X-RateLimit-Reset"])
+                return max(0, reset - time.time()) + RATE_BUFFER, "rate_limit"
+            return None     # a real 403 (e.g. blocked repo) is an answer
+        if resp.status_code in RETRY_STATUSES:
+            return self.backoff(attempt), "backoff"
+        return None
+
+
+class RetryingSession(requests.Session):
+    """
+    requests.Session with the retry policy, default connect/read timeouts,
+    and optional hedging of slow GETs
+    """
+
+    def __init__(self, policy=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), hedge_after=HEDGE_AFTER,
+                 coordinator=None):
+        super().__init__()
+        self.policy = policy or RetryPolicy()
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.coordinator = coordinator
+        if coordinator:
+            self.hooks["response"].append(coordinator.on_response)
+        self._hedges = ThreadPoolExecutor(max_workers=8) if hedge_after > 0 else None
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.policy.retries + 1):
+            if self.coordinator:
+                # a permit from the budget shared with the other collectors
+                self.coordinator.acquire(kwargs.get("headers"), url)
+            try:
+                resp = self._send(method, url, kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if isinstance(e, CassetteMiss) or attempt == self.policy.retries:
+                    raise
+                delay, reason = self.policy.backoff(attempt), "backoff"
+                print(f"[GITHUB] {type(e).__name__} on {method} {url}; retrying in {delay:.1f}s")
+            else:
+                retry = self.policy.wait_for(resp, attempt)
+                if retry is None or attempt == self.policy.retries:
+                    return resp
+                delay, reason = retry
+                print(f"[GITHUB] {resp.status_code} on {method} {url}; retrying in {delay:.1f}s ({reason})")
+            TELEMETRY.count(f"retries_{reason}")
+            TELEMETRY.sleep(delay, reason)
+
+    def _send(self, method, url, kwargs):
+        """One attempt; a GET slower than hedge_after gets a duplicate"""
+        send = super().request
+        if self._hedges is None or method.upper() != "GET":
+            return send(method, url, **kwargs)
+        first = self._hedges.submit(send, method, url, **kwargs)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+        if self.coordinator and not self.coordinator.try_acquire(kwargs.get("headers"), url):
+            # the hedge would need a permit of its own; none to spare now
+            TELEMETRY.count("hedge_skipped")
+            return first.result()
+        TELEMETRY.count("hedged")
+        second = self._hedges.submit(send, method, url, **kwargs)
+        pending = {first, second}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None or not pending:
+                    return fut.result()
+
+
+def _trace_response(resp, *args, **kwargs):
+    """One span per request under the current crawl span"""
+    if not tracing.enabled():
+        return
+    end = time.time_ns()
+    name = telemetry.endpoint_name(resp.request.method, resp.request.url)
+    tracing.record("search_page" if "/search/" in name else "enrichment",
+                   end - int(resp.elapsed.total_seconds() * 1e9), end,
+                   endpoint=name, status=resp.status_code)
+
+
+def make_session(cassette=CASSETTE, mode=CASSETTE_MODE):
+    """requests.Session for the collectors, optionally recording or replaying"""
+    # a replayed run has nothing to wait for
+    policy = RetryPolicy(max_wait=0) if cassette and mode == "replay" else RetryPolicy()
+    coordinator = None
+    if ratecoord.COORDINATOR_FILE and not (cassette and mode == "replay"):
+        coordinator = ratecoord.Coordinator(ratecoord.COORDINATOR_FILE,
+                                            sleep=lambda s: TELEMETRY.sleep(s, "coordinator"))
+        print(f"[GITHUB] sharing the rate budget in {ratecoord.COORDINATOR_FILE} "
+              f"as {coordinator.collector} (priority {coordinator.priority:g})")
+    session = RetryingSession(policy, coordinator=coordinator)
+    session.hooks["response"].append(TELEMETRY.on_response)
+    session.hooks["response"].append(_trace_response)
+    if cassette:
+        if mode == "record":
+            adapter = RecordingAdapter(cassette)
+            atexit.register(adapter.close)
+        elif mode == "replay":
+            adapter = ReplayAdapter(cassette)
+        else:
+            raise ValueError(f"GITHUB_CASSETTE_MODE must be record or replay, not {mode!r}")
+        print(f"[GITHUB] {mode} cassette {cassette}")
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    return session
+
+
+def parse_json(resp):
+    """resp.json(), with the time spent counted as parsing"""
+    t0 = time.perf_counter()
+    try:
+        return resp.json()
+    finally:
+        TELEMETRY.add_time("parse", time.perf_counter() - t0)
+
+
+def rate_limit_sleep(seconds):
+    """
+    Wait for the rate limit to reset, counted as sleeping. Skipped when a
+    coordinator is pacing requests, so collectors sharing a token do not
+    all stop at once.
+    """
+    if SESSION.coordinator is None:
+        TELEMETRY.sleep(seconds, "rate_limit")
+
+
+# shared by all collectors, so connections are reused across requests
+SESSION = make_session()
+telemetry.start_exporters()
@@ -1,28 +1,29 @@
 import os
 import time
-import requests
 from datetime import datetime, timedelta, timezone
 from collections import Counter
-from dotenv import load_dotenv
-
-load_dotenv()
+from requests import RequestException
+from crawl import API_URL, RATE_BUFFER, github_get, search_pages
+from github_client import parse_json, rate_limit_sleep
+import tracing
+from telemetry import TELEMETRY
 
 # ——— Configuration ———
-TOKEN = os.getenv("GITHUB_TOKEN")
-if not TOKEN:
-    raise RuntimeError("Please set GITHUB_TOKEN environment variable")
-
-HEADERS = {
-    "Authorization": f"token {TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
-
-# each search can return up to 100 items/page, up to 10 pages (1 000 items max)
-PER_PAGE   = 100
-MAX_PAGES  = 10
-RATE_BUFFER = 5  # seconds extra padding
-
-
+# "items" tallies repo["language"] over the search pages (at most 1 000
+# repos a day); "facets" reads the total_count of one per_page=1 search per
+# language in LANG_FACETS, exact at any volume, and counts the rest
+# (unlisted languages and repos without one) as "Other"
+COUNT_MODE = os.getenv("LANG_COUNT_MODE", "items")
+DEFAULT_FACETS = [
+    "Python", "JavaScript", "TypeScript", "Java", "HTML", "Go", "C++", "C#", "C",
+    "Jupyter Notebook", "PHP", "Shell", "CSS", "Rust", "Kotlin", "Ruby", "Swift",
+    "Dart", "Vue", "Scala", "Haskell", "Lua", "R", "Objective-C", "Perl", "Elixir"
+]
+LANG_FACETS = [l.strip() for l in os.getenv("LANG_FACETS", ",".join(DEFAULT_FACETS)).split(",") if l.strip()]
+OTHER = "Other"
+
+
+@tracing.traced("crawl_day", lambda day: {"day": day.strftime("%Y-%m-%d")}, collector="lang")
 def fetch_repos_for_day(day: datetime) -> Counter:
     """
     Fetch all repos that were CREATED or PUSHED on `day`.
@@ -31,96 +32,124 @@ def fetch_repos_for_day(day: datetime) -> Counter:
     """
 
     print(f"Start at: {day}")
-    print(f"{HEADERS}")
     lang_counter = Counter()
-    day_str = day.strftime("%Y-%m-%d")
-    
-    # match repos created OR updated (pushed) on that day
-    query = f"created:{day_str}"
-
-    print(f"query: {query}")
-
-    for page in range(1, MAX_PAGES + 1):
-        params = {
-            "q":        query,
-            "sort":     "created",
-            "order":    "asc",
-            "per_page": PER_PAGE,
-            "page":     page
-        }
-        resp = requests.get(
-            "https://api.github.com/search/repositories",
-            headers=HEADERS, params=params
-        )
-        
-        #print(f"Resp URL: {resp.url}, Status: {resp.status_code}, JSON:{resp.json()}")
-        
-        # If rate-limited, sleep til reset + buffer, then retry once
-        if resp.status_code == 403 and "X-RateLimit-Reset" in resp.headers:
-            reset_ts = int(resp.headers["X-RateLimit-Reset"])
-            wait = max(0, reset_ts - time.time()) + RATE_BUFFER
-            print(f"[{day_str}] Rate limit hit; sleeping {wait:.0f}s…")
-            time.sleep(wait)
-            resp = requests.get(
-                "https://api.github.com/search/repositories",
-                headers=HEADERS, params=params
-            )
-
-        if resp.status_code != 200:
-            raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
-
-        data  = resp.json()
-        items = data.get("items", [])
-        if not items:
-            break
-
-        print(f"Items len: {len(items)}")
 
+    # match repos created on that day; pages, rate limits and the
+    # low-budget back-off are handled by crawl.search_pages
+    for items in search_pages(day):
         # tally languages
         for repo in items:
-            #print(repo.get("language"))
             lang = repo.get("language") or "Unknown"
             lang_counter[lang] += 1
 
-        # if we’re running low on remaining calls, back off until reset
-        rem   = int(resp.headers.get("X-RateLimit-Remaining", 0))
+    return lang_counter
+
+
+def search_total(query: str) -> int:
+    """
+    total_count of a repository search, fetching a single item.
+    Sleeps through rate limits like fetch_repos_for_day.
+    """
+    params = {"q": query, "per_page": 1}
+    resp = github_get(f"{API_URL}/search/repositories", params)
+
+    if resp.status_code != 200:
+        raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
+
+    # the search budget is only 30/minute: wait for the reset rather than hit it
+    if int(resp.headers.get("X-RateLimit-Remaining", 1)) == 0:
         reset = int(resp.headers.get("X-RateLimit-Reset", time.time()))
-        print(f"Rate Limit Remaining:{rem}, Rate Limit Reset:{reset}\n")
-        if rem < 5:
-            wait = max(0, reset - time.time()) + RATE_BUFFER
-            print(f"[{day_str}] Low rate-limit (remaining={rem}); sleeping {wait:.0f}s…")
-            time.sleep(wait)
+        rate_limit_sleep(max(0, reset - time.time()) + RATE_BUFFER)
+
+    return parse_json(resp).get("total_count", 0)
 
-        # fewer than a full page? we’ve exhausted this day’s results
-        if len(items) < PER_PAGE:
-            break
 
+@tracing.traced("crawl_day", lambda day, *a, **k: {"day": day.strftime("%Y-%m-%d")},
+                collector="lang", mode="facets")
+def fetch_language_facets_for_day(day: datetime, languages=None) -> Counter:
+    """
+    Exact language counts for repos created on `day` from search totals:
+    one query for the day plus one per language, whatever the volume.
+    Repos outside `languages` (default LANG_FACETS) are counted as "Other".
+    Raises RuntimeError if a language's search keeps failing, so the day
+    is skipped and re-crawled rather than sent short.
+    """
+    day_str = day.strftime("%Y-%m-%d")
+    lang_counter = Counter()
+    total = search_total(f"created:{day_str}")
+    TELEMETRY.count("repos", total)
+    if not total:
+        return lang_counter
+
+    failed = list(languages or LANG_FACETS)
+    # a facet still failing after SESSION's retries gets one more go at the
+    # end of the day before the day is given up
+    for attempt in range(2):
+        failed, pending = [], failed
+        for lang in pending:
+            try:
+                count = search_total(f'created:{day_str} language:"{lang}"')
+            except (RuntimeError, RequestException) as e:
+                if attempt:
+                    print(f"[{day_str}] Language {lang} failed: {e}")
+                failed.append(lang)
+                continue
+            if count:
+                lang_counter[lang] = count
+    if failed:
+        TELEMETRY.count("lang_facets_failed", len(failed))
+        # without them the day's languages and Other would not add up to total
+        raise RuntimeError(f"language facets failed for {day_str}: {', '.join(failed)}")
+
+    # repos created while we were counting can make the remainder negative
+    other = total - sum(lang_counter.values())
+    if other > 0:
+        lang_counter[OTHER] = other
     return lang_counter
 
 
-def aggregate_languages(start: datetime, end: datetime) -> Counter:
+def aggregate_languages_by_day(start: datetime, end: datetime, mode: str = COUNT_MODE) -> dict:
     """
-    Loop from start → end (inclusive), fetch per-day counts,
-    and accumulate into one master Counter.
+    Loop from start → end (inclusive) and keep each day's counts apart.
+    Returns {"YYYY-MM-DD": Counter(language -> count)}.
     """
-    total = Counter()
+    fetch = fetch_language_facets_for_day if mode == "facets" else fetch_repos_for_day
+    days = {}
     current = start
     while current <= end:
         print(f"Processing {current.date()}…")
-        day_counts = fetch_repos_for_day(current)
-        total.update(day_counts)
+        try:
+            days[current.strftime("%Y-%m-%d")] = fetch(current)
+        except (RuntimeError, RequestException) as e:
+            # still failing after the retries: leave the day out, keep crawling
+            print(f"Skipping {current.date()}: {e}")
         current += timedelta(days=1)
+    return days
+
+def aggregate_languages(start: datetime, end: datetime, mode: str = COUNT_MODE) -> Counter:
+    """
+    Loop from start → end (inclusive), fetch per-day counts,
+    and accumulate into one master Counter.
+    """
+    total = Counter()
+    for day_counts in aggregate_languages_by_day(start, end, mode).values():
+        total.update(day_counts)
     return total
 
-def analyze_languages(start: datetime, end: datetime) -> dict:
+def analyze_languages(start: datetime, end: datetime, mode: str = COUNT_MODE) -> dict:
     """
     Analyze GitHub repos created between `start` and `end`, grouped by language.
+    The per-day partitions are sent along so analytics can answer any window.
     """
-    aggregated = aggregate_languages(start, end)
+    days = aggregate_languages_by_day(start, end, mode)
+    aggregated = Counter()
+    for day_counts in days.values():
+        aggregated.update(day_counts)
     return {
         "from": start.isoformat(),
         "to": end.isoformat(),
-        "languages": dict(aggregated)
+        "languages": dict(aggregated),
+        "days": {day: dict(counts) for day, counts in days.items()}
     }
 
 
@@ -0,0 +1,136 @@
+# loader.py
+import json
+import os
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Prefer orjson when it is installed; it parses the same documents several
+# times faster than the stdlib and raises a ValueError subclass on bad input.
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# ——— Configuration ———
+# files smaller than this are folded in-process; forking workers costs more
+PARALLEL_MIN_BYTES = int(os.getenv("LOADER_PARALLEL_MIN_BYTES", 32 * 1024 * 1024))
+WORKERS = int(os.getenv("LOADER_WORKERS", os.cpu_count() or 1))
+
+
+def iter_records(file_path, start=0, end=None, errors=None):
+    """
+    Stream parsed JSON records from `file_path` between byte offsets
+    `start` and `end`. `start` must sit on a line boundary. Lines that
+    fail to parse are skipped and described in `errors` (a list) if given.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if end is not None and pos >= end:
+                break
+            pos += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError as e:
+                if errors is not None:
+                    errors.append(f"Invalid JSON in {file_path} at byte {pos - len(line)}: {e}")
+
+
+def split_ranges(file_path, parts, start=0, end=None):
+    """
+    Split bytes `start`..`end` of `file_path` into at most `parts` ranges,
+    each starting and ending on a line boundary. Returns (start, end) tuples.
+    """
+    end = os.path.getsize(file_path) if end is None else end
+    size = end - start
+    if parts <= 1 or size <= 0:
+        return [(start, end)]
+
+    bounds = [start]
+    with open(file_path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(start + size * i // parts, bounds[-1]))
+            f.readline()  # move to the start of the next full line
+            pos = f.tell()
+            if pos >= end:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(end)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def last_line_end(file_path, size=None):
+    """Offset just past the last newline, so a half-written line is left alone"""
+    size = os.path.getsize(file_path) if size is None else size
+    with open(file_path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            idx = chunk.rfind(b"\n")
+            if idx != -1:
+                return pos - step + idx + 1
+            pos -= step
+    return 0
+
+
+def _fold_range(file_path, start, end, fold):
+    """Worker: fold one byte range into a dict of Counters"""
+    counters = defaultdict(Counter)
+    errors = []
+    for entry in iter_records(file_path, start, end, errors):
+        fold(entry, counters)
+    return dict(counters), errors
+
+
+def merge_counters(target, other):
+    """
+    Add every Counter in `other` into the matching Counter of `target`.
+    Anything with Counter-style update() and copy() (e.g. a sketch) works.
+    """
+    for name, counter in other.items():
+        if name in target:
+            target[name].update(counter)
+        else:
+            target[name] = counter.copy()
+    return target
+
+
+def fold_file(file_path, fold, workers=None, errors=None, start=0, end=None):
+    """
+    Apply `fold(entry, counters)` to every record in `file_path` between
+    byte offsets `start` and `end`, where `counters` is a dict of named
+    Counters. Large spans are split by byte range across worker processes
+    and the per-worker Counters merged. `fold` must be a module-level
+    function (or picklable object) so it can be sent to the workers.
+    """
+    counters = defaultdict(Counter)
+    if not os.path.exists(file_path):
+        return counters
+
+    workers = WORKERS if workers is None else workers
+    end = os.path.getsize(file_path) if end is None else end
+    if end - start >= PARALLEL_MIN_BYTES:
+        ranges = split_ranges(file_path, workers, start, end)
+    else:
+        ranges = [(start, end)]
+
+    if len(ranges) == 1:
+        parts = [_fold_range(file_path, start, end, fold)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            futures = [pool.submit(_fold_range, file_path, lo, hi, fold)
+                       for lo, hi in ranges]
+            parts = [fut.result() for fut in futures]
+
+    for part, part_errors in parts:
+        merge_counters(counters, part)
+        if errors is not None:
+            errors.extend(part_errors)
+    return counters
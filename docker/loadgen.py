@@ -0,0 +1,175 @@
+# loadgen.py
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import synthetic
+from config import BROKER_URL, TOPICS
+from partials import make_partial
+
+# Publishes synthetic message streams to the four topics in config.TOPICS at
+# a target rate, so the consumer and the broker VM can be stressed without
+# waiting on GitHub. Commits per repo follow a power law, languages the
+# weights in synthetic.py, and arrivals come in Poisson bursts.
+
+REPORT_SECONDS = 5
+
+
+class BurstyArrivals:
+    """
+    Send times (seconds from start) of a Poisson process whose rate jumps
+    to `burst_factor` times the calm rate for exponentially long bursts.
+    `burst_share` is the fraction of time spent bursting; the long-run
+    mean stays `rate`. burst_factor=1 gives plain Poisson arrivals.
+    """
+
+    def __init__(self, rate, burst_factor=5.0, burst_share=0.1, burst_seconds=2.0, rng=None):
+        self.rng = rng or random.Random()
+        self.calm_rate = rate / (1 + burst_share * (burst_factor - 1))
+        self.burst_rate = self.calm_rate * burst_factor
+        self.burst_seconds = burst_seconds
+        self.calm_seconds = burst_seconds * (1 - burst_share) / burst_share if burst_share else None
+
+    def _length(self, bursting):
+        if self.calm_seconds is None:
+            return float("inf")
+        return self.rng.expovariate(1 / (self.burst_seconds if bursting else self.calm_seconds))
+
+    def __iter__(self):
+        t = 0.0
+        bursting = False
+        state_end = self._length(bursting)
+        while True:
+            rate = self.burst_rate if bursting else self.calm_rate
+            gap = self.rng.expovariate(rate)
+            if t + gap >= state_end:
+                # memoryless: restart the clock at the switch with the new rate
+                t = state_end
+                bursting = not bursting
+                state_end = t + self._length(bursting)
+                continue
+            t += gap
+            yield t
+
+
+def day_partials(day, repos):
+    """One partial aggregate per collector for a synthetic day, like the producers send"""
+    counts = {key: Counter() for key in TOPICS}
+    for repo in repos:
+        for key, payload in synthetic.record_messages(repo):
+            if key == "commits":
+                counts[key][payload["repo"]] += payload["commit_count"]
+            elif key == "tdd":
+                counts[key][payload["language"]] += payload["project_count"]
+            else:
+                counts[key].update(payload["languages"])
+    for key, day_counts in counts.items():
+        yield key, make_partial(key, day.isoformat(), day_counts)
+
+
+def messages(fmt, repos_per_day, seed, start=date(2025, 1, 1), **options):
+    """Endless (topic key, payload) stream, one synthetic day after another"""
+    day = start
+    while True:
+        repos = synthetic.repos_for_day(day, repos_per_day, seed, **options)
+        if fmt == "partial":
+            yield from day_partials(day, repos)
+        else:
+            for repo in repos:
+                yield from synthetic.record_messages(repo)
+        day += timedelta(days=1)
+
+
+def run(pulsar, args):
+    client = pulsar.Client(BROKER_URL)
+    producers = {key: client.create_producer(topic) for key, topic in TOPICS.items()}
+    sent = Counter()
+    failed = []
+
+    def on_sent(result, message_id):
+        if result != pulsar.Result.Ok:
+            failed.append(result)
+
+    stream = messages(args.format, args.repos_per_day, args.seed,
+                      alpha=args.commit_alpha, language_skew=args.language_skew)
+    arrivals = iter(BurstyArrivals(args.rate, args.burst_factor, args.burst_share,
+                                   args.burst_seconds, random.Random(args.seed))) if args.rate else None
+
+    start = time.perf_counter()
+    next_report = REPORT_SECONDS
+    total = 0
+    try:
+        for key, payload in stream:
+            now = time.perf_counter() - start
+            if arrivals is not None:
+                due = next(arrivals)
+                if due - now > 0.001:
+                    time.sleep(due - now)
+            if args.duration and now >= args.duration:
+                break
+            producers[key].send_async(json.dumps(payload).encode("utf-8"), on_sent)
+            sent[key] += 1
+            total += 1
+            if now >= next_report:
+                print(f"[LOADGEN] {now:6.1f}s sent={total} rate={total / now:.0f}/s "
+                      f"failed={len(failed)} {dict(sent)}")
+                next_report += REPORT_SECONDS
+            if args.count and total >= args.count:
+                break
+    except KeyboardInterrupt:
+        print("Stopped load generator.")
+    finally:
+        for producer in producers.values():
+            producer.flush()
+        elapsed = time.perf_counter() - start
+        print(f"[LOADGEN] sent {total} messages in {elapsed:.1f}s "
+              f"({total / elapsed if elapsed else 0:.0f}/s), failed={len(failed)}, by topic {dict(sent)}")
+        client.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish synthetic load to the Pulsar topics")
+    parser.add_argument("--rate", type=float, default=1000, help="mean messages/s (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run (0 = until --count)")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many messages")
+    parser.add_argument("--format", choices=["item", "partial"], default="item",
+                        help="one message per repo and topic, or one partial per collector and day")
+    parser.add_argument("--repos-per-day", type=int, default=5000)
+    parser.add_argument("--commit-alpha", type=float, default=synthetic.COMMIT_ALPHA,
+                        help="Pareto shape of commits per repo; lower is a heavier tail")
+    parser.add_argument("--language-skew", type=float, default=1.0,
+                        help="exponent on the language weights; >1 concentrates, 0 is uniform")
+    parser.add_argument("--burst-factor", type=float, default=5.0, help="rate multiplier during bursts")
+    parser.add_argument("--burst-share", type=float, default=0.1, help="fraction of time spent bursting")
+    parser.add_argument("--burst-seconds", type=float, default=2.0, help="mean burst length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake", action="store_true",
+                        help="publish to fake_pulsar and run pulsar_consumer.consume in-process")
+    args = parser.parse_args()
+    if not args.duration and not args.count:
+        parser.error("set --duration or --count")
+
+    if not args.fake:
+        import pulsar
+        run(pulsar, args)
+        return
+
+    import fake_pulsar
+    import pulsar_consumer
+    stop = threading.Event()
+    consumer = threading.Thread(target=pulsar_consumer.consume, daemon=True,
+                                kwargs={"pulsar": fake_pulsar, "stop": stop, "refresh_seconds": 0})
+    consumer.start()
+    total = run(fake_pulsar, args)
+    fake_pulsar.BROKER.wait_acked(total)
+    stop.set()
+    consumer.join()
+
+
+if __name__ == "__main__":
+    main()
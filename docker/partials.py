@@ -0,0 +1,95 @@
+# partials.py
+from collections import Counter
+from datetime import datetime, timezone
+
+PARTIAL_KIND = "partial"
+REDUCER_TAG = "partials"
+
+
+def shard_id(collector, day):
+    """Deterministic shard id: re-crawling the same day yields the same id"""
+    return f"{collector}:{day}"
+
+
+def make_partial(collector, day, payload, start=None, end=None, shards=None):
+    """
+    Build a partial-aggregate message for one shard (a collector's day).
+    `payload` is an associative {key: count} map; summing the payloads of
+    distinct shards gives the total for their combined window. `shards`
+    names the shard ids when they differ from `collector` (e.g. a day
+    that means something else for another source).
+    """
+    return {
+        "kind": PARTIAL_KIND,
+        "collector": collector,
+        "shard": shard_id(shards or collector, day),
+        "window": {"from": start or day, "to": end or day},
+        "payload": {key: count for key, count in payload.items() if count},
+        "produced_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def is_partial(entry):
+    return isinstance(entry, dict) and entry.get("kind") == PARTIAL_KIND
+
+
+class PartialReducer:
+    """
+    Keep one partial per shard id; a newer partial for the same shard
+    replaces the older one instead of adding to it, and replaying the same
+    partial is a no-op. Merging two reducers is associative, commutative
+    and idempotent, so byte ranges and checkpoints can be reduced in any
+    order. Follows the Counter-style update/copy used by the loader.
+    """
+
+    def __init__(self):
+        self.shards = {}    # shard id -> partial message
+
+    def __len__(self):
+        return len(self.shards)
+
+    def add(self, partial):
+        shard = partial["shard"]
+        current = self.shards.get(shard)
+        if current is None or _newer(partial, current):
+            self.shards[shard] = partial
+
+    def update(self, other):
+        partials = other.shards.values() if isinstance(other, PartialReducer) else other
+        for partial in partials:
+            self.add(partial)
+        return self
+
+    def copy(self):
+        return PartialReducer().update(self)
+
+    def partials(self):
+        return list(self.shards.values())
+
+    def total(self):
+        """Sum of the latest payload of every shard"""
+        total = Counter()
+        for partial in self.shards.values():
+            total.update(partial["payload"])
+        return total
+
+    def to_dict(self):
+        return {"__partials__": REDUCER_TAG, "shards": self.shards}
+
+    @classmethod
+    def from_dict(cls, data):
+        reducer = cls()
+        reducer.shards = dict(data["shards"])
+        return reducer
+
+
+def is_reducer(data):
+    return isinstance(data, dict) and data.get("__partials__") == REDUCER_TAG
+
+
+def _newer(partial, current):
+    """Later produced_at wins; equal stamps tie-break on the payload itself
+    so every merge order picks the same partial"""
+    if partial["produced_at"] != current["produced_at"]:
+        return partial["produced_at"] > current["produced_at"]
+    return sorted(partial["payload"].items()) > sorted(current["payload"].items())
@@ -0,0 +1,271 @@
+# pipeline.py
+import contextvars
+import os
+import queue
+import threading
+import time
+
+import tracing
+from telemetry import TELEMETRY
+
+# ——— Configuration ———
+# Search pages fetched ahead of the page being enriched (0 = fetch each
+# page only when the previous one is done), and partials waiting to be
+# published while the crawl goes on.
+PREFETCH_PAGES = int(os.getenv("PREFETCH_PAGES", 2))
+PUBLISH_QUEUE = int(os.getenv("PUBLISH_QUEUE", 16))
+POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class QueueStats:
+    """
+    Throughput and depth of one queue between two stages, summed over every
+    queue of that name. `busy` is the time a side spent working between
+    queue operations, `blocked` what the producer waited for room and
+    `starved` what the consumer waited for an item.
+    """
+
+    def __init__(self, name, producer, consumer):
+        self.name = name
+        self.producer = producer
+        self.consumer = consumer
+        self._lock = threading.Lock()
+        self.items = 0
+        self.capacity = 0
+        self.time = {"producer_busy": 0.0, "consumer_busy": 0.0, "blocked": 0.0, "starved": 0.0}
+        self.depth_total = 0
+        self.depth_max = 0
+
+    def add(self, key, seconds):
+        with self._lock:
+            self.time[key] += seconds
+
+    def got(self, depth):
+        with self._lock:
+            self.items += 1
+            self.depth_total += depth
+            self.depth_max = max(self.depth_max, depth)
+
+    def to_dict(self):
+        with self._lock:
+            t = dict(self.time)
+            return {
+                "items": self.items,
+                "capacity": self.capacity,
+                "time_s": t,
+                f"{self.producer}_per_s": self.items / t["producer_busy"] if t["producer_busy"] else None,
+                f"{self.consumer}_per_s": self.items / t["consumer_busy"] if t["consumer_busy"] else None,
+                "mean_depth": self.depth_total / self.items if self.items else 0.0,
+                "max_depth": self.depth_max
+            }
+
+
+def stats(name, producer, consumer):
+    """The QueueStats called `name`, kept in TELEMETRY so /metrics shows it"""
+    return TELEMETRY.queue(name, lambda: QueueStats(name, producer, consumer))
+
+
+class Channel:
+    """Bounded queue that times both sides into a QueueStats"""
+
+    def __init__(self, stats, depth):
+        self.stats = stats
+        self.stats.capacity = depth
+        self._queue = queue.Queue(maxsize=depth)
+        self.cancelled = threading.Event()
+        self._put_at = self._got_at = time.perf_counter()
+
+    def put(self, item):
+        """False if the consumer went away"""
+        start = time.perf_counter()
+        self.stats.add("producer_busy", start - self._put_at)
+        while not self.cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        self._put_at = time.perf_counter()
+        self.stats.add("blocked", self._put_at - start)
+        return not self.cancelled.is_set()
+
+    def get(self):
+        start = time.perf_counter()
+        self.stats.add("consumer_busy", start - self._got_at)
+        depth = self._queue.qsize()
+        item = self._queue.get()
+        self._got_at = time.perf_counter()
+        self.stats.add("starved", self._got_at - start)
+        if item is not _DONE and not isinstance(item, _Failed):
+            self.stats.got(depth)
+        return item
+
+    def done(self):
+        self._queue.task_done()
+
+    def join(self):
+        """Wait until every item put so far has been marked done()"""
+        self._queue.join()
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def _start(target):
+    """Daemon thread running `target` in a copy of the caller's context (trace spans)"""
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(target,), daemon=True)
+    thread.start()
+    return thread
+
+
+def prefetch(iterable, depth=PREFETCH_PAGES, name="search", consumer="enrich"):
+    """
+    Iterate `iterable` in a background thread, up to `depth` items ahead
+    of the caller. Its exceptions are raised in the caller, and stopping
+    early stops the thread at its next item.
+    """
+    if depth <= 0:
+        yield from iterable
+        return
+    channel = Channel(stats(f"{name}->{consumer}", name, consumer), depth)
+
+    def produce():
+        try:
+            for item in iterable:
+                if not channel.put(item):
+                    return
+            channel.put(_DONE)
+        except BaseException as e:
+            channel.put(_Failed(e))
+
+    _start(produce)
+    try:
+        while True:
+            item = channel.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        channel.cancelled.set()
+
+
+class PublishError(RuntimeError):
+    """
+    Messages a Publisher did not send: the one whose send failed and every
+    one queued behind it. `failed` holds their (content, kwargs) so the
+    caller can send them again.
+    """
+
+    def __init__(self, failed, discarded, error):
+        super().__init__(f"{len(failed)} message(s) not sent ({discarded} discarded "
+                         f"after the first failure): {error!r}")
+        self.failed = failed
+        self.discarded = discarded
+        self.error = error
+
+
+class Publisher:
+    """
+    Wraps a Pulsar producer so send() only queues the message and a
+    background thread sends it, letting the crawl go on while a message
+    waits for the broker. flush() waits for the queue to drain. Once a send
+    fails, what is still queued is discarded instead of sent, send() is
+    refused, and the next send() or flush() raises a PublishError listing
+    every message that did not go out.
+    """
+
+    def __init__(self, producer, depth=PUBLISH_QUEUE, name="publish", upstream="enrich"):
+        self.producer = producer
+        self.error = None
+        self._failed = []
+        self._lock = threading.Lock()
+        self._channel = Channel(stats(f"{upstream}->{name}", upstream, name), max(1, depth))
+        self._thread = _start(self._run) if depth > 0 else None
+
+    def _run(self):
+        while True:
+            item = self._channel.get()
+            try:
+                if item is _DONE:
+                    return
+                with self._lock:
+                    failing = self.error is not None
+                    if failing:
+                        self._failed.append(item[:2])
+                if not failing:
+                    self._send(*item)
+            except Exception as e:
+                with self._lock:
+                    self.error = e
+                    self._failed.append(item[:2])
+            finally:
+                self._channel.done()
+
+    def _raise(self):
+        with self._lock:
+            if self.error is None:
+                return
+            error, failed = self.error, self._failed
+            self.error, self._failed = None, []
+        TELEMETRY.count("publish_failed", len(failed))
+        raise PublishError(failed, len(failed) - 1, error)
+
+    def _send(self, content, kwargs, trace=None):
+        if trace is None:
+            return self.producer.send(content, **kwargs)
+        name, parent, attributes = trace
+        with tracing.span(name, parent=parent, **attributes):
+            return self.producer.send(content, properties=tracing.inject(), **kwargs)
+
+    def send(self, content, **kwargs):
+        self._raise()
+        if self._thread is None:
+            return self.producer.send(content, **kwargs)
+        self._channel.put((content, kwargs, None))
+
+    def send_traced(self, content, name, **attributes):
+        """
+        send() in a span `name` that starts when this thread sends the
+        message, as a child of the caller's current span; its traceparent
+        rides in the message properties
+        """
+        self._raise()
+        trace = (name, tracing.current().traceparent(), attributes)
+        if self._thread is None:
+            return self._send(content, {}, trace)
+        self._channel.put((content, {}, trace))
+
+    def flush(self):
+        if self._thread is not None:
+            self._channel.join()
+        self._raise()
+        self.producer.flush()
+
+    def close(self):
+        """Send what is queued and stop the thread (the producer stays open)"""
+        if self._thread is not None:
+            self._channel.put(_DONE)
+            self._thread.join()
+            self._thread = None
+        self._raise()
+
+
+def report():
+    """One line per queue: items, each side's rate and the mean/max depth"""
+    lines = []
+    for name, q in sorted(TELEMETRY.snapshot()["queues"].items()):
+        producer, consumer = name.split("->")
+        rate = lambda r: f"{r:.1f}/s" if r else "-"
+        lines.append(f"{name}: {q['items']} items, {producer} {rate(q[f'{producer}_per_s'])}, "
+                     f"{consumer} {rate(q[f'{consumer}_per_s'])}, depth {q['mean_depth']:.1f} "
+                     f"mean / {q['max_depth']} max of {q['capacity']}, "
+                     f"{consumer} waited {q['time_s']['starved']:.1f}s, "
+                     f"{producer} waited {q['time_s']['blocked']:.1f}s")
+    return lines
@@ -0,0 +1,164 @@
+# plan.py
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+from github_client import SESSION, parse_json
+
+load_dotenv()
+
+# ——— Configuration ———
+API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+# several tokens may be given comma-separated; each one is a shard
+TOKENS = [t for t in os.getenv("GITHUB_TOKENS", os.getenv("GITHUB_TOKEN", "")).split(",") if t]
+
+SEARCH_CAP = 1000       # search never returns more items per query
+PER_PAGE = 100
+CORE_LIMIT = 5000       # REST requests per token per hour
+SEARCH_LIMIT = 30       # search requests per token per minute
+
+# Non-search requests per repo when no telemetry is given: commits pages,
+# a root listing, and the root plus .github listings for CI
+REQUESTS_PER_REPO = {"lang": 0.0, "commits": 1.2, "tdd": 1.0, "tdd_cicd": 1.3}
+LATENCY_S = 0.35        # per request, sequential collectors
+
+
+def _get(url, token, params=None):
+    headers = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    resp = SESSION.get(url, headers=headers, params=params)
+    if resp.status_code != 200:
+        raise RuntimeError(f"GitHub API error {resp.status_code}: {resp.text}")
+    return parse_json(resp)
+
+
+def probe_days(days, token):
+    """total_count of repos created on each day (one per_page=1 search each)"""
+    counts = {}
+    for day in days:
+        data = _get(f"{API_URL}/search/repositories", token,
+                    {"q": f"created:{day}", "per_page": 1})
+        counts[day] = data.get("total_count", 0)
+    return counts
+
+
+def probe_budget(token):
+    """Remaining core quota and seconds until it resets; /rate_limit is free"""
+    core = _get(f"{API_URL}/rate_limit", token)["resources"]["core"]
+    return {"limit": core["limit"], "remaining": core["remaining"],
+            "reset_in": max(0, core["reset"] - time.time())}
+
+
+def load_telemetry(path):
+    """(requests per repo, seconds per request) measured by a past run's GITHUB_METRICS_FILE"""
+    with open(path) as f:
+        metrics = json.load(f)
+    endpoints = metrics.get("endpoints", {})
+    total = sum(e["latency"]["count"] for e in endpoints.values())
+    search = sum(e["latency"]["count"] for name, e in endpoints.items() if "/search/" in name)
+    repos = metrics.get("counts", {}).get("repos", 0)
+    if not total or not repos:
+        raise ValueError(f"{path} has no requests or repos to estimate from")
+    return (total - search) / repos, metrics.get("time_s", {}).get("network", 0) / total or LATENCY_S
+
+
+def day_calls(total_count, requests_per_repo):
+    """(search calls, core calls) one collector spends on one day"""
+    repos = min(total_count, SEARCH_CAP)
+    return max(1, math.ceil(repos / PER_PAGE)), repos * requests_per_repo
+
+
+def shard_runtime(search_calls, core_calls, latency, budget):
+    """
+    Seconds one token needs: the larger of doing the requests back to back
+    and waiting for enough hourly quota, plus the search rate limit.
+    """
+    work = (search_calls + core_calls) * latency
+    extra = core_calls - budget["remaining"]
+    waiting = 0.0 if extra <= 0 else budget["reset_in"] + (math.ceil(extra / budget["limit"]) - 1) * 3600
+    return max(work, waiting) + max(0.0, search_calls / SEARCH_LIMIT * 60 - work)
+
+
+def plan_shards(day_costs, budgets, latency):
+    """
+    Spread days over tokens, longest first onto the least loaded shard.
+    Returns [(token index, days, search calls, core calls, seconds)].
+    """
+    shards = [{"days": [], "search": 0, "core": 0.0} for _ in budgets]
+    for day, (search, core) in sorted(day_costs.items(), key=lambda kv: -kv[1][1] - kv[1][0]):
+        target = min(range(len(shards)), key=lambda i: shards[i]["search"] + shards[i]["core"])
+        shards[target]["days"].append(day)
+        shards[target]["search"] += search
+        shards[target]["core"] += core
+    return [(i, sorted(s["days"]), s["search"], s["core"],
+             shard_runtime(s["search"], s["core"], latency, budgets[i]))
+            for i, s in enumerate(shards) if s["days"]]
+
+
+def _hours(seconds):
+    return f"{seconds / 3600:.1f}h" if seconds >= 3600 else f"{seconds / 60:.0f}m"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate calls, runtime and shards before a crawl")
+    parser.add_argument("collectors", nargs="*", default=list(REQUESTS_PER_REPO),
+                        help=f"any of {', '.join(REQUESTS_PER_REPO)} (default: all)")
+    parser.add_argument("--days", type=int, default=7, help="days back from today, like the producers")
+    parser.add_argument("--metrics", action="append", default=[], metavar="COLLECTOR=FILE",
+                        help="GITHUB_METRICS_FILE of an earlier run of that collector")
+    parser.add_argument("--window-hours", type=float, help="exit 1 if any collector would not finish in time")
+    args = parser.parse_args()
+    unknown = set(args.collectors) - set(REQUESTS_PER_REPO)
+    if unknown:
+        parser.error(f"unknown collectors: {', '.join(sorted(unknown))}")
+
+    measured = {}
+    for item in args.metrics:
+        collector, _, path = item.partition("=")
+        measured[collector] = load_telemetry(path)
+
+    tokens = TOKENS or [None]
+    end = datetime.now(timezone.utc)
+    days = [(end - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(args.days - 1, -1, -1)]
+    totals = probe_days(days, tokens[0])
+    budgets = [probe_budget(token) for token in tokens]
+
+    print(f"{'day':<12} {'repos':>9} {'visible':>8}")
+    for day, total in totals.items():
+        print(f"{day:<12} {total:>9} {min(total, SEARCH_CAP):>8}{'  capped' if total > SEARCH_CAP else ''}")
+    print(f"\n{len(tokens)} token(s); core remaining: "
+          + ", ".join(f"{b['remaining']}/{b['limit']} (reset in {_hours(b['reset_in'])})" for b in budgets))
+
+    late = False
+    for collector in args.collectors:
+        per_repo, latency = measured.get(collector, (REQUESTS_PER_REPO[collector], LATENCY_S))
+        costs = {day: day_calls(total, per_repo) for day, total in totals.items()}
+        search = sum(s for s, _ in costs.values())
+        core = sum(c for _, c in costs.values())
+        single = shard_runtime(search, core, latency, budgets[0])
+        shards = plan_shards(costs, budgets, latency)
+        runtime = max(seconds for *_, seconds in shards)
+        source = "telemetry" if collector in measured else "defaults"
+        print(f"\n[{collector}] {per_repo:.2f} requests/repo, {latency:.2f}s/request ({source})")
+        print(f"  calls: {search} search + {core:.0f} core; one token: {_hours(single)}; "
+              f"{len(shards)} shard(s): {_hours(runtime)}")
+        for i, shard_days, s, c, seconds in shards:
+            print(f"  token {i}: {', '.join(shard_days)} "
+                  f"{s + c:.0f} calls, {_hours(seconds)}")
+        if args.window_hours and runtime > args.window_hours * 3600:
+            print(f"  does NOT fit in {args.window_hours}h")
+            late = True
+
+    if late:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# plots.py
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# matplotlib is only imported inside render_chart, in the worker processes,
+# so importing this module (or analytics) stays cheap.
+
+CHARTS = {
+    "q1": {
+        "file": "q1_top_languages.png",
+        "kind": "bar",
+        "title": "Top 10 Programming Languages by Project Count",
+        "xlabel": "Language",
+        "ylabel": "Number of Projects",
+        "color": "skyblue"
+    },
+    "q2": {
+        "file": "q2_top_commits.png",
+        "kind": "barh",
+        "title": "Top 10 Most Active Repositories by Commits",
+        "xlabel": "Number of Commits",
+        "ylabel": "Repository",
+        "color": "lightgreen"
+    },
+    "q3": {
+        "file": "q3_tdd_adoption.png",
+        "kind": "pie",
+        "title": "Top 10 Languages with Test-Driven Development"
+    },
+    "q4": {
+        "file": "q4_tdd_cicd.png",
+        "kind": "bar",
+        "title": "Top 10 Languages with TDD and CI/CD Adoption",
+        "xlabel": "Language",
+        "ylabel": "Number of Projects",
+        "color": "salmon"
+    }
+}
+
+HASH_FILE = ".plot_hashes.json"
+WORKERS = int(os.getenv("PLOT_WORKERS", len(CHARTS)))
+
+
+def render_chart(spec, data, path):
+    """Draw one chart with the non-interactive Agg backend"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels, counts = zip(*data)
+    plt.figure(figsize=(12, 6))
+    if spec["kind"] == "pie":
+        plt.pie(counts, labels=labels, autopct='%1.1f%%', startangle=140)
+    elif spec["kind"] == "barh":
+        plt.barh(labels, counts, color=spec["color"])
+    else:
+        plt.bar(labels, counts, color=spec["color"])
+        plt.xticks(rotation=45)
+    plt.title(spec["title"])
+    if "xlabel" in spec:
+        plt.xlabel(spec["xlabel"])
+        plt.ylabel(spec["ylabel"])
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    return path
+
+
+def chart_hash(spec, data):
+    """Digest of everything a chart is drawn from"""
+    blob = json.dumps([spec, [list(item) for item in data]], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _load_hashes(output_dir):
+    try:
+        with open(os.path.join(output_dir, HASH_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_all(results, output_dir, workers=None):
+    """
+    Render the charts in `results` ({chart id: top-k list}) into
+    `output_dir`, in parallel. Charts whose input top-k is unchanged since
+    the last render, and whose image still exists, are skipped. Returns
+    {chart id: error message} for the charts that failed.
+    """
+    hashes = _load_hashes(output_dir)
+    pending = {}
+    for chart, data in results.items():
+        if not data:
+            continue
+        spec = CHARTS[chart]
+        path = os.path.join(output_dir, spec["file"])
+        digest = chart_hash(spec, data)
+        if hashes.get(chart) == digest and os.path.exists(path):
+            continue
+        pending[chart] = (spec, data, path, digest)
+
+    failures = {}
+    if pending:
+        workers = WORKERS if workers is None else workers
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+            futures = {chart: pool.submit(render_chart, spec, data, path)
+                       for chart, (spec, data, path, _) in pending.items()}
+            for chart, fut in futures.items():
+                try:
+                    fut.result()
+                    hashes[chart] = pending[chart][3]
+                except Exception as e:
+                    hashes.pop(chart, None)
+                    failures[chart] = f"{type(e).__name__}: {e}"
+
+        tmp = os.path.join(output_dir, f"{HASH_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(hashes, f)
+        os.replace(tmp, os.path.join(output_dir, HASH_FILE))
+    return failures
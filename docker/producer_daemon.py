@@ -0,0 +1,230 @@
+# producer_daemon.py
+import argparse
+import heapq
+import importlib
+import itertools
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import BROKER_URL, TOPICS
+
+# ——— Configuration ———
+# One long-running process instead of a one-shot container per crawl: the
+# Pulsar client, one producer per topic, the GitHub HTTP pool and the
+# per-repo caches (enrich.RepoCache) live as long as the daemon, so an
+# incremental refresh only inspects repos pushed since the last run.
+EVERY = os.getenv("DAEMON_EVERY", "1h")             # incremental cadence
+DAYS = int(os.getenv("DAEMON_DAYS", 2))             # days an incremental run re-crawls
+FULL_EVERY = os.getenv("DAEMON_FULL_EVERY", "24h")  # full cadence
+FULL_DAYS = int(os.getenv("DAEMON_FULL_DAYS", 7))   # days a full run crawls
+FULL_AT = os.getenv("DAEMON_FULL_AT", "")           # e.g. "02:00" (UTC) for nightly fulls
+
+# collector -> (module, send function), imported on first use so the
+# daemon only pays for the collectors it runs
+SENDERS = {
+    "lang": ("pulsar_lang", "send_lang_data"),
+    "commits": ("pulsar_producer_commit", "send_commit_data"),
+    "tdd": ("pulsar_producer_findtdd", "send_tdd_data"),
+    "tdd_cicd": ("pulsar_findtdd_cicd", "send_tdd_cicd_data")
+}
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value):
+    """Seconds in "90", "90s", "15m", "1h" or "1d" """
+    value = str(value).strip().lower()
+    if value and value[-1] in _UNITS:
+        return float(value[:-1]) * _UNITS[value[-1]]
+    return float(value)
+
+
+def next_at(clock_time, now):
+    """Next time (epoch seconds, UTC) the wall clock shows "HH:MM" after `now`"""
+    hour, minute = (int(part) for part in clock_time.split(":"))
+    current = datetime.fromtimestamp(now, timezone.utc)
+    due = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if due.timestamp() <= now:
+        due += timedelta(days=1)
+    return due.timestamp()
+
+
+class Job:
+    """
+    Crawl the last `days` days of one collector every `every` seconds, or
+    daily at `at` ("HH:MM" UTC) when given
+    """
+
+    def __init__(self, collector, every, days, kind, at=""):
+        self.collector = collector
+        self.every = every
+        self.days = days
+        self.kind = kind
+        self.at = at
+
+    def next_due(self, due, now):
+        """The turn after `due`; turns missed while a crawl overran are dropped"""
+        if self.at:
+            return next_at(self.at, max(due, now))
+        due += self.every
+        while due <= now:
+            due += self.every
+        return due
+
+    def __repr__(self):
+        return f"{self.collector}/{self.kind}"
+
+
+class Daemon:
+    """Run jobs on their schedule, one at a time, sharing one Pulsar client"""
+
+    def __init__(self, pulsar, broker_url=BROKER_URL, stop=None):
+        self.client = pulsar.Client(broker_url)
+        self.producers = {}
+        self.senders = {}
+        self.stop = stop or threading.Event()
+        self.last = {}          # collector -> (started, days) of its last good run
+        self.runs = 0
+
+    def producer(self, collector):
+        """The collector's producer; sends go through a pipeline.Publisher queue"""
+        if collector not in self.producers:
+            import pipeline
+            self.producers[collector] = pipeline.Publisher(self.client.create_producer(TOPICS[collector]))
+        return self.producers[collector]
+
+    def sender(self, collector):
+        if collector not in self.senders:
+            module, name = SENDERS[collector]
+            self.senders[collector] = getattr(importlib.import_module(module), name)
+        return self.senders[collector]
+
+    def covered(self, job, due):
+        """True if a run that started at or after `due` already crawled these days"""
+        started, days = self.last.get(job.collector, (0, 0))
+        return started >= due and days >= job.days
+
+    def run_job(self, job):
+        """One crawl; a failing job is logged and tried again on its next turn"""
+        from telemetry import TELEMETRY
+        import pipeline
+        before = TELEMETRY.snapshot()["counts"]
+        started = time.time()
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=job.days - 1)
+        print(f"[DAEMON] {job}: {start.date()}..{end.date()}")
+        try:
+            self.sender(job.collector)(self.producer(job.collector), start, end)
+            self.producer(job.collector).flush()
+        except Exception as e:
+            print(f"[DAEMON] {job} failed after {time.time() - started:.1f}s: {e!r}")
+            return False
+        self.last[job.collector] = (started, job.days)
+        self.runs += 1
+        after = TELEMETRY.snapshot()["counts"]
+        delta = {name: n - before.get(name, 0) for name, n in sorted(after.items())
+                 if n != before.get(name, 0)}
+        print(f"[DAEMON] {job} done in {time.time() - started:.1f}s {delta}")
+        for line in pipeline.report():
+            print(f"[DAEMON]   {line}")
+        return True
+
+    def run(self, jobs, once=False):
+        """
+        Run `jobs`, a list of (first due time, Job), until stopped. With
+        `once`, every job runs a single time.
+        """
+        seq = itertools.count()
+        # fulls sort before incrementals due at the same time
+        queue = [(due, job.kind != "full", next(seq), job) for due, job in jobs]
+        heapq.heapify(queue)
+        while queue and not self.stop.is_set():
+            due, rank, _, job = heapq.heappop(queue)
+            if self.stop.wait(max(0.0, due - time.time())):
+                break
+            if self.covered(job, due):
+                print(f"[DAEMON] {job}: skipped, a wider run just crawled it")
+            else:
+                self.run_job(job)
+            if not once:
+                heapq.heappush(queue, (job.next_due(due, time.time()), rank, next(seq), job))
+
+    def close(self):
+        for collector, producer in self.producers.items():
+            try:
+                producer.flush()
+                producer.close()
+            except Exception as e:
+                print(f"[DAEMON] {collector}: {e!r}")
+        self.client.close()
+
+
+def schedule(collectors, every, days, full_every, full_days, full_at=""):
+    """
+    [(first due time, Job)]: a full crawl of each collector right away to
+    warm the caches, then incrementals every `every` (none if 0) and fulls
+    every `full_every`, or daily at `full_at`
+    """
+    now = time.time()
+    jobs = []
+    for collector in collectors:
+        jobs.append((now, Job(collector, full_every, full_days, "full", full_at)))
+        if every:
+            jobs.append((now + every, Job(collector, every, days, "incremental")))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the producers on a schedule in one long-lived process")
+    parser.add_argument("collectors", nargs="*", metavar="collector",
+                        help=f"any of {', '.join(SENDERS)} (default: all)")
+    parser.add_argument("--every", default=EVERY, help="incremental cadence, e.g. 1h (0 = none)")
+    parser.add_argument("--days", type=int, default=DAYS, help="days an incremental run re-crawls")
+    parser.add_argument("--full-every", default=FULL_EVERY, help="full cadence, e.g. 24h")
+    parser.add_argument("--full-days", type=int, default=FULL_DAYS, help="days a full run crawls")
+    parser.add_argument("--full-at", default=FULL_AT, help="run fulls daily at HH:MM UTC instead")
+    parser.add_argument("--once", action="store_true", help="one full run per collector, then exit")
+    parser.add_argument("--fake", action="store_true",
+                        help="publish to fake_pulsar and run pulsar_consumer.consume in-process")
+    args = parser.parse_args()
+
+    unknown = set(args.collectors) - set(SENDERS)
+    if unknown:
+        parser.error(f"unknown collectors: {', '.join(sorted(unknown))}")
+    collectors = args.collectors or list(SENDERS)
+    every = 0 if args.once else parse_duration(args.every)
+    jobs = schedule(collectors, every, args.days, parse_duration(args.full_every),
+                    args.full_days, args.full_at)
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        # the current crawl finishes and is flushed before the daemon exits
+        signal.signal(sig, lambda *_: stop.set())
+
+    if args.fake:
+        import fake_pulsar as pulsar
+        import pulsar_consumer
+        consumer_stop = threading.Event()
+        consumer = threading.Thread(target=pulsar_consumer.consume, daemon=True,
+                                    kwargs={"pulsar": pulsar, "stop": consumer_stop, "refresh_seconds": 0})
+        consumer.start()
+    else:
+        import pulsar
+
+    daemon = Daemon(pulsar, stop=stop)
+    print(f"[DAEMON] {', '.join(repr(job) for _, job in jobs)}")
+    try:
+        daemon.run(jobs, once=args.once)
+    finally:
+        daemon.close()
+        if args.fake:
+            consumer_stop.set()
+            consumer.join()
+    print(f"[DAEMON] stopped after {daemon.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
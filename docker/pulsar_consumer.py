@@ -1,9 +1,12 @@
 # pulsar_consumer.py
 
-import pulsar
 import json
 import os
+import subprocess
+import sys
+import time
 from config import BROKER_URL, TOPICS
+import tracing
 
 # Map topics to filenames
 TOPIC_FILE_MAP = {
@@ -13,7 +16,30 @@ TOPIC_FILE_MAP = {
     TOPICS["tdd_cicd"]: "data_tdd_cicd.jsonl"
 }
 
-def consume():
+# Analytics is incremental, so ANALYTICS_REFRESH_SECONDS=60 refreshes the
+# report while consuming; by default (0) it only runs once the consumer stops.
+REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", 0))
+ANALYTICS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics.py")
+
+def refresh_analytics(running=None):
+    """
+    Fold newly written lines into the report in a separate process, so
+    receiving goes on meanwhile and analytics' worker pools are not forked
+    from a process running Pulsar client threads. Returns the process;
+    while `running` has not finished, no second one is started.
+    """
+    if running is not None and running.poll() is None:
+        return running
+    return subprocess.Popen([sys.executable, ANALYTICS_SCRIPT])
+
+def consume(pulsar=None, stop=None, refresh_seconds=REFRESH_SECONDS):
+    """
+    Write every message to its topic's JSONL file until interrupted or
+    `stop` (a threading.Event) is set. `pulsar` is the client library;
+    benchmarks pass fake_pulsar to run without a broker.
+    """
+    if pulsar is None:
+        import pulsar
     client = pulsar.Client(BROKER_URL)
     consumer = client.subscribe(
         list(TOPICS.values()),
@@ -21,30 +47,47 @@ def consume():
         consumer_type=pulsar.ConsumerType.Shared
     )
 
+    refresher = None
     try:
         print("Subscribed to topics:")
         for topic in TOPICS.values():
             print(f" - {topic}")
 
-        while True:
-            msg = consumer.receive()
-            data = json.loads(msg.data())
+        last_refresh = time.monotonic()
+        while stop is None or not stop.is_set():
+            if refresh_seconds and time.monotonic() - last_refresh >= refresh_seconds:
+                refresher = refresh_analytics(refresher)
+                last_refresh = time.monotonic()
+
+            try:
+                msg = consumer.receive(timeout_millis=1000)
+            except pulsar.Timeout:
+                continue
             topic = msg.topic_name()
-            
-            print(f"[CONSUMER] Received from {topic}: {json.dumps(data, indent=2)}")
+            parent = tracing.extract(msg.properties())
+            # time spent in the broker, from publish to delivery
+            tracing.record("receive", msg.publish_timestamp() * 1_000_000, time.time_ns(),
+                           parent=parent, topic=topic)
+
+            with tracing.span("write", parent=parent, topic=topic):
+                data = json.loads(msg.data())
+
+                print(f"[CONSUMER] Received from {topic}: {json.dumps(data, indent=2)}")
 
-            # Write to appropriate file
-            if topic in TOPIC_FILE_MAP:
-                file_path = TOPIC_FILE_MAP[topic]
-                with open(file_path, "a") as f:
-                    f.write(json.dumps(data) + "\n")
+                # Write to appropriate file
+                if topic in TOPIC_FILE_MAP:
+                    file_path = TOPIC_FILE_MAP[topic]
+                    with open(file_path, "a") as f:
+                        f.write(json.dumps(data) + "\n")
 
-            consumer.acknowledge(msg)
+                consumer.acknowledge(msg)
 
     except KeyboardInterrupt:
         print("Stopped consumer.")
     finally:
         client.close()
+        if refresher is not None:
+            refresher.wait()
 
 if __name__ == "__main__":
     try:
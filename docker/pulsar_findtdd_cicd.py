@@ -1,24 +1,36 @@
 # pulsar_findtdd_cicd.py
 
 import json
-import pulsar
 from datetime import datetime, timedelta, timezone
 from findtdd_cicd import analyze_tdd_cicd
 from config import BROKER_URL, TOPICS
+from partials import make_partial
+import tracing
 
-client = pulsar.Client(BROKER_URL)
-producer = client.create_producer(TOPICS["tdd_cicd"])
 
-# Analyze one day window
-end = datetime.now(timezone.utc)
-start = end - timedelta(days=6)
+def send_tdd_cicd_data(producer, start, end):
+    """Crawl `start`..`end` and send one partial aggregate per day"""
+    with tracing.span("produce", collector="tdd_cicd"):
+        result = analyze_tdd_cicd(start, end)
 
-result = analyze_tdd_cicd(start, end)
+        # Send one partial aggregate per day
+        for day, counts in result["days"].items():
+            message = make_partial("tdd_cicd", day, counts)
+            if day in result.get("samples", {}):
+                message["sample"] = result["samples"][day]
+            tracing.send(producer, json.dumps(message).encode("utf-8"), shard=message["shard"])
 
-# Send result
-payload = json.dumps(result).encode("utf-8")
-producer.send(payload)
+    print("TDD + CI/CD stats sent to Pulsar.")
 
-print("TDD + CI/CD stats sent to Pulsar.")
 
-client.close()
+if __name__ == "__main__":
+    import pulsar
+    client = pulsar.Client(BROKER_URL)
+    producer = client.create_producer(TOPICS["tdd_cicd"])
+
+    # Analyze one day window
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=6)
+    send_tdd_cicd_data(producer, start, end)
+
+    client.close()
@@ -1,26 +1,41 @@
 # pulsar_lang.py
 
 import json
-import pulsar
 from datetime import datetime, timedelta, timezone
-from lang import analyze_languages
 from config import BROKER_URL, TOPICS
-
-client = pulsar.Client(BROKER_URL)
-producer = client.create_producer(TOPICS["lang"])
+from partials import make_partial
+import gharchive
+import tracing
 
 # Analyze a 7-day window
 DAYS_BACK = 7
-end = datetime.now(timezone.utc)
-start = end - timedelta(days=DAYS_BACK)
 
-result = analyze_languages(start, end)
+
+def send_lang_data(producer, start, end):
+    """Crawl `start`..`end` and send one partial aggregate per day"""
+    with tracing.span("produce", collector="lang"):
+        if gharchive.ARCHIVE_DIR:
+            # local GH Archive dumps: no API calls and no token needed
+            result = gharchive.analyze_languages(gharchive.ARCHIVE_DIR, start, end)
+        else:
+            from lang import analyze_languages
+            result = analyze_languages(start, end)
+
+        # Send one partial aggregate per day
+        for day, counts in result["days"].items():
+            message = make_partial("lang", day, counts)
+            tracing.send(producer, json.dumps(message).encode("utf-8"), shard=message["shard"])
+
+    print("Language stats sent to Pulsar.")
 
 
-# Send result
-payload = json.dumps(result).encode("utf-8")
-producer.send(payload)
+if __name__ == "__main__":
+    import pulsar
+    client = pulsar.Client(BROKER_URL)
+    producer = client.create_producer(TOPICS["lang"])
 
-print("Language stats sent to Pulsar.")
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=DAYS_BACK)
+    send_lang_data(producer, start, end)
 
-client.close()
+    client.close()
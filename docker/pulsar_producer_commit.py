@@ -1,28 +1,77 @@
 # pulsar_producer_commit.py
 
 from datetime import datetime, timedelta, timezone
-import pulsar
+from functools import partial
 import json
-from commit import aggregate_commit
+import os
 from config import BROKER_URL, TOPICS
+from partials import make_partial
+from sketch import SpaceSaving
+import gharchive
+import tracing
+
+# 0 sends exact per-day partials; N > 0 sends each day as a mergeable
+# Space-Saving sketch of its top N repos
+SKETCH_CAPACITY = int(os.getenv("COMMIT_SKETCH_CAPACITY", 0))
+
+@tracing.traced("produce", collector="commits")
+def send_commit_data(producer, START_DATE, END_DATE):
+    """Crawl `START_DATE`..`END_DATE` and send one partial (or sketch) per day"""
+    if gharchive.ARCHIVE_DIR:
+        # commits pushed per day from local GH Archive dumps, no API calls;
+        # days are push days rather than the repos' creation days
+        aggregate_by_day = partial(gharchive.aggregate_commit_by_day, gharchive.ARCHIVE_DIR)
+        shards = gharchive.COMMIT_SHARDS
+    else:
+        from commit import aggregate_commit_by_day as aggregate_by_day
+        shards = None
+
+    if SKETCH_CAPACITY:
+        # one day at a time, under the same shard id as the day's exact
+        # partial, so overlapping windows and re-crawls replace it
+        current = START_DATE
+        while current <= END_DATE:
+            day = current.strftime("%Y-%m-%d")
+            sketch = _day_sketch(aggregate_by_day, current)
+            current += timedelta(days=1)
+            if sketch is None:
+                continue
+            message = make_partial("commits", day, {}, shards=shards)
+            message["sketch"] = sketch.to_dict()
+            tracing.send(producer, json.dumps(message).encode("utf-8"), shard=message["shard"], sketch=len(sketch))
+            print(f"[COMMIT PRODUCER] Sent shard {message['shard']}: sketch of {len(sketch)} repos, "
+                  f"max error {sketch.max_error()}")
+        return
+
+    results = aggregate_by_day(START_DATE, END_DATE)
+
+    # one partial aggregate per day; re-crawling a day replaces its shard
+    for day, counts in results.items():
+        message = make_partial("commits", day, counts, shards=shards)
+        tracing.send(producer, json.dumps(message).encode("utf-8"), shard=message["shard"])
+        print(f"[COMMIT PRODUCER] Sent shard {message['shard']} with {len(message['payload'])} repos")
+
+def _day_sketch(aggregate_by_day, day):
+    """Space-Saving sketch of one day's commits, or None if the day failed"""
+    if gharchive.ARCHIVE_DIR:
+        # file by file, so a day of pushes never sits in one Counter
+        sketch = gharchive.aggregate_commit_sketch(gharchive.ARCHIVE_DIR, day, day, SKETCH_CAPACITY)
+    else:
+        counts = aggregate_by_day(day, day).get(day.strftime("%Y-%m-%d"))
+        if counts is None:
+            return None
+        sketch = SpaceSaving(SKETCH_CAPACITY)
+        sketch.update(counts)
+    return sketch
 
 def produce_commit_data():
+    import pulsar
     client = pulsar.Client(BROKER_URL)
     producer = client.create_producer(TOPICS["commits"])
 
     END_DATE   = datetime.now(timezone.utc)
     START_DATE = END_DATE - timedelta(days=6)
-    
-    results = aggregate_commit(START_DATE, END_DATE)
-
-    for repo, count in results.items():
-        message = {
-            "repo": repo,
-            "commit_count": count,
-            "timestamp": datetime.now().isoformat()
-        }
-        producer.send(json.dumps(message).encode("utf-8"))
-        print(f"[COMMIT PRODUCER] Sent: {message}")
+    send_commit_data(producer, START_DATE, END_DATE)
 
     client.close()
 
@@ -1,32 +1,51 @@
 # pulsar_producer_findtdd.py
 
 from datetime import datetime, timedelta, timezone
-import pulsar
 import json
-from findtdd import fetch_repos_with_tests_for_day
+from requests import RequestException
+from findtdd import fetch_repos_with_tests_for_day, sample_repos_with_tests_for_day
 from config import BROKER_URL, TOPICS
+from partials import make_partial
+import pipeline
+import sampling
+import tracing
+
+@tracing.traced("produce", collector="tdd")
+def send_tdd_data(producer, START_DATE, END_DATE):
+    """Crawl `START_DATE`..`END_DATE` and send one partial aggregate per day"""
+    current = START_DATE
+    while current <= END_DATE:
+        try:
+            if sampling.SAMPLE:
+                # estimated counts; the sample stats let analytics show intervals
+                counts, stats = sample_repos_with_tests_for_day(current)
+                message = make_partial("tdd", current.strftime("%Y-%m-%d"), counts)
+                message["sample"] = stats
+            else:
+                counts = fetch_repos_with_tests_for_day(current)
+                message = make_partial("tdd", current.strftime("%Y-%m-%d"), counts)
+        except (RuntimeError, RequestException) as e:
+            # no partial for the day: its shard keeps the last good crawl
+            print(f"[TDD PRODUCER] Skipping {current.date()}: {e}")
+            current += timedelta(days=1)
+            continue
+        tracing.send(producer, json.dumps(message).encode("utf-8"), shard=message["shard"])
+        print(f"[TDD PRODUCER] Sent: {message}")
+        current += timedelta(days=1)
 
 def produce_tdd_data():
+    import pulsar
     client = pulsar.Client(BROKER_URL)
-    producer = client.create_producer(TOPICS["tdd"])
+    # a day's partial is sent while the next day is crawled
+    producer = pipeline.Publisher(client.create_producer(TOPICS["tdd"]))
 
     
     END_DATE   = datetime.now(timezone.utc)
     START_DATE = END_DATE - timedelta(days=6)
-    
-    current = START_DATE
-    while current <= END_DATE:
-        counts = fetch_repos_with_tests_for_day(current)
-        for lang, count in counts.items():
-            message = {
-                "language": lang,
-                "project_count": count,
-                "timestamp": datetime.now().isoformat()
-            }
-            producer.send(json.dumps(message).encode("utf-8"))
-            print(f"[TDD PRODUCER] Sent: {message}")
-        current += timedelta(days=1)
+    send_tdd_data(producer, START_DATE, END_DATE)
 
+    producer.flush()
+    producer.close()
     client.close()
 
 if __name__ == "__main__":
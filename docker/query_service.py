@@ -0,0 +1,185 @@
+# query_service.py
+import json
+import os
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import analytics
+from checkpoint import IncrementalScanner
+from engine import top_k
+from rollup import RollupCube
+
+# ——— Configuration ———
+HOST = os.getenv("QUERY_HOST", "127.0.0.1")
+PORT = int(os.getenv("QUERY_PORT", 8090))
+REFRESH_SECONDS = int(os.getenv("QUERY_REFRESH_SECONDS", 30))
+
+# collector name -> (all-time Counter, rollup cube) holding its language counts
+LANGUAGE_COLLECTORS = {
+    "lang": ("languages", "lang_days"),
+    "tdd": ("tdd", "tdd_days"),
+    "tdd_cicd": ("tdd_cicd", "tdd_cicd_days")
+}
+
+
+class Snapshot:
+    """Immutable view of the index; requests read whichever one is current"""
+
+    def __init__(self, counters, cubes, offsets):
+        self.counters = counters
+        self.cubes = cubes
+        self.offsets = offsets
+        self.built_at = time.time()
+
+    def counts(self, all_time, cube, start=None, end=None):
+        """All-time Counter, or a slice-and-sum of the cube for a window"""
+        if start is None and end is None:
+            return self.counters.get(all_time, Counter())
+        return self.cubes[cube].window(start, end)
+
+
+class Index:
+    """
+    In-memory index over the consumer's JSONL files. A background thread
+    folds only newly appended lines (same folds as analytics.py, state kept
+    in memory) and rebuilds the cubes of the sources that grew. Queries
+    never scan files.
+    """
+
+    def __init__(self, engine=analytics.ENGINE):
+        self.scanner = IncrementalScanner(engine)
+        self.snapshot = Snapshot({}, {name: RollupCube() for _, name in self._cube_names()}, {})
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _cube_names():
+        return [(name[: -len("_days")], name) for name in analytics.ROLLUP_CUBES]
+
+    def refresh(self):
+        before = self.scanner.offsets()
+        errors = []
+        counters = analytics.resolve_partials(self.scanner.scan(errors=errors))
+        for msg in errors:
+            print(f"[QUERY] {msg}")
+        after = self.scanner.offsets()
+        if after == before and self.snapshot.offsets:
+            return False
+
+        cubes = dict(self.snapshot.cubes)
+        for source, name in self._cube_names():
+            if after.get(source) != before.get(source) or not self.snapshot.offsets:
+                cubes[name] = RollupCube.from_counter(counters.get(name, Counter()))
+        self.snapshot = Snapshot(counters, cubes, after)
+        return True
+
+    def run_refresher(self, interval=REFRESH_SECONDS):
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception:
+                traceback.print_exc()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _parse_day(value):
+    return date.fromisoformat(value) if value else None
+
+
+def _share(part, total, exclude=("Unknown", "Other")):
+    """Per-language and overall share of `part` in `total`"""
+    languages = {
+        lang: {"count": part[lang], "total": total[lang],
+               "share": part[lang] / total[lang] if total[lang] else None}
+        for lang in sorted(part) if lang not in exclude
+    }
+    num = sum(n for lang, n in part.items() if lang not in exclude)
+    den = sum(n for lang, n in total.items() if lang not in exclude)
+    return {"count": num, "total": den, "share": num / den if den else None, "languages": languages}
+
+
+def handle_query(snapshot, path, params):
+    """Answer one request from a snapshot; returns (status, JSON body)"""
+    k = int(params.get("k", 10))
+    if k < 1:
+        return 400, {"error": "k must be at least 1"}
+    start = _parse_day(params.get("from"))
+    end = _parse_day(params.get("to"))
+    exclude = () if params.get("unknown") == "1" else ("Unknown", "Other")
+
+    if path == "/health":
+        return 200, {"built_at": snapshot.built_at, "offsets": snapshot.offsets}
+
+    if path == "/top/languages":
+        collector = params.get("collector", "lang")
+        if collector not in LANGUAGE_COLLECTORS:
+            return 400, {"error": f"collector must be one of {sorted(LANGUAGE_COLLECTORS)}"}
+        counts = snapshot.counts(*LANGUAGE_COLLECTORS[collector], start, end)
+        return 200, {"collector": collector, "top": top_k(counts, k, exclude)}
+
+    if path == "/top/repos":
+        if analytics.SKETCH_CAPACITY and (start or end):
+            return 501, {"error": "windowed /top/repos needs exact counts; "
+                                  "ANALYTICS_SKETCH_CAPACITY keeps only the all-time sketch"}
+        counts = snapshot.counts(analytics.Q2.key, "commits_days", start, end)
+        return 200, {"top": top_k(counts, k)}
+
+    if path in ("/share/tdd", "/share/ci"):
+        total = snapshot.counts(*LANGUAGE_COLLECTORS["lang"], start, end)
+        tdd = snapshot.counts(*LANGUAGE_COLLECTORS["tdd"], start, end)
+        if path == "/share/tdd":
+            return 200, _share(tdd, total, exclude)
+        cicd = snapshot.counts(*LANGUAGE_COLLECTORS["tdd_cicd"], start, end)
+        body = _share(cicd, total, exclude)
+        body["of_tdd"] = _share(cicd, tdd, exclude)["share"]
+        return 200, body
+
+    return 404, {"error": f"unknown endpoint {path}"}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    index = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            status, body = handle_query(self.index.snapshot, url.path, params)
+        except ValueError as e:
+            status, body = 400, {"error": str(e)}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT, interval=REFRESH_SECONDS):
+    index = Index()
+    index.refresh()
+    threading.Thread(target=index.run_refresher, args=(interval,), daemon=True).start()
+
+    QueryHandler.index = index
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    print(f"[QUERY] Serving on http://{host}:{port} (refresh every {interval}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped query service.")
+    finally:
+        index.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
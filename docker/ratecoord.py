@@ -0,0 +1,218 @@
+# ratecoord.py
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# ——— Configuration ———
+# GITHUB_RATE_COORDINATOR=/tmp/github-budget.json makes every collector
+# process on the host draw request permits from one file-locked budget per
+# token and resource instead of each draining X-RateLimit-Remaining alone.
+COORDINATOR_FILE = os.getenv("GITHUB_RATE_COORDINATOR")
+COLLECTOR = os.getenv("GITHUB_COLLECTOR") or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+PRIORITY = float(os.getenv("GITHUB_PRIORITY", 1))
+
+# Below this share of the limit, permits go to the collector that has used
+# the least for its priority, and the rest of the window is paced out
+# evenly instead of being drained and then waited out together.
+SCARCE_SHARE = float(os.getenv("GITHUB_RATE_SCARCE_SHARE", 0.2))
+ACTIVE_SECONDS = 30     # a collector asking within this long takes part in fair sharing
+POLL_SECONDS = 0.05
+MAX_SLEEP = 1.0         # re-check at least this often while waiting
+PROBE_SECONDS = 1.0     # with no reset known for an empty budget, one request this often finds out
+
+
+def resource_of(url):
+    """GitHub's rate-limit resource for a request, or None if it is free"""
+    path = urlparse(url).path
+    if path.startswith("/rate_limit"):
+        return None
+    if path.startswith("/search/"):
+        return "search"
+    if path == "/graphql":
+        return "graphql"
+    return "core"
+
+
+def token_key(headers):
+    """Budget id for a token; the token itself is never written down"""
+    auth = (headers or {}).get("Authorization", "anonymous")
+    return hashlib.sha1(auth.encode("utf-8")).hexdigest()[:12]
+
+
+class Coordinator:
+    """
+    Request permits from a JSON budget shared through a locked file. Each
+    budget tracks remaining/limit/reset as last reported by GitHub (minus
+    the permits handed out since) and how many permits each collector
+    took in the current window.
+    """
+
+    def __init__(self, path, collector=COLLECTOR, priority=PRIORITY, sleep=time.sleep):
+        if not priority > 0:
+            # fair sharing divides each collector's usage by its priority
+            raise ValueError(f"GITHUB_PRIORITY must be greater than 0, not {priority:g}")
+        self.path = path
+        self.collector = collector
+        self.priority = priority
+        self.sleep = sleep
+        # GitHub's numbers from responses, written with the next permit
+        self._observed = {}
+        self._observed_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive read-modify-write of the budget file"""
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path) as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+                yield state
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(state, f)
+                os.replace(tmp, self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def acquire(self, headers, url):
+        """Block until a permit for this request is granted; returns seconds waited"""
+        resource = resource_of(url)
+        if resource is None:
+            return 0.0
+        key = f"{token_key(headers)}:{resource}"
+        waited = 0.0
+        while True:
+            with self._locked() as state:
+                self._apply(state)
+                delay = self._try(state.setdefault(key, {}), time.time())
+            if delay <= 0:
+                return waited
+            delay = min(delay, MAX_SLEEP)
+            self.sleep(delay)
+            waited += delay
+
+    def try_acquire(self, headers, url):
+        """Take a permit only if one is free right now (e.g. for a hedged request)"""
+        resource = resource_of(url)
+        if resource is None:
+            return True
+        key = f"{token_key(headers)}:{resource}"
+        with self._locked() as state:
+            self._apply(state)
+            return self._try(state.setdefault(key, {}), time.time()) <= 0
+
+    def _try(self, budget, now):
+        """Grant a permit (0) or say how long to wait before asking again"""
+        collectors = budget.setdefault("collectors", {})
+        me = collectors.setdefault(self.collector, {"used": 0})
+        me.update(seen=now, weight=self.priority)
+
+        reset = budget.get("reset")
+        if reset and now >= reset:
+            # new window: the real numbers arrive with the next response
+            budget.update(remaining=None, reset=None, next_slot=0)
+            for c in collectors.values():
+                c["used"] = 0
+        remaining = budget.get("remaining")
+        if remaining is None:
+            me["used"] += 1     # nothing known yet: let requests through
+            return 0
+
+        if remaining <= 0:
+            if reset:
+                return max(POLL_SECONDS, reset - now)
+            # no reset to wait for: only a response can tell, so let a probe through
+            if now - budget.get("probe", 0) < PROBE_SECONDS:
+                return POLL_SECONDS
+            budget["probe"] = now
+            me["used"] += 1
+            return 0
+
+        if remaining < budget["limit"] * SCARCE_SHARE:
+            active = [c for c in collectors.values() if now - c["seen"] < ACTIVE_SECONDS]
+            fairest = min(c["used"] / c["weight"] for c in active)
+            if me["used"] / me["weight"] > fairest + 1 / me["weight"]:
+                return POLL_SECONDS
+            if reset and now < budget.get("next_slot", 0):
+                return budget["next_slot"] - now
+            if reset:
+                budget["next_slot"] = now + (reset - now) / remaining
+
+        budget["remaining"] = remaining - 1
+        me["used"] += 1
+        return 0
+
+    def observe(self, headers, url, response_headers):
+        """
+        Note GitHub's view of the budget after a response. It is folded in
+        under the lock the next permit takes anyway, so each request locks
+        and rewrites the budget file once.
+        """
+        resource = resource_of(url)
+        if resource is None or "X-RateLimit-Remaining" not in response_headers:
+            return
+        remaining = int(response_headers["X-RateLimit-Remaining"])
+        reset = int(response_headers.get("X-RateLimit-Reset", 0)) or None
+        limit = int(response_headers.get("X-RateLimit-Limit", remaining))
+        key = f"{token_key(headers)}:{resource}"
+        with self._observed_lock:
+            seen = self._observed.get(key)
+            if seen is not None and seen[1] == reset:
+                # responses can arrive out of order; the lowest count is the latest
+                remaining = min(remaining, seen[0])
+            self._observed[key] = (remaining, reset, limit)
+
+    def _apply(self, state):
+        """Fold the observed numbers into `state` (the budget file, locked)"""
+        with self._observed_lock:
+            observed, self._observed = self._observed, {}
+        for key, (remaining, reset, limit) in observed.items():
+            budget = state.setdefault(key, {})
+            if budget.get("reset") != reset or budget.get("remaining") is None:
+                budget.update(remaining=remaining, reset=reset, limit=limit)
+            else:
+                # permits granted since this request left are already taken off
+                budget["remaining"] = min(budget["remaining"], remaining)
+                budget["limit"] = limit
+
+    def on_response(self, resp, *args, **kwargs):
+        """requests response hook"""
+        self.observe(resp.request.headers, resp.request.url, resp.headers)
+
+    def status(self):
+        with self._locked() as state:
+            self._apply(state)
+            return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the shared GitHub request budget")
+    parser.add_argument("path", nargs="?", default=COORDINATOR_FILE)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("give the budget file or set GITHUB_RATE_COORDINATOR")
+
+    now = time.time()
+    for key, budget in sorted(Coordinator(args.path).status().items()):
+        reset = budget.get("reset")
+        print(f"{key}: {budget.get('remaining')}/{budget.get('limit')} remaining"
+              + (f", resets in {reset - now:.0f}s" if reset else ""))
+        for name, c in sorted(budget.get("collectors", {}).items()):
+            idle = now - c.get("seen", 0)
+            print(f"  {name:<28} used {c['used']:>6}  weight {c.get('weight', 1):g}"
+                  + ("  (idle)" if idle >= ACTIVE_SECONDS else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# rollup.py
+import argparse
+import heapq
+import json
+import os
+from array import array
+from collections import Counter
+from datetime import date, timedelta
+from operator import itemgetter
+
+ROLLUP_DIR = "rollup"
+SEP = "\t"  # separates day and key in the "<day>\t<key>" Counter keys
+
+
+def day_key(day, key):
+    """Counter key used by analytics folds for one (day, key) cell"""
+    return f"{day}{SEP}{key}"
+
+
+class RollupCube:
+    """
+    Days × keys count matrix. Each key owns one array('q') column indexed
+    by day offset from `origin`, so any window total is a slice-and-sum
+    per key and no per-record data is kept.
+    """
+
+    def __init__(self, origin=None, days=0):
+        self.origin = origin    # datetime.date of column index 0
+        self.days = days
+        self.keys = []
+        self.columns = []
+        self.index = {}
+
+    def _column(self, key):
+        idx = self.index.get(key)
+        if idx is None:
+            idx = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.columns.append(array("q", bytes(8 * self.days)))
+        return self.columns[idx]
+
+    def _ensure_day(self, day):
+        """Grow the day axis so `day` has a slot; returns its offset"""
+        if self.origin is None:
+            self.origin, self.days = day, 0
+        if day < self.origin:
+            pad = (self.origin - day).days
+            for i, col in enumerate(self.columns):
+                self.columns[i] = array("q", bytes(8 * pad)) + col
+            self.origin = day
+            self.days += pad
+        offset = (day - self.origin).days
+        if offset >= self.days:
+            grow = offset + 1 - self.days
+            for col in self.columns:
+                col.extend(array("q", bytes(8 * grow)))
+            self.days += grow
+        return offset
+
+    def add(self, day, key, count):
+        offset = self._ensure_day(day)
+        self._column(key)[offset] += count
+
+    @classmethod
+    def from_counter(cls, counter):
+        """Build a cube from a Counter keyed by day_key(day, key)"""
+        cube = cls()
+        for cell, count in sorted(counter.items()):
+            day, _, key = cell.partition(SEP)
+            cube.add(date.fromisoformat(day), key, count)
+        return cube
+
+    def _offsets(self, start=None, end=None):
+        """Clamp an inclusive [start, end] date window to column offsets"""
+        lo = 0 if start is None else max(0, (start - self.origin).days)
+        hi = self.days if end is None else min(self.days, (end - self.origin).days + 1)
+        return lo, hi
+
+    def window(self, start=None, end=None):
+        """Counter of totals per key over the inclusive window"""
+        if self.origin is None:
+            return Counter()
+        lo, hi = self._offsets(start, end)
+        if lo >= hi:
+            return Counter()
+        totals = Counter()
+        for key, col in zip(self.keys, self.columns):
+            total = sum(col[lo:hi])
+            if total:
+                totals[key] = total
+        return totals
+
+    def top(self, k=10, start=None, end=None, exclude=()):
+        totals = self.window(start, end)
+        items = ((key, n) for key, n in totals.items() if key not in exclude)
+        return heapq.nlargest(k, items, key=itemgetter(1))
+
+    def last_day(self):
+        return None if self.origin is None else self.origin + timedelta(days=self.days - 1)
+
+    def save(self, path):
+        """One JSON header line followed by the raw column bytes"""
+        header = {
+            "origin": self.origin.isoformat() if self.origin else None,
+            "days": self.days,
+            "keys": self.keys
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for col in self.columns:
+                col.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            origin = date.fromisoformat(header["origin"]) if header["origin"] else None
+            cube = cls(origin, header["days"])
+            for key in header["keys"]:
+                col = array("q")
+                col.fromfile(f, cube.days)
+                cube.index[key] = len(cube.keys)
+                cube.keys.append(key)
+                cube.columns.append(col)
+        return cube
+
+
+def save_cubes(counters, names, rollup_dir=ROLLUP_DIR):
+    """Write one cube file per name from the matching day-keyed Counters"""
+    os.makedirs(rollup_dir, exist_ok=True)
+    cubes = {}
+    for name in names:
+        cubes[name] = RollupCube.from_counter(counters.get(name, Counter()))
+        cubes[name].save(os.path.join(rollup_dir, f"{name}.cube"))
+    return cubes
+
+
+def load_cube(name, rollup_dir=ROLLUP_DIR):
+    return RollupCube.load(os.path.join(rollup_dir, f"{name}.cube"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-k over a window of the daily rollup")
+    parser.add_argument("cube", help="cube name, e.g. lang_days or commits_days")
+    parser.add_argument("--days", type=int, default=7, help="window length ending at the last day")
+    parser.add_argument("--compare", action="store_true", help="also show the window just before")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--dir", default=ROLLUP_DIR)
+    args = parser.parse_args()
+
+    cube = load_cube(args.cube, args.dir)
+    if cube.origin is None:
+        print("Cube is empty.")
+        return
+    end = cube.last_day()
+    windows = [(end - timedelta(days=args.days - 1), end)]
+    if args.compare:
+        prev_end = windows[0][0] - timedelta(days=1)
+        windows.append((prev_end - timedelta(days=args.days - 1), prev_end))
+
+    for start, stop in windows:
+        print(f"\n=== {args.cube}: {start} → {stop} ===")
+        for i, (key, count) in enumerate(cube.top(args.k, start, stop, ["Unknown"]), 1):
+            print(f"{i:>2}. {key:<20} {count}")
+
+
+if __name__ == "__main__":
+    main()
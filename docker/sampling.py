@@ -0,0 +1,149 @@
+# sampling.py
+import math
+import os
+import random
+from collections import Counter, defaultdict
+
+# ——— Configuration ———
+# TDD_SAMPLE: unset inspects every discovered repo; "auto" spreads the
+# remaining core quota over TDD_SAMPLE_DAYS days; a number is the detector
+# requests to spend per day.
+SAMPLE = os.getenv("TDD_SAMPLE", "")
+SAMPLE_DAYS = int(os.getenv("TDD_SAMPLE_DAYS", 7))
+MIN_PER_STRATUM = int(os.getenv("TDD_SAMPLE_MIN_PER_STRATUM", 10))
+SAMPLE_RESERVE = 100    # core requests left alone for everything else
+Z = 1.96                # 95% intervals
+
+
+def language(repo):
+    return repo.get("language") or "Unknown"
+
+
+def sample_size(calls_per_repo, setting=SAMPLE, remaining=None):
+    """
+    Repos one day may inspect, or None to inspect them all. `remaining`
+    is a callable returning the core quota left, only called for "auto".
+    """
+    if not setting:
+        return None
+    if setting == "auto":
+        budget = (remaining() - SAMPLE_RESERVE) / SAMPLE_DAYS
+    else:
+        budget = float(setting)
+    return max(1, int(budget / calls_per_repo))
+
+
+def allocate(sizes, total, minimum=MIN_PER_STRATUM):
+    """
+    Split `total` draws over strata of `sizes` ({stratum: population}):
+    proportional to size, but at least `minimum` per stratum (or all of
+    it) so small languages still get an interval. Largest remainders
+    take the draws left after rounding down.
+    """
+    population = sum(sizes.values())
+    if total >= population:
+        return dict(sizes)
+    floor = {s: min(n, minimum) for s, n in sizes.items()}
+    left = total - sum(floor.values())
+    if left <= 0:
+        # not even the minimum fits: spread what there is, biggest first
+        alloc = dict.fromkeys(sizes, 0)
+        for i, s in enumerate(sorted(sizes, key=lambda s: -sizes[s])):
+            alloc[s] = min(sizes[s], total // len(sizes) + (i < total % len(sizes)))
+        return alloc
+    spare = {s: sizes[s] - floor[s] for s in sizes}
+    spare_total = sum(spare.values())
+    shares = {s: left * spare[s] / spare_total for s in sizes}
+    alloc = {s: floor[s] + int(shares[s]) for s in sizes}
+    rest = total - sum(alloc.values())
+    for s in sorted(sizes, key=lambda s: int(shares[s]) - shares[s]):
+        if rest <= 0:
+            break
+        if alloc[s] < sizes[s]:
+            alloc[s] += 1
+            rest -= 1
+    return alloc
+
+
+def stratified_sample(items, total, key=language, rng=None):
+    """{stratum: (population, sampled items)}, a simple random sample per stratum"""
+    rng = rng or random.Random()
+    strata = defaultdict(list)
+    for item in items:
+        strata[key(item)].append(item)
+    alloc = allocate({s: len(group) for s, group in strata.items()}, total)
+    return {s: (len(group), rng.sample(group, alloc[s])) for s, group in strata.items()}
+
+
+def wilson_interval(positives, n, population=None, z=Z):
+    """
+    Wilson score interval for a proportion from `n` draws without
+    replacement out of `population` (finite population corrected).
+    A census (n == population) has no sampling error.
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    p = positives / n
+    if population is not None and n >= population:
+        return p, p
+    if population is not None and population > 1:
+        n = n * (population - 1) / (population - n)
+    z2 = z * z
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate(strata, positives, z=Z):
+    """
+    Per-stratum estimates from {stratum: (population, sampled count)} and
+    {stratum: positives}. The Wilson interval is kept as its center and a
+    variance taken from its half-width: both add up across strata (e.g.
+    days), a single stratum gets its Wilson interval back, and a small
+    sample with no or only positive hits still gets a width.
+    """
+    stats = {}
+    for s, (population, sampled) in strata.items():
+        x = positives.get(s, 0)
+        rate = x / sampled if sampled else 0.0
+        low, high = wilson_interval(x, sampled, population, z)
+        stats[s] = {
+            "population": population,
+            "sampled": sampled,
+            "positive": x,
+            "count": population * rate,
+            "center": population * (low + high) / 2,
+            "variance": (population * (high - low) / (2 * z)) ** 2
+        }
+    return stats
+
+
+def estimate_day(items, count_positive, size, rng=None):
+    """
+    Sample `size` of the discovered `items` stratified by language (all
+    of them if None), run `count_positive(sampled items) -> Counter(language
+    -> hits)` on the sample only, and return (estimated counts per
+    language, per-language stats for the partial message).
+    """
+    size = len(items) if size is None else size
+    strata = stratified_sample(items, size, rng=rng)
+    sampled = [repo for _, group in strata.values() for repo in group]
+    hits = count_positive(sampled) if sampled else Counter()
+    stats = estimate({s: (population, len(group)) for s, (population, group) in strata.items()}, hits)
+    # whole repos, like every other partial payload (the rollup cubes are integer)
+    counts = Counter({s: round(st["count"]) for s, st in stats.items()})
+    return counts, stats
+
+
+def interval(count, center, variance, population=None, exact=0, z=Z):
+    """
+    Interval of a summed count estimate from the summed Wilson centers and
+    variances of the sampled days. `exact` is the part of `count` from days
+    inspected in full; it carries no error and is added on both ends. The
+    sampled part is widened to hold its estimate and clipped to [0, population].
+    """
+    estimate = count - exact
+    half = z * math.sqrt(variance)
+    low, high = min(estimate, center - half), max(estimate, center + half)
+    low, high = max(0.0, low), high if population is None else min(population, high)
+    return exact + low, exact + high
@@ -0,0 +1,135 @@
+# sketch.py
+import heapq
+from operator import itemgetter
+
+SKETCH_TAG = "space_saving"
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch (Metwally et al.) over weighted items.
+
+    At most `capacity` items are tracked. Each tracked count is an upper
+    bound that overestimates the true count by at most its `error`, and
+    every error is at most total / capacity, so any item with a true count
+    above that bound is guaranteed to be tracked. Sketches with the same
+    capacity merge (Agarwal et al., "Mergeable Summaries") with the same
+    guarantees, so producers can each keep one and analytics can combine
+    them.
+
+    The interface follows Counter where it can (update, items, copy), so a
+    sketch can sit among the named Counters folded by the loader.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []     # (count, item) with stale entries skipped lazily
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def items(self):
+        return self.counts.items()
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """Remove and return the tracked item with the smallest count"""
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                del self.counts[item]
+                return item, count, self.errors.pop(item)
+
+    def min_count(self):
+        """Smallest tracked count once full (the bound on unseen items)"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def add(self, item, count=1):
+        if count <= 0:
+            return
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            _, floor, _ = self._pop_min()
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        self._push(item)
+
+    def merge(self, other):
+        """Fold another sketch in; untracked items count as the other's floor"""
+        floor_self, floor_other = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = (self.counts.get(item, floor_self)
+                            + other.counts.get(item, floor_other))
+            errors[item] = (self.errors.get(item, floor_self)
+                            + other.errors.get(item, floor_other))
+        keep = heapq.nlargest(self.capacity, counts.items(), key=itemgetter(1))
+        self.counts = dict(keep)
+        self.errors = {item: errors[item] for item in self.counts}
+        self.total += other.total
+        self._heap = [(c, i) for i, c in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def update(self, other):
+        """Counter-style update from another sketch or an item -> count map"""
+        if isinstance(other, SpaceSaving):
+            return self.merge(other)
+        for item, count in other.items():
+            self.add(item, count)
+        return self
+
+    def copy(self):
+        return SpaceSaving.from_dict(self.to_dict())
+
+    def max_error(self):
+        """Worst-case overestimate of any reported count"""
+        return max(self.errors.values(), default=0)
+
+    def top(self, k=10):
+        """[(item, upper bound, guaranteed lower bound)] for the k largest"""
+        best = heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+        return [(item, count, count - self.errors[item]) for item, count in best]
+
+    def to_dict(self):
+        return {
+            "__sketch__": SKETCH_TAG,
+            "capacity": self.capacity,
+            "total": self.total,
+            "counts": {item: [c, self.errors[item]] for item, c in self.counts.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        for item, (count, error) in data["counts"].items():
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        sketch._heap = [(c, i) for i, c in sketch.counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+def is_sketch(data):
+    return isinstance(data, dict) and data.get("__sketch__") == SKETCH_TAG
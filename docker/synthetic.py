@@ -0,0 +1,188 @@
+# synthetic.py
+import gzip
+import hashlib
+import json
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+
+# Rough share of new public repos per primary language; None is a repo
+# GitHub could not classify (reported as "Unknown" by the collectors).
+LANGUAGE_WEIGHTS = {
+    "Python": 18, "JavaScript": 13, "TypeScript": 11, None: 14, "Java": 7,
+    "HTML": 7, "Go": 5, "C++": 4, "C#": 4, "C": 3, "Jupyter Notebook": 4,
+    "PHP": 3, "Shell": 3, "CSS": 2, "Rust": 2, "Kotlin": 2, "Ruby": 1,
+    "Swift": 1, "Dart": 1, "Vue": 1, "Scala": 0.5, "Haskell": 0.3
+}
+
+# One root entry per language that the TDD detectors recognise as tests
+TEST_ENTRIES = {
+    "Python": ("dir", "tests"), "JavaScript": ("dir", "__tests__"),
+    "TypeScript": ("dir", "__tests__"), "Java": ("dir", "test"),
+    "Go": ("file", "main_test.go"), "Ruby": ("dir", "spec"),
+    "Swift": ("dir", "Tests"), "Rust": ("dir", "tests"), "Dart": ("dir", "test"),
+    "C#": ("dir", "UnitTest"), "Shell": ("file", "test_run.sh")
+}
+CI_ENTRIES = [("dir", ".github"), ("file", ".travis.yml"), ("file", ".gitlab-ci.yml"),
+              ("dir", ".circleci"), ("file", "azure-pipelines.yml")]
+SOURCE_ENTRIES = {
+    "Python": "main.py", "JavaScript": "index.js", "TypeScript": "index.ts",
+    "Java": "pom.xml", "Go": "main.go", "Rust": "Cargo.toml", "C++": "main.cpp",
+    "C": "main.c", "C#": "Program.cs", "PHP": "index.php", "Ruby": "Gemfile",
+    "HTML": "index.html", "Shell": "install.sh", "Kotlin": "build.gradle.kts"
+}
+
+TEST_RATE = 0.25        # share of repos with recognisable tests
+CI_RATE = 0.45          # share of tested repos that also have CI
+EMPTY_RATE = 0.03       # repos with no commits (contents 404, commits 409)
+COMMIT_ALPHA = 1.2      # Pareto shape of commits per repo (power law)
+MAX_COMMITS = 5000
+
+_LANGS = list(LANGUAGE_WEIGHTS)
+_WEIGHTS = list(LANGUAGE_WEIGHTS.values())
+
+
+def pick_language(rng, skew=1.0):
+    """`skew` sharpens (>1) or flattens (<1, 0 = uniform) the language mix"""
+    weights = _WEIGHTS if skew == 1.0 else [w ** skew for w in _WEIGHTS]
+    return rng.choices(_LANGS, weights=weights)[0]
+
+
+def commit_count(rng, alpha=COMMIT_ALPHA, cap=MAX_COMMITS):
+    """Power-law commits per repo: most have a handful, a few have thousands"""
+    return min(cap, int(rng.paretovariate(alpha)))
+
+
+def _sha(*parts):
+    return hashlib.sha1(":".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+
+def make_repo(rng, day, index, alpha=COMMIT_ALPHA, language_skew=1.0):
+    """One synthetic repo created on `day` (a date) with its root tree"""
+    language = pick_language(rng, language_skew)
+    owner = f"user{rng.randrange(10 ** 6)}"
+    name = f"repo-{day:%Y%m%d}-{index}"
+    created = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(
+        seconds=rng.randrange(86400))
+    empty = rng.random() < EMPTY_RATE
+    has_tests = not empty and rng.random() < TEST_RATE
+    has_ci = has_tests and rng.random() < CI_RATE
+
+    entries = []
+    workflows = []
+    if not empty:
+        entries.append(("file", "README.md"))
+        if language in SOURCE_ENTRIES:
+            entries.append(("file", SOURCE_ENTRIES[language]))
+        entries.append(("dir", "src"))
+        if has_tests:
+            entries.append(TEST_ENTRIES.get(language, ("dir", "tests")))
+        if has_ci:
+            ci = rng.choice(CI_ENTRIES)
+            entries.append(ci)
+            if ci[1] == ".github":
+                workflows = ["ci.yml"]
+
+    return {
+        "full_name": f"{owner}/{name}",
+        "language": language,
+        "default_branch": rng.choice(["main", "main", "main", "master"]),
+        "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "pushed_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "size": 0 if empty else rng.randrange(1, 50000),
+        "commits": 0 if empty else commit_count(rng, alpha),
+        "head_sha": None if empty else _sha(owner, name),
+        "entries": [{"type": t, "name": n} for t, n in entries],
+        "workflows": workflows,
+        "has_tests": has_tests,
+        "has_ci": has_ci
+    }
+
+
+def repos_for_day(day, count, seed=0, **options):
+    """Deterministic list of `count` repos created on `day`; `options` go to make_repo"""
+    rng = random.Random(f"{seed}:{day.isoformat()}")
+    return [make_repo(rng, day, i, **options) for i in range(count)]
+
+
+def record_messages(repo):
+    """
+    Per-item messages one repo yields, as (topic key in config.TOPICS,
+    payload) in the record formats analytics.py folds
+    """
+    day = repo["created_at"][:10]
+    lang = repo["language"] or "Unknown"
+    yield "lang", {"languages": {lang: 1}, "days": {day: {lang: 1}}}
+    if repo["commits"]:
+        # the commit collector stops after 10 pages of 100
+        yield "commits", {"repo": repo["full_name"], "commit_count": min(repo["commits"], 1000),
+                          "day": day}
+    if repo["has_tests"]:
+        yield "tdd", {"language": lang, "project_count": 1, "day": day}
+    if repo["has_ci"]:
+        yield "tdd_cicd", {"languages": {lang: 1}, "days": {day: {lang: 1}}}
+
+
+def message_stream(count, repos_per_day=5000, start=date(2025, 1, 1), seed=0, **options):
+    """`count` (topic key, payload) messages, one synthetic day after another"""
+    day = start
+    while count > 0:
+        for repo in repos_for_day(day, repos_per_day, seed, **options):
+            for message in record_messages(repo):
+                yield message
+                count -= 1
+                if count == 0:
+                    return
+        day += timedelta(days=1)
+
+
+def archive_events(repo, rng, noise=2):
+    """
+    GH Archive-style events for one repo: its CreateEvent (without the
+    language, like current dumps), PushEvents
+    adding up to its commits (same day), and `noise` events nobody folds
+    """
+    created = datetime.strptime(repo["created_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    day_end = created.replace(hour=23, minute=59, second=59)
+    base = {"repo": {"name": repo["full_name"]}, "public": True}
+
+    def event(kind, at, payload):
+        return dict(base, id=str(rng.getrandbits(48)), type=kind, payload=payload,
+                    created_at=at.strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+    yield event("CreateEvent", created, {"ref_type": "repository", "ref": None,
+                                         "master_branch": repo["default_branch"]})
+    left = repo["commits"]
+    while left > 0:
+        size = min(left, rng.randint(1, 20))
+        left -= size
+        at = created + (day_end - created) * rng.random()
+        yield event("PushEvent", at, {"size": size, "distinct_size": size,
+                                      "commits": [{"sha": _sha(repo["full_name"], left, i)}
+                                                  for i in range(size)]})
+    for _ in range(noise):
+        yield event("WatchEvent", created + (day_end - created) * rng.random(), {"action": "started"})
+
+
+def write_gharchive(directory, start, days, repos_per_day=5000, seed=0, **options):
+    """
+    Write `days` days of hourly YYYY-MM-DD-H.json.gz dumps starting at
+    `start` (a date). Returns the repos written, for checking the counts.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        rng = random.Random(f"{seed}:archive:{day.isoformat()}")
+        hours = [[] for _ in range(24)]
+        for repo in repos_for_day(day, repos_per_day, seed, **options):
+            written.append(repo)
+            for event in archive_events(repo, rng):
+                hours[int(event["created_at"][11:13])].append(event)
+        for hour, events in enumerate(hours):
+            events.sort(key=lambda e: e["created_at"])
+            path = os.path.join(directory, f"{day:%Y-%m-%d}-{hour}.json.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+    return written
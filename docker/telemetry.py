@@ -0,0 +1,221 @@
+# telemetry.py
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# ——— Configuration ———
+# GITHUB_METRICS_FILE: rewrite this JSON file every GITHUB_METRICS_SECONDS
+# and once more at exit. GITHUB_METRICS_PORT: serve the same JSON on
+# http://GITHUB_METRICS_HOST:port/metrics.
+METRICS_FILE = os.getenv("GITHUB_METRICS_FILE")
+METRICS_SECONDS = float(os.getenv("GITHUB_METRICS_SECONDS", 30))
+METRICS_HOST = os.getenv("GITHUB_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("GITHUB_METRICS_PORT", 0))
+
+# upper bounds (seconds) of the latency histogram buckets
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf")]
+HISTORY_SECONDS = 10    # at most one remaining-budget sample per resource per interval
+
+# /repos/{owner}/{repo}/... -> one endpoint name for every repo
+_REPO_PATH = re.compile(r"^/repos/[^/]+/[^/]+")
+_CONTENTS_PATH = re.compile(r"/contents/.+$")
+
+
+def endpoint_name(method, url):
+    path = _REPO_PATH.sub("/repos/{repo}", urlparse(url).path)
+    return f"{method} {_CONTENTS_PATH.sub('/contents/{path}', path)}"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+    def to_dict(self):
+        return {
+            "count": self.total,
+            "sum": self.sum,
+            "buckets": {("+Inf" if b == float("inf") else str(b)): n for b, n in zip(BUCKETS, self.counts)},
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class Telemetry:
+    """
+    Thread-safe counters for the GitHub client: latency histograms, status
+    counts and bytes per endpoint, time split into network / sleep / parse,
+    and the remaining rate-limit budget over time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latency = defaultdict(Histogram)
+        self.status = defaultdict(Counter)
+        self.bytes = Counter()
+        self.time = Counter()           # network / sleep / parse -> seconds
+        self.counts = Counter()         # work done, e.g. repos processed
+        self.sleeps = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        self.budget = {}                # resource -> latest limit/remaining/reset
+        self.history = defaultdict(list)
+        self.queues = {}                # pipeline.py queue name -> QueueStats
+
+    def on_response(self, resp, *args, **kwargs):
+        """requests response hook"""
+        name = endpoint_name(resp.request.method, resp.request.url)
+        elapsed = resp.elapsed.total_seconds()
+        size = len(resp.content)
+        with self._lock:
+            self.latency[name].observe(elapsed)
+            self.status[name][str(resp.status_code)] += 1
+            self.bytes[name] += size
+            self.time["network"] += elapsed
+            if "X-RateLimit-Remaining" in resp.headers:
+                self._record_budget(resp.headers)
+
+    def _record_budget(self, headers):
+        resource = headers.get("X-RateLimit-Resource", "core")
+        now = time.time()
+        remaining = int(headers["X-RateLimit-Remaining"])
+        self.budget[resource] = {
+            "limit": int(headers.get("X-RateLimit-Limit", 0)),
+            "remaining": remaining,
+            "reset": int(headers.get("X-RateLimit-Reset", 0))
+        }
+        history = self.history[resource]
+        if history and now - history[-1][0] < HISTORY_SECONDS:
+            history[-1][1] = min(history[-1][1], remaining)
+        else:
+            history.append([now, remaining])
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def add_time(self, phase, seconds):
+        with self._lock:
+            self.time[phase] += seconds
+
+    def sleep(self, seconds, reason="rate_limit"):
+        """time.sleep that is counted as waiting, not working"""
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        with self._lock:
+            self.time["sleep"] += seconds
+            self.sleeps[reason]["count"] += 1
+            self.sleeps[reason]["seconds"] += seconds
+
+    def queue(self, name, factory):
+        """Stats object of a pipeline queue, made by `factory` on first use"""
+        with self._lock:
+            if name not in self.queues:
+                self.queues[name] = factory()
+            return self.queues[name]
+
+    def snapshot(self):
+        with self._lock:
+            queues = dict(self.queues)
+            snapshot = {
+                "started_at": self.started,
+                "uptime_s": time.time() - self.started,
+                "time_s": dict(self.time),
+                "counts": dict(self.counts),
+                "sleeps": {reason: dict(s) for reason, s in self.sleeps.items()},
+                "endpoints": {
+                    name: {
+                        "latency": hist.to_dict(),
+                        "status": dict(self.status[name]),
+                        "bytes": self.bytes[name]
+                    }
+                    for name, hist in sorted(self.latency.items())
+                },
+                "rate_limit": {
+                    resource: dict(budget, history=[list(s) for s in self.history[resource]])
+                    for resource, budget in self.budget.items()
+                }
+            }
+        # QueueStats takes its own lock
+        snapshot["queues"] = {name: q.to_dict() for name, q in queues.items()}
+        return snapshot
+
+    def dump(self, path):
+        """Write the snapshot atomically"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+
+# shared by the GitHub client and the collectors
+TELEMETRY = Telemetry()
+
+
+def _dump_periodically(telemetry, path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            telemetry.dump(path)
+        except OSError as e:
+            print(f"[TELEMETRY] Could not write {path}: {e}")
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    telemetry = TELEMETRY
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/metrics":
+            self.send_error(404)
+            return
+        payload = json.dumps(self.telemetry.snapshot()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_exporters(telemetry=TELEMETRY, path=METRICS_FILE, interval=METRICS_SECONDS,
+                    host=METRICS_HOST, port=METRICS_PORT):
+    """Start whichever exporters are configured; a no-op by default"""
+    if path:
+        threading.Thread(target=_dump_periodically, args=(telemetry, path, interval),
+                         daemon=True).start()
+        atexit.register(telemetry.dump, path)
+    if port:
+        MetricsHandler.telemetry = telemetry
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[TELEMETRY] Serving metrics on http://{host}:{port}/metrics")
@@ -0,0 +1,53 @@
+# test_checkpoint.py
+import json
+import types
+
+from checkpoint import IncrementalScanner
+from engine import Engine
+
+
+def _fold_count(entry, counters):
+    counters["lines"][entry["k"]] += 1
+
+
+def _as_module(fold, module):
+    """A copy of `fold` as if its module were imported under another name"""
+    copy = types.FunctionType(fold.__code__, fold.__globals__, fold.__name__)
+    copy.__qualname__ = fold.__qualname__
+    copy.__module__ = module
+    return copy
+
+
+def _append(path, *keys):
+    with open(path, "a") as f:
+        for k in keys:
+            f.write(json.dumps({"k": k}) + "\n")
+
+
+def _scanner(data, state, module):
+    engine = Engine({"lang": str(data)})
+    engine.register("count", "lang", _as_module(_fold_count, module), key="lines")
+    starts = []
+    scan_source = engine.scan_source
+
+    def recording(source, workers=None, errors=None, start=0, end=None):
+        starts.append(start)
+        return scan_source(source, workers, errors, start, end)
+
+    engine.scan_source = recording
+    return IncrementalScanner(engine, str(state)), starts
+
+
+def test_resumes_across_module_names(tmp_path):
+    data, state = tmp_path / "data_lang.jsonl", tmp_path / "state.json"
+    _append(data, "a", "b")
+    first, _ = _scanner(data, state, "analytics")
+    first.scan(workers=1)
+    offset = first.offsets()["lang"]
+
+    _append(data, "a")
+    second, starts = _scanner(data, state, "__main__")
+    counters = second.scan(workers=1)
+
+    assert starts == [offset]
+    assert counters["lines"] == {"a": 2, "b": 1}
@@ -0,0 +1,18 @@
+# test_fake_github.py
+import requests
+
+import fake_github
+
+
+def test_faulted_post_leaves_connection_usable():
+    server, url = fake_github.start(p5xx=1.0)
+    try:
+        with requests.Session() as session:
+            query = {"query": '{ r0: repository(owner: "a", name: "b") { nameWithOwner } }'}
+            resp = session.post(f"{url}/graphql", json=query, timeout=5)
+            assert resp.status_code >= 500
+            resp = session.get(f"{url}/rate_limit", timeout=5)
+            assert resp.status_code == 200
+            assert "resources" in resp.json()
+    finally:
+        server.shutdown()
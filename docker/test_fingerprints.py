@@ -0,0 +1,30 @@
+# test_fingerprints.py
+from fingerprints import FingerprintStore
+
+REPO = {"full_name": "octo/repo", "pushed_at": "2025-01-01T00:00:00Z"}
+
+
+def test_negative_survives_later_puts():
+    store = FingerprintStore(negative_ttl=3600)
+    store.put(REPO, "commits", 0, negative="409")
+    store.put(REPO, "head_sha", "abc123")
+    assert store.get(REPO, "has_tests") is False
+    assert store.summary()["negative_409"] == 1
+
+
+def test_expired_negative_is_replaced_by_a_recheck():
+    store = FingerprintStore(negative_ttl=-1)
+    store.put(REPO, "commits", 0, negative="409")
+    assert store.get(REPO, "commits") is None
+    store.put(REPO, "commits", 7)
+    assert store.get(REPO, "commits") == 7
+
+
+def test_new_push_drops_the_old_row():
+    store = FingerprintStore()
+    store.put(REPO, "has_tests", True)
+    pushed = dict(REPO, pushed_at="2025-02-01T00:00:00Z")
+    assert store.get(pushed, "has_tests") is None
+    store.put(pushed, "commits", 3)
+    assert store.get(pushed, "has_tests") is None
+    assert store.get(pushed, "commits") == 3
@@ -0,0 +1,79 @@
+# test_github_client.py
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from github_client import RATE_BUFFER, RetryingSession, RetryPolicy, retry_after
+
+
+def _response(status, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers or {})
+    resp._content = b"{}"
+    return resp
+
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers each request with the next status in `statuses`"""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        resp = _response(self.statuses.pop(0))
+        resp.request, resp.url = request, request.url
+        return resp
+
+    def close(self):
+        pass
+
+
+def test_retry_after_reads_seconds_and_http_dates():
+    assert retry_after("120") == 120.0
+    assert retry_after("-3") == 0.0
+    assert retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert retry_after("soon") is None
+
+
+def test_backoff_is_full_jitter_under_the_cap():
+    policy = RetryPolicy(base=1, cap=8, rng=random.Random(3))
+    for attempt in range(8):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= min(8, 2 ** attempt)
+    assert max(policy.backoff(10) for _ in range(200)) > 4    # spread over the whole range
+
+
+def test_wait_for_reads_the_rate_limit_headers():
+    policy = RetryPolicy(rng=random.Random(0))
+    assert policy.wait_for(_response(429, {"Retry-After": "7"}), 0) == (7.0, "secondary_rate_limit")
+    assert policy.wait_for(_response(403, {"Retry-After": "later"}), 0)[1] == "backoff"
+    reset = str(int(time.time()) + 30)
+    seconds, reason = policy.wait_for(_response(403, {"X-RateLimit-Remaining": "0",
+                                                      "X-RateLimit-Reset": reset}), 0)
+    assert reason == "rate_limit" and 28 + RATE_BUFFER <= seconds <= 30 + RATE_BUFFER
+    assert policy.wait_for(_response(403), 0) is None
+    assert policy.wait_for(_response(502), 0)[1] == "backoff"
+    assert policy.wait_for(_response(404), 0) is None
+    assert RetryPolicy(max_wait=0).wait_for(_response(429, {"Retry-After": "7"}), 0)[0] == 0
+
+
+def test_session_retries_until_an_answer_or_out_of_retries():
+    session = RetryingSession(RetryPolicy(retries=3, max_wait=0), hedge_after=0)
+    adapter = ScriptedAdapter([503, 502, 200])
+    session.mount("http://", adapter)
+    assert session.get("http://github.test/x").status_code == 200
+    assert adapter.sent == 3
+
+    adapter = ScriptedAdapter([503] * 4)
+    session.mount("http://", adapter)
+    assert session.get("http://github.test/x").status_code == 503
+    assert adapter.sent == 4
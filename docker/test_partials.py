@@ -0,0 +1,41 @@
+# test_partials.py
+from partials import PartialReducer, make_partial
+
+
+def _partial(day, payload, produced_at, collector="lang"):
+    partial = make_partial(collector, day, payload)
+    partial["produced_at"] = produced_at
+    return partial
+
+
+def test_resent_shard_replaces_instead_of_summing():
+    reducer = PartialReducer()
+    reducer.add(_partial("2025-01-01", {"Python": 5}, "2025-01-02T00:00:00"))
+    reducer.add(_partial("2025-01-02", {"Python": 1}, "2025-01-03T00:00:00"))
+    reducer.add(_partial("2025-01-01", {"Python": 7, "Go": 2}, "2025-01-04T00:00:00"))
+    assert len(reducer) == 2
+    assert reducer.total() == {"Python": 8, "Go": 2}
+
+
+def test_older_resend_and_replay_are_ignored():
+    newer = _partial("2025-01-01", {"Python": 7}, "2025-01-04T00:00:00")
+    reducer = PartialReducer()
+    reducer.add(newer)
+    reducer.add(_partial("2025-01-01", {"Python": 5}, "2025-01-02T00:00:00"))
+    reducer.add(newer)
+    assert reducer.total() == {"Python": 7}
+
+
+def test_merge_order_does_not_matter():
+    parts = [_partial("2025-01-01", {"a": 1}, "t1"), _partial("2025-01-01", {"a": 3}, "t2"),
+             _partial("2025-01-02", {"b": 2}, "t1"), _partial("2025-01-02", {"b": 4}, "t1")]
+    left = PartialReducer().update(parts[:2]).update(PartialReducer().update(parts[2:]))
+    right = PartialReducer().update(parts[::-1])
+    assert left.total() == right.total() == {"a": 3, "b": 4}
+
+
+def test_shards_keep_sources_apart():
+    reducer = PartialReducer()
+    reducer.add(make_partial("commits", "2025-01-01", {"x/y": 3}))
+    reducer.add(make_partial("commits", "2025-01-01", {"x/y": 4}, shards="commits_archive"))
+    assert len(reducer) == 2
@@ -0,0 +1,22 @@
+# test_query_service.py
+from collections import Counter
+
+import analytics
+from query_service import Snapshot, handle_query
+from rollup import RollupCube
+
+
+def _snapshot():
+    cubes = {name: RollupCube() for name in analytics.ROLLUP_CUBES}
+    return Snapshot({analytics.Q2.key: Counter({"a/b": 3})}, cubes, {})
+
+
+def test_k_below_one_is_rejected():
+    status, body = handle_query(_snapshot(), "/top/repos", {"k": "0"})
+    assert status == 400 and "k" in body["error"]
+
+
+def test_windowed_repos_need_exact_counts(monkeypatch):
+    monkeypatch.setattr(analytics, "SKETCH_CAPACITY", 100)
+    status, body = handle_query(_snapshot(), "/top/repos", {"from": "2024-01-01", "to": "2024-01-07"})
+    assert status == 501 and "error" in body
@@ -0,0 +1,55 @@
+# test_rollup.py
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from rollup import RollupCube, day_key
+
+ORIGIN = date(2025, 1, 10)
+
+
+def _cells(seed=0, days=30):
+    rng = random.Random(seed)
+    return [(ORIGIN + timedelta(days=rng.randrange(days)), rng.choice("abcde"), rng.randint(1, 9))
+            for _ in range(300)]
+
+
+def _brute(cells, start, end):
+    totals = Counter()
+    for day, key, count in cells:
+        if (start is None or day >= start) and (end is None or day <= end):
+            totals[key] += count
+    return totals
+
+
+def test_window_sums_match_brute_force():
+    cells = _cells()
+    counter = Counter()
+    for day, key, count in cells:
+        counter[day_key(day.isoformat(), key)] += count
+    cube = RollupCube.from_counter(counter)
+    days = [None] + [ORIGIN + timedelta(days=i) for i in range(-3, 34, 4)]
+    for start in days:
+        for end in days:
+            assert cube.window(start, end) == _brute(cells, start, end)
+
+
+def test_days_before_the_origin_grow_the_cube():
+    cube = RollupCube()
+    cube.add(ORIGIN, "a", 2)
+    cube.add(ORIGIN - timedelta(days=5), "b", 3)
+    cube.add(ORIGIN + timedelta(days=2), "a", 4)
+    assert cube.origin == ORIGIN - timedelta(days=5)
+    assert cube.window(ORIGIN, ORIGIN) == {"a": 2}
+    assert cube.window(end=ORIGIN - timedelta(days=1)) == {"b": 3}
+    assert cube.window(ORIGIN + timedelta(days=3), None) == Counter()
+
+
+def test_save_and_load(tmp_path):
+    cube = RollupCube()
+    for day, key, count in _cells(1):
+        cube.add(day, key, count)
+    cube.save(tmp_path / "lang_days.cube")
+    loaded = RollupCube.load(tmp_path / "lang_days.cube")
+    assert loaded.window() == cube.window()
+    assert loaded.top(2, ORIGIN, ORIGIN + timedelta(days=6)) == cube.top(2, ORIGIN, ORIGIN + timedelta(days=6))
@@ -0,0 +1,51 @@
+# test_sampling.py
+import random
+
+import pytest
+
+from sampling import allocate, estimate, interval, wilson_interval
+
+
+def test_wilson_matches_the_textbook_value():
+    low, high = wilson_interval(5, 10)
+    assert low == pytest.approx(0.2366, abs=1e-4)
+    assert high == pytest.approx(0.7634, abs=1e-4)
+
+
+def test_wilson_stays_inside_zero_one_with_a_width():
+    for positives in (0, 10):
+        low, high = wilson_interval(positives, 10)
+        assert 0.0 <= low < high <= 1.0
+
+
+def test_finite_population_narrows_and_a_census_is_exact():
+    wide = wilson_interval(30, 100)
+    narrow = wilson_interval(30, 100, population=150)
+    assert wide[0] < narrow[0] and narrow[1] < wide[1]
+    assert wilson_interval(30, 100, population=100) == (0.3, 0.3)
+
+
+def test_coverage_close_to_95_percent():
+    rng = random.Random(7)
+    population = [rng.random() < 0.2 for _ in range(2000)]
+    truth = sum(population) / len(population)
+    hits = 0
+    for _ in range(400):
+        sample = rng.sample(population, 100)
+        low, high = wilson_interval(sum(sample), 100, len(population))
+        hits += low <= truth <= high
+    assert hits / 400 >= 0.9
+
+
+def test_allocate_keeps_the_minimum_and_the_total():
+    alloc = allocate({"Python": 900, "Go": 80, "Zig": 5}, 100, minimum=10)
+    assert sum(alloc.values()) == 100
+    assert alloc["Zig"] == 5 and alloc["Go"] >= 10
+
+
+def test_interval_adds_exact_days_to_both_ends():
+    stats = estimate({"Python": (1000, 100)}, {"Python": 20})["Python"]
+    low, high = interval(stats["count"], stats["center"], stats["variance"], stats["population"])
+    low_mixed, high_mixed = interval(stats["count"] + 50, stats["center"], stats["variance"],
+                                     stats["population"], exact=50)
+    assert (low_mixed, high_mixed) == pytest.approx((low + 50, high + 50))
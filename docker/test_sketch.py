@@ -0,0 +1,51 @@
+# test_sketch.py
+import random
+from collections import Counter
+
+import pytest
+
+from sketch import SpaceSaving
+
+
+def _stream(seed, n=5000, keys=400):
+    rng = random.Random(seed)
+    # a skewed stream: a few heavy repos and a long tail
+    return [(f"repo{int(rng.paretovariate(1.2)) % keys}", rng.randint(1, 5)) for _ in range(n)]
+
+
+def _check_bounds(sketch, exact):
+    bound = sketch.total / sketch.capacity
+    assert sketch.total == sum(exact.values())
+    for item, count in sketch.items():
+        assert exact[item] <= count <= exact[item] + sketch.errors[item]
+        assert sketch.errors[item] <= bound
+    # anything heavier than the bound is tracked
+    for item, count in exact.items():
+        if count > bound:
+            assert item in sketch
+
+
+@pytest.mark.parametrize("capacity", [5, 20, 100])
+def test_error_bound(capacity):
+    sketch, exact = SpaceSaving(capacity), Counter()
+    for item, count in _stream(capacity):
+        sketch.add(item, count)
+        exact[item] += count
+    assert len(sketch) <= capacity
+    _check_bounds(sketch, exact)
+
+
+def test_merged_sketches_keep_the_bound():
+    merged, exact = SpaceSaving(20), Counter()
+    for seed in range(4):
+        part = SpaceSaving(20)
+        for item, count in _stream(seed, n=2000):
+            part.add(item, count)
+            exact[item] += count
+        merged.update(part)
+    _check_bounds(merged, exact)
+
+
+def test_round_trip():
+    sketch = SpaceSaving(3).update({"a": 5, "b": 2, "c": 1, "d": 4})
+    assert SpaceSaving.from_dict(sketch.to_dict()).top(3) == sketch.top(3)
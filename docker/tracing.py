@@ -0,0 +1,272 @@
+# tracing.py
+import argparse
+import atexit
+import bisect
+import contextlib
+import contextvars
+import fcntl
+import functools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# ——— Configuration ———
+# TRACE_FILE=traces.jsonl turns tracing on; every process appends its
+# finished spans there as JSON lines. Context crosses Pulsar as a W3C
+# `traceparent` message property, so producer, consumer and analytics
+# spans of one record share a trace id.
+TRACE_FILE = os.getenv("TRACE_FILE")
+SERVICE = os.getenv("TRACE_SERVICE", os.path.basename(sys.argv[0]) or "python")
+FLUSH_SPANS = 200
+FLUSH_SECONDS = 1.0
+
+_current = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id=None, start_ns=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, end_ns=None):
+        self.end_ns = end_ns or time.time_ns()
+        EXPORTER.export(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": SERVICE,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stands in for spans while tracing is off"""
+
+    def set(self, **attributes):
+        pass
+
+    def traceparent(self):
+        return None
+
+    def end(self, end_ns=None):
+        pass
+
+
+NOOP = _NoopSpan()
+
+
+class _Exporter:
+    """Buffers finished spans and appends them to TRACE_FILE in batches"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._flushed = time.monotonic()
+        if path:
+            atexit.register(self.flush)
+
+    def export(self, span):
+        with self._lock:
+            self._buffer.append(json.dumps(span.to_dict()))
+            if len(self._buffer) >= FLUSH_SPANS or time.monotonic() - self._flushed >= FLUSH_SECONDS:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            # producers, consumer and analytics append to the same file; a
+            # batch is larger than PIPE_BUF, so only the lock keeps lines whole
+            with open(self.path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.write("\n".join(self._buffer) + "\n")
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            self._buffer = []
+        self._flushed = time.monotonic()
+
+
+EXPORTER = _Exporter(TRACE_FILE)
+
+
+def enabled():
+    return EXPORTER.path is not None
+
+
+def parse_traceparent(value):
+    """(trace_id, span_id) of a W3C traceparent header, or None"""
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def _new_span(name, parent, start_ns, attributes):
+    """`parent` is a traceparent string; by default the current span"""
+    if parent is not None:
+        context = parse_traceparent(parent)
+    else:
+        current = _current.get()
+        context = (current.trace_id, current.span_id) if current is not None else None
+    if context is None:
+        return Span(name, secrets.token_hex(16), None, start_ns, attributes)
+    return Span(name, context[0], context[1], start_ns, attributes)
+
+
+@contextlib.contextmanager
+def span(name, parent=None, start_ns=None, **attributes):
+    """Time the block as a child of `parent` (or of the current span)"""
+    if not enabled():
+        yield NOOP
+        return
+    s = _new_span(name, parent, start_ns, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=repr(e))
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+def traced(name, attributes=None, **static):
+    """Decorator form of span(); `attributes(*args, **kwargs)` adds per-call attributes"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            extra = attributes(*args, **kwargs) if attributes and enabled() else {}
+            with span(name, **static, **extra):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, start_ns, end_ns, parent=None, **attributes):
+    """Export an interval that already happened (a request, a broker wait)"""
+    if enabled():
+        _new_span(name, parent, start_ns, attributes).end(end_ns)
+
+
+def current():
+    return _current.get() or NOOP
+
+
+def inject(properties=None):
+    """Message properties carrying the current span's traceparent"""
+    properties = dict(properties or {})
+    traceparent = current().traceparent()
+    if traceparent:
+        properties["traceparent"] = traceparent
+    return properties
+
+
+def send(producer, content, **attributes):
+    """
+    producer.send in a "send" span whose context rides in the message
+    properties. A pipeline.Publisher starts the span in its own thread, so
+    it times the send and not the enqueue.
+    """
+    if hasattr(producer, "send_traced"):
+        return producer.send_traced(content, "send", **attributes)
+    with span("send", **attributes):
+        return producer.send(content, properties=inject())
+
+
+def extract(properties):
+    """traceparent from received message properties, or None"""
+    return (properties or {}).get("traceparent")
+
+
+# ——— Summary ———
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(path):
+    """Per-span-name durations plus where records spend their time end to end"""
+    spans = []
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                # torn by a writer that did not hold the lock, or cut off by a crash
+                skipped += 1
+    if skipped:
+        print(f"Skipped {skipped} unreadable line(s) in {path}\n")
+
+    durations = defaultdict(list)
+    traces = defaultdict(list)
+    for s in spans:
+        durations[s["name"]].append((s["end_ns"] - s["start_ns"]) / 1e9)
+        traces[s["trace_id"]].append(s)
+
+    print(f"{'span':<16} {'count':>8} {'p50 s':>9} {'p95 s':>9} {'total s':>10}")
+    for name, values in sorted(durations.items()):
+        print(f"{name:<16} {len(values):>8} {_percentile(values, 50):>9.3f} "
+              f"{_percentile(values, 95):>9.3f} {sum(values):>10.1f}")
+
+    # where each consumed message spent its time: crawling before it was
+    # sent, waiting in the broker, being written, waiting for analytics
+    by_id = {s["span_id"]: s for s in spans}
+    trace_starts = {tid: min(t["start_ns"] for t in trace) for tid, trace in traces.items()}
+    analytics_ends = sorted(s["end_ns"] for s in spans if s["name"] == "analytics")
+    stages = defaultdict(list)
+    for s in spans:
+        if s["name"] == "receive":
+            stages["broker"].append((s["end_ns"] - s["start_ns"]) / 1e9)
+        if s["name"] != "write":
+            continue
+        stages["write"].append((s["end_ns"] - s["start_ns"]) / 1e9)
+        send = by_id.get(s["parent_id"])
+        if send is not None:
+            stages["crawl"].append((send["start_ns"] - trace_starts[s["trace_id"]]) / 1e9)
+        i = bisect.bisect_left(analytics_ends, s["end_ns"])
+        if i < len(analytics_ends):
+            stages["analytics_wait"].append((analytics_ends[i] - s["end_ns"]) / 1e9)
+
+    if stages:
+        print(f"\n{'stage':<16} {'count':>8} {'p50 s':>9} {'p95 s':>9}")
+        for stage in ["crawl", "broker", "write", "analytics_wait"]:
+            values = stages.get(stage)
+            if values:
+                print(f"{stage:<16} {len(values):>8} {_percentile(values, 50):>9.3f} "
+                      f"{_percentile(values, 95):>9.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a TRACE_FILE")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE or "traces.jsonl")
+    summarize(parser.parse_args().path)